@@ -3,9 +3,11 @@ import os
 import json
 import time
 import re
+import threading
+import multiprocessing
 # import io
 from dotenv import load_dotenv
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, request, jsonify, send_file, Response, stream_with_context
 from flask_cors import CORS
 from anthropic import Anthropic
 from elevenlabs import ElevenLabs
@@ -29,18 +31,28 @@ from config import (
     MAX_TOKENS_STREAM,
     MAX_TOKENS_RALLY,
     DEBUG,
-    ELEVENLABS_API_KEY
+    ELEVENLABS_API_KEY,
+    PIPELINE_WORKERS,
+    DETECTOR_BACKEND,
+    DETECTOR_OPTIONS,
+    EVENTS_COMPRESSION
 )
 
+# Stage timings, served at /api/metrics (no dependencies, always available)
+from utils.metrics import REGISTRY
+
 # Import pipeline functions
 try:
-    from logic.pipeline import process_frames
+    from logic.pipeline import process_frames, stream_events
     from voice.prompts import generate_commentary as generate_commentary_from_events
+    from vision.models import warm_up as warm_up_detector, registry_status
+    from vision.core import PROFILES, DEFAULT_PROFILE
     PIPELINE_AVAILABLE = True
     print("✅ Pipeline modules loaded successfully", flush=True)
 except ImportError as e:
     PIPELINE_AVAILABLE = False
     generate_commentary_from_events = None  # type: ignore
+    PROFILES, DEFAULT_PROFILE = {}, 'full'
     print(f"⚠️ Pipeline modules not available: {e}", flush=True)
 
 app = Flask(__name__)
@@ -67,11 +79,46 @@ except Exception as e:
     print(f"⚠️ ElevenLabs API not available: {e}")
     print("   Commentary will be generated without audio")
 
+def start_detector_warmup():
+    """
+    Load and warm up the YOLO detector in the background at server start,
+    so the first upload doesn't pay for weight loading and the slow first inference
+    """
+    if not PIPELINE_AVAILABLE:
+        return
+    # With the debug reloader, only the child process that actually serves requests should load it
+    if DEBUG and os.environ.get('WERKZEUG_RUN_MAIN') != 'true':
+        return
+    # Spawned segment workers re-import the main module, they load their own model when a segment needs it
+    if multiprocessing.parent_process() is not None:
+        return
+    threading.Thread(target=warm_up_detector, kwargs={'backend': DETECTOR_BACKEND},
+                     name="DetectorWarmup", daemon=True).start()
+
+start_detector_warmup()
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     return jsonify({'status': 'healthy', 'message': 'Tennis commentary server is running'}), 200
 
+@app.route('/api/ready', methods=['GET'])
+def readiness_check():
+    """
+    Readiness endpoint: 200 once the detector is loaded and warmed up, 503 before that
+    Reports load and warm-up time per model
+    """
+    if not PIPELINE_AVAILABLE:
+        return jsonify({'ready': False, 'error': 'Pipeline modules not available'}), 503
+
+    status = registry_status()
+    return jsonify(status), 200 if status['ready'] else 503
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Per-stage timing histograms and counters in the Prometheus text format"""
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
 @app.route('/api/download-youtube', methods=['POST'])
 def download_youtube():
     """
@@ -151,7 +198,8 @@ def process_video():
         timestamp = int(time.time())
         video_filename = f"{timestamp}_{video_file.filename}"
         video_path = UPLOAD_FOLDER / video_filename
-        video_file.save(str(video_path))
+        with REGISTRY.timer('file_write', target='upload'):
+            video_file.save(str(video_path))
 
         return jsonify({
             'success': True,
@@ -162,6 +210,60 @@ def process_video():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/stream-events', methods=['POST'])
+def stream_video_events():
+    """
+    Streams the merged events of a video while it is being analysed
+    Expects: multipart/form-data with 'video' file or 'video_filename' (pre-downloaded), optional 'profile'
+    Returns: NDJSON, one event per line, or Server-Sent Events with format=sse
+             (or Accept: text/event-stream)
+    """
+    if not PIPELINE_AVAILABLE:
+        return jsonify({'error': 'Pipeline modules not available'}), 503
+
+    profile = request.form.get('profile', DEFAULT_PROFILE)
+    if profile not in PROFILES:
+        return jsonify({'error': f"Unknown profile '{profile}', expected one of: {', '.join(PROFILES)}"}), 400
+
+    if 'video_filename' in request.form:
+        video_path = UPLOAD_FOLDER / request.form.get('video_filename', '')
+        if not request.form.get('video_filename') or not video_path.exists():
+            return jsonify({'error': 'Downloaded video file not found'}), 400
+    else:
+        if 'video' not in request.files or request.files['video'].filename == '':
+            return jsonify({'error': 'No video file provided'}), 400
+        video_file = request.files['video']
+        video_path = UPLOAD_FOLDER / f"{int(time.time())}_{video_file.filename}"
+        with REGISTRY.timer('file_write', target='upload'):
+            video_file.save(str(video_path))
+
+    sse = request.form.get('format') == 'sse' or 'text/event-stream' in request.headers.get('Accept', '')
+
+    def encode(kind, payload):
+        data = json.dumps(payload)
+        return f"event: {kind}\ndata: {data}\n\n" if sse else data + "\n"
+
+    def generate():
+        # Headers are already sent, so a failure mid-video is reported as the last record
+        count = 0
+        events = stream_events(str(video_path), profile=profile, workers=PIPELINE_WORKERS,
+                               backend=DETECTOR_BACKEND, **DETECTOR_OPTIONS)
+        try:
+            for event in events:
+                count += 1
+                yield encode('event', {'frameIndex': event.frameIndex, 'event': event.event})
+            yield encode('done', {'done': True, 'events_count': count})
+        except Exception as e:
+            print(f"❌ Error streaming events: {e}", flush=True)
+            yield encode('error', {'error': str(e)})
+        finally:
+            # The client disconnected: cancel the remaining segments instead of finishing the video
+            events.close()
+
+    return Response(stream_with_context(generate()),
+                    mimetype='text/event-stream' if sse else 'application/x-ndjson',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/api/generate-commentary', methods=['POST'])
 def generate_commentary():
     """
@@ -198,13 +300,14 @@ You must ensure that your commentary can be spoken at a normal human pace withou
 Do not provide any text other than the commentary"""
 
         # Generate commentary using Claude
-        response = anthropic_client.messages.create(
-            model=CLAUDE_MODEL,
-            max_tokens=MAX_TOKENS_COMMENTARY,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        )
+        with REGISTRY.timer('llm', call='generate_commentary'):
+            response = anthropic_client.messages.create(
+                model=CLAUDE_MODEL,
+                max_tokens=MAX_TOKENS_COMMENTARY,
+                messages=[
+                    {"role": "user", "content": prompt}
+                ]
+            )
 
         commentary_text = response.content[0].text
 
@@ -245,13 +348,14 @@ Current frame:
 Provide 1-2 sentences of live commentary."""
 
         # Generate streaming response
-        response = anthropic_client.messages.create(
-            model=CLAUDE_MODEL,
-            max_tokens=MAX_TOKENS_STREAM,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        )
+        with REGISTRY.timer('llm', call='stream_commentary'):
+            response = anthropic_client.messages.create(
+                model=CLAUDE_MODEL,
+                max_tokens=MAX_TOKENS_STREAM,
+                messages=[
+                    {"role": "user", "content": prompt}
+                ]
+            )
 
         commentary_text = response.content[0].text
 
@@ -296,13 +400,14 @@ Generate exciting commentary that describes:
 
 Keep it under 5 sentences."""
 
-        response = anthropic_client.messages.create(
-            model=CLAUDE_MODEL,
-            max_tokens=MAX_TOKENS_RALLY,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        )
+        with REGISTRY.timer('llm', call='analyze_rally'):
+            response = anthropic_client.messages.create(
+                model=CLAUDE_MODEL,
+                max_tokens=MAX_TOKENS_RALLY,
+                messages=[
+                    {"role": "user", "content": prompt}
+                ]
+            )
 
         analysis = response.content[0].text
 
@@ -381,11 +486,12 @@ Rules:
 - Space segments 3-8 seconds apart based on natural pauses
 - Return ONLY the JSON array, nothing else"""
 
-    response = anthropic_client.messages.create(
-        model=CLAUDE_MODEL,
-        max_tokens=4000,
-        messages=[{"role": "user", "content": prompt}]
-    )
+    with REGISTRY.timer('llm', call='parse_commentary_script_to_segments'):
+        response = anthropic_client.messages.create(
+            model=CLAUDE_MODEL,
+            max_tokens=4000,
+            messages=[{"role": "user", "content": prompt}]
+        )
 
     response_text = response.content[0].text.strip()
     print(f"📝 Segmentation response: {response_text[:300]}...")
@@ -447,13 +553,14 @@ Rules:
 - Use plain language, no markdown or special characters
 - Return ONLY the JSON array, nothing else"""
 
-    response = anthropic_client.messages.create(
-        model=CLAUDE_MODEL,
-        max_tokens=2048,
-        messages=[
-            {"role": "user", "content": prompt}
-        ]
-    )
+    with REGISTRY.timer('llm', call='generate_commentary_for_video'):
+        response = anthropic_client.messages.create(
+            model=CLAUDE_MODEL,
+            max_tokens=2048,
+            messages=[
+                {"role": "user", "content": prompt}
+            ]
+        )
 
     response_text = response.content[0].text.strip()
     print(f"📝 Raw Claude response: {response_text[:300]}...")
@@ -503,17 +610,18 @@ def generate_audio_commentary(commentary_segments, preferences):
 
             print(f"🎙️ Generating audio segment {i+1}/{len(commentary_segments)} at {timestamp}s: {clean_text[:50]}...")
 
-            # Generate audio for this segment
-            audio_stream = elevenlabs_client.text_to_speech.convert(
-                text=clean_text,
-                voice_id=voice,
-                model_id="eleven_monolingual_v1"
-            )
+            # Generate audio for this segment (the request runs until the last chunk is read)
+            with REGISTRY.timer('tts'):
+                audio_stream = elevenlabs_client.text_to_speech.convert(
+                    text=clean_text,
+                    voice_id=voice,
+                    model_id="eleven_monolingual_v1"
+                )
 
-            # Collect audio chunks into bytes
-            segment_audio_bytes = b""
-            for chunk in audio_stream:
-                segment_audio_bytes += chunk
+                # Collect audio chunks into bytes
+                segment_audio_bytes = b""
+                for chunk in audio_stream:
+                    segment_audio_bytes += chunk
 
             audio_segments.append({
                 'timestamp': timestamp,
@@ -549,10 +657,14 @@ def generate_full_commentary():
             'style': request.form.get('style', 'professional'),
             'energy': request.form.get('energy', 'medium'),
             'voice': request.form.get('voice', 'Adam'),
-            'duration': request.form.get('duration', '60')
+            'duration': request.form.get('duration', '60'),
+            'profile': request.form.get('profile', DEFAULT_PROFILE)
         }
         print(f"📝 Received preferences: {preferences}", flush=True)
 
+        if PIPELINE_AVAILABLE and preferences['profile'] not in PROFILES:
+            return jsonify({'error': f"Unknown profile '{preferences['profile']}', expected one of: {', '.join(PROFILES)}"}), 400
+
         # Check if video_filename is provided (for pre-downloaded videos)
         timestamp = int(time.time())
 
@@ -595,7 +707,8 @@ def generate_full_commentary():
             video_filename = f"{timestamp}_{video_file.filename}"
             video_path = UPLOAD_FOLDER / video_filename
             print(f"💾 Saving video to: {video_path}", flush=True)
-            video_file.save(str(video_path))
+            with REGISTRY.timer('file_write', target='upload'):
+                video_file.save(str(video_path))
             print(f"✅ Video saved successfully", flush=True)
 
         # Step 1: Process video frames to extract events
@@ -606,13 +719,16 @@ def generate_full_commentary():
         if PIPELINE_AVAILABLE:
             print("🎬 Starting process_frames() - YOU SHOULD SEE FRAME OUTPUT BELOW:", flush=True)
             print("-" * 80, flush=True)
-            raw_json = process_frames(str(video_path))
+            raw_json = process_frames(str(video_path), profile=preferences['profile'], workers=PIPELINE_WORKERS,
+                                      backend=DETECTOR_BACKEND,
+                                      export_path=UPLOAD_FOLDER / f"{timestamp}_events.bkev",
+                                      compression=EVENTS_COMPRESSION, **DETECTOR_OPTIONS)
             print("-" * 80, flush=True)
             print("✅ process_frames() completed - Extracted events from video", flush=True)
 
             # Save JSON for debugging
             json_output_path = UPLOAD_FOLDER / f"{timestamp}_events.json"
-            with open(json_output_path, 'w') as f:
+            with REGISTRY.timer('file_write', target='events'), open(json_output_path, 'w') as f:
                 f.write(raw_json)
             print(f"📝 Saved events to {json_output_path}", flush=True)
 
@@ -620,12 +736,13 @@ def generate_full_commentary():
             print("🤖 Generating commentary with Claude based on video analysis...", flush=True)
             persona = f"{preferences['style']} tennis commentator with {preferences['energy']} energy"
             assert generate_commentary_from_events is not None, "Pipeline should be available"
-            commentary_script = generate_commentary_from_events(raw_json, persona)
+            with REGISTRY.timer('llm', call='generate_commentary_from_events'):
+                commentary_script = generate_commentary_from_events(raw_json, persona)
             print(f"✅ Generated commentary script", flush=True)
 
             # Save script for debugging
             script_output_path = UPLOAD_FOLDER / f"{timestamp}_script.txt"
-            with open(script_output_path, 'w') as f:
+            with REGISTRY.timer('file_write', target='script'), open(script_output_path, 'w') as f:
                 f.write(commentary_script)
             print(f"📝 Saved script to {script_output_path}", flush=True)
 
@@ -660,7 +777,7 @@ def generate_full_commentary():
                     print(f"💾 Saving audio segment {i} to: {audio_path}")
                     print(f"   Audio data size: {len(segment['audio'])} bytes")
 
-                    with open(audio_path, 'wb') as f:
+                    with REGISTRY.timer('file_write', target='audio'), open(audio_path, 'wb') as f:
                         bytes_written = f.write(segment['audio'])
                         print(f"   Wrote {bytes_written} bytes to disk")
 
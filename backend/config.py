@@ -20,6 +20,23 @@ DEBUG = os.getenv('FLASK_DEBUG', 'True').lower() == 'true'
 # Model configuration
 MODEL_PATH = BASE_DIR.parent / 'yolov8m.pt'
 
+# Video analysis: >1 splits each video into segments processed in parallel processes
+PIPELINE_WORKERS = int(os.getenv('PIPELINE_WORKERS', '1'))
+# Detector inference backend: torch, onnx or onnx-int8 (see src/vision/export.py)
+DETECTOR_BACKEND = os.getenv('DETECTOR_BACKEND', 'torch')
+# Detector savings passed to process_video, all off by default (see README):
+# DETECTOR_MAX_STRIDE > 1 lets the tracker fill frames between detections while the ball is slow or absent,
+# DETECTOR_ROI_SEARCH looks for a tracked ball in a crop around its prediction,
+# DETECTOR_MOTION_GATE skips frames where nothing on court moved
+DETECTOR_OPTIONS = {
+    'max_stride': int(os.getenv('DETECTOR_MAX_STRIDE', '1')),
+    'roi_search': os.getenv('DETECTOR_ROI_SEARCH', 'False').lower() == 'true',
+    'motion_gate': os.getenv('DETECTOR_MOTION_GATE', 'False').lower() == 'true',
+}
+# Binary event export next to the JSON: deflate, zstd (needs zstandard) or none
+EVENTS_COMPRESSION = os.getenv('EVENTS_COMPRESSION', 'deflate').lower()
+EVENTS_COMPRESSION = None if EVENTS_COMPRESSION == 'none' else EVENTS_COMPRESSION
+
 # Commentary styles
 COMMENTARY_STYLES = ['professional', 'casual', 'enthusiastic', 'dramatic']
 
@@ -10,7 +10,10 @@ if __name__ == '__main__':
     print("📖 API Documentation: See README.md")
     print("\n✅ Available endpoints:")
     print("   GET  /api/health")
+    print("   GET  /api/ready")
+    print("   GET  /api/metrics")
     print("   POST /api/process-video")
+    print("   POST /api/stream-events")
     print("   POST /api/generate-commentary")
     print("   POST /api/stream-commentary")
     print("   POST /api/analyze-rally")
@@ -0,0 +1,147 @@
+"""
+Parity and throughput of the detector backends in vision.models.
+
+Runs the same frames through every backend with the settings process_video
+uses (classes person + ball, CONF_BALL, imgsz 1280 by default). Detections
+are matched against the PyTorch backend per class at IoU >= 0.5, and
+frames per second are reported for each backend.
+
+Export the ONNX weights first (see src/vision/export.py). Backends whose
+weights are missing are skipped.
+
+Usage:
+    python benchmarks/bench_detectors.py --video assets/videos/tennis2.mp4 --frames 64
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from vision.core import CONF_BALL
+from vision.models import BACKENDS, MODEL_NAME, TORCH, SharedModel
+
+# --- CONFIG ---
+DEFAULT_VIDEO = str(PROJECT_ROOT / "assets" / "videos" / "tennis2.mp4")
+DEFAULT_FRAMES = 64
+DEFAULT_BATCH = 4
+MATCH_IOU = 0.5
+CLASSES = {0: "person", 32: "ball"}
+
+
+def sample_frames(path, count):
+    cap = cv2.VideoCapture(path)
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    if not cap.isOpened() or total <= 0:
+        raise SystemExit(f"❌ Could not open video: {path}")
+
+    frames = []
+    for index in np.linspace(0, total - 1, min(count, total)).astype(int):
+        cap.set(cv2.CAP_PROP_POS_FRAMES, int(index))
+        ret, frame = cap.read()
+        if ret: frames.append(frame)
+    cap.release()
+    return frames
+
+
+def run_backend(model, frames, imgsz, batch):
+    # One untimed call pays for allocation and kernel selection
+    model(frames[:batch], classes=list(CLASSES), conf=CONF_BALL, imgsz=imgsz, verbose=False)
+
+    detections = []
+    start = time.perf_counter()
+    for i in range(0, len(frames), batch):
+        for r in model(frames[i:i + batch], classes=list(CLASSES), conf=CONF_BALL, imgsz=imgsz, verbose=False):
+            detections.append((r.boxes.xyxy.cpu().numpy(), r.boxes.cls.cpu().numpy().astype(int),
+                               r.boxes.conf.cpu().numpy()))
+    return detections, len(frames) / (time.perf_counter() - start)
+
+
+def iou_matrix(a, b):
+    tl = np.maximum(a[:, None, :2], b[None, :, :2])
+    br = np.minimum(a[:, None, 2:], b[None, :, 2:])
+    inter = np.prod(np.clip(br - tl, 0, None), axis=2)
+    area_a = np.prod(a[:, 2:] - a[:, :2], axis=1)
+    area_b = np.prod(b[:, 2:] - b[:, :2], axis=1)
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-9)
+
+
+def match(reference, candidate, class_id):
+    # Greedy one-to-one matching by IoU, highest first
+    ref_boxes, ref_cls, ref_conf = reference
+    cand_boxes, cand_cls, cand_conf = candidate
+    r, c = ref_cls == class_id, cand_cls == class_id
+    if not np.any(r) or not np.any(c):
+        return int(r.sum()), int(c.sum()), [], []
+
+    iou = iou_matrix(ref_boxes[r], cand_boxes[c])
+    ious, conf_diffs = [], []
+    while iou.size and iou.max() >= MATCH_IOU:
+        i, j = np.unravel_index(np.argmax(iou), iou.shape)
+        ious.append(iou[i, j])
+        conf_diffs.append(abs(ref_conf[r][i] - cand_conf[c][j]))
+        iou[i, :], iou[:, j] = -1, -1
+    return int(r.sum()), int(c.sum()), ious, conf_diffs
+
+
+def parity(reference, candidate):
+    report = {}
+    for class_id, name in CLASSES.items():
+        n_ref = n_cand = 0
+        ious, conf_diffs = [], []
+        for ref, cand in zip(reference, candidate):
+            a, b, i, d = match(ref, cand, class_id)
+            n_ref, n_cand = n_ref + a, n_cand + b
+            ious += i
+            conf_diffs += d
+        report[name] = {
+            'reference': n_ref,
+            'recall': len(ious) / n_ref if n_ref else 1.0,
+            'precision': len(ious) / n_cand if n_cand else 1.0,
+            'mean_iou': float(np.mean(ious)) if ious else None,
+            'max_conf_diff': float(np.max(conf_diffs)) if conf_diffs else None,
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Detector backend parity and throughput")
+    parser.add_argument("--video", default=DEFAULT_VIDEO)
+    parser.add_argument("--weights", default=MODEL_NAME)
+    parser.add_argument("--frames", type=int, default=DEFAULT_FRAMES)
+    parser.add_argument("--batch", type=int, default=DEFAULT_BATCH)
+    parser.add_argument("--imgsz", type=int, default=1280)
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    args = parser.parse_args()
+
+    frames = sample_frames(args.video, args.frames)
+    print(f"🎾 {len(frames)} frames, batch {args.batch}, imgsz {args.imgsz}\n")
+
+    results = {}
+    for backend in [TORCH] + [b for b in args.backends if b != TORCH]:
+        model = SharedModel(args.weights, backend)
+        if backend != TORCH and not Path(model.path).exists():
+            print(f"⏭️  {backend:<10} skipped, {model.path} not exported")
+            continue
+        model.load()
+        detections, fps = run_backend(model, frames, args.imgsz, args.batch)
+        results[backend] = detections
+        print(f"⚡ {backend:<10} {fps:>7.2f} fps", flush=True)
+
+    print()
+    for backend, detections in results.items():
+        if backend == TORCH: continue
+        for name, r in parity(results[TORCH], detections).items():
+            mean_iou = f"{r['mean_iou']:.3f}" if r['mean_iou'] is not None else "-"
+            conf = f"{r['max_conf_diff']:.3f}" if r['max_conf_diff'] is not None else "-"
+            print(f"🔍 {backend:<10} {name:<6} ref {r['reference']:>5}  recall {r['recall']:.3f}  "
+                  f"precision {r['precision']:.3f}  IoU {mean_iou}  max conf diff {conf}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Cost of the event stage: streaming testers (one test_event per tester per
+frame on a FrameStack, sharing one FeatureStage) against the offline batch pass (analyse_track, one
+vectorised test_track per tester over the whole TrackTable). The batch
+pass is reported without building the EventFrame list, with the full list,
+and merged the way process_frames uses it; building EventFrames dominates
+once detection is vectorised.
+
+Runs on a rally from logic.trajectories, independent of YOLO and video
+decode, and checks that both produce the same EventFrames. --per-tester
+adds each tester on its own: time per frame and events found per second.
+
+Usage:
+    python benchmarks/bench_events.py --frames 60000
+    python benchmarks/bench_events.py --frames 60000 --per-tester
+"""
+import argparse
+import contextlib
+import copy
+import io
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from data.eventframe import EventFrame
+from data.framestack import FrameStack
+from logic.events import EventTesters, required_window, tester_name
+from logic.features import FeatureStage, TrackFeatures, required_features
+from logic.pipeline import analyse_track
+from logic.trajectories import random_rally
+
+# --- CONFIG ---
+DEFAULT_FRAMES = 60000      # ~17 minutes at 60 fps
+SEED = 0
+
+
+def run_streaming(track, testers=EventTesters.ALL):
+    # The per-frame loop of iter_events: features once per frame, shared by every tester
+    testers = copy.deepcopy(testers)
+    stage = FeatureStage(required_features(testers))
+    stack = FrameStack(60, capacity=max(required_window(testers), stage.window))
+    events = []
+    for row in track:
+        stack.push(row)
+        features = stage.update(stack)
+        for tester in testers:
+            result = tester.test_event(stack, features)
+            if result is not None:
+                events.append(EventFrame(row.frame, result.to_string()))
+    return events
+
+
+def run_testers(track, testers=EventTesters.ALL):
+    # Just the vectorised detection, without building the EventFrame list
+    testers = copy.deepcopy(testers)
+    features = TrackFeatures(track, required_features(testers))
+    return [tester.test_track(track, features) for tester in testers]
+
+
+def run_batch(track, merge=False):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return analyse_track(track, copy.deepcopy(EventTesters.ALL), merge=merge)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def report_testers(track):
+    # Each tester alone, its features included: streaming and batch cost, and events found per second
+    print(f"\n{'tester':<16} {'events':>7} {'stream us/f':>12} {'events/s':>10} {'batch us/f':>11} {'events/s':>11}")
+    for tester in EventTesters.ALL:
+        streaming_s, events = timed(run_streaming, track, [tester])
+        batch_s, masks = timed(run_testers, track, [tester])
+        found = sum(int(mask.sum()) for pairs in masks for mask, _ in pairs)
+        assert found == len(events)
+        print(f"{tester_name(tester):<16} {found:>7} {streaming_s * 1e6 / len(track):>12.2f} "
+              f"{found / streaming_s:>10.0f} {batch_s * 1e6 / len(track):>11.3f} {found / batch_s:>11.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Event stage benchmark, streaming vs batch")
+    parser.add_argument("--frames", type=int, default=DEFAULT_FRAMES)
+    parser.add_argument("--per-tester", action="store_true", help="Also time each tester on its own")
+    args = parser.parse_args()
+
+    trajectory = random_rally(args.frames, np.random.default_rng(SEED))
+    track = trajectory.track
+    print(f"🎾 {args.frames} frames, {len(trajectory.of_kind('shot'))} shots, {len(EventTesters.ALL)} testers\n")
+
+    streaming_s, streamed = timed(run_streaming, track)
+    testers_s, _ = timed(run_testers, track)
+    batch_s, batched = timed(run_batch, track)
+    merged_s, merged = timed(run_batch, track, True)
+    print(f"{'streaming':<16} {streaming_s * 1e6 / args.frames:>8.1f} us/frame  ({len(streamed)} events)")
+    print(f"{'batch testers':<16} {testers_s * 1e6 / args.frames:>8.1f} us/frame  ({streaming_s / testers_s:.0f}x)")
+    print(f"{'batch + events':<16} {batch_s * 1e6 / args.frames:>8.1f} us/frame  ({streaming_s / batch_s:.0f}x)")
+    print(f"{'batch + merged':<16} {merged_s * 1e6 / args.frames:>8.1f} us/frame  ({streaming_s / merged_s:.0f}x, "
+          f"{len(merged)} events as process_frames keeps them)")
+    print(f"\nIdentical events: {batched == streamed}")
+    if args.per_tester:
+        report_testers(track)
+
+
+if __name__ == "__main__":
+    main()
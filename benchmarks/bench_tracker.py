@@ -0,0 +1,107 @@
+"""
+Per-frame cost of BallTracker.update, independent of YOLO and video decode.
+
+Feeds a synthetic bouncing ball with dropouts and clutter candidates through
+the tracker at several hypothesis counts, and through the old per-candidate
+np.linalg.norm loop for comparison.
+
+Usage:
+    python benchmarks/bench_tracker.py --frames 20000 --clutter 4
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from vision.tracker import BallTracker, MAX_COAST_FRAMES, MAX_DIST_ERROR
+
+# --- CONFIG ---
+DEFAULT_FRAMES = 20000
+DEFAULT_CLUTTER = 4     # Max false candidates per frame
+SEED = 0
+
+
+def synthetic_candidates(num_frames, clutter, rng):
+    frames = []
+    x, y, vx, vy = 900.0, 500.0, 14.0, -6.0
+    for _ in range(num_frames):
+        x, y = x + vx, y + vy
+        if not 0 < x < 1900: vx = -vx
+        if not 100 < y < 900: vy = -vy
+
+        positions, confs = [], []
+        if rng.random() > 0.2:
+            positions.append((int(x), int(y)))
+            confs.append(rng.random())
+        for _ in range(rng.integers(0, clutter + 1)):
+            positions.append((int(rng.uniform(0, 1920)), int(rng.uniform(0, 1080))))
+            confs.append(rng.random())
+        frames.append((np.array(positions, dtype=float).reshape(-1, 2), np.array(confs)))
+    return frames
+
+
+def run_reference(frames):
+    # The loop that used to live inside process_video
+    track_pos, track_vel, frames_since_seen = None, (0, 0), 0
+    for positions, confs in frames:
+        candidates = [{'pos': tuple(p), 'conf': c} for p, c in zip(positions, confs)]
+        predicted_pos = None
+        if track_pos is not None:
+            predicted_pos = (track_pos[0] + track_vel[0], track_pos[1] + track_vel[1])
+        matched = None
+        if predicted_pos is not None:
+            best_dist = float('inf')
+            for cand in candidates:
+                dist = np.linalg.norm(np.array(cand['pos']) - np.array(predicted_pos))
+                if dist < best_dist and dist < MAX_DIST_ERROR:
+                    best_dist, matched = dist, cand
+        elif candidates:
+            matched = max(candidates, key=lambda c: c['conf'])
+        if matched:
+            new_pos = matched['pos']
+            if track_pos is not None:
+                track_vel = (0.7 * (new_pos[0] - track_pos[0]) + 0.3 * track_vel[0],
+                             0.7 * (new_pos[1] - track_pos[1]) + 0.3 * track_vel[1])
+            track_pos, frames_since_seen = new_pos, 0
+        elif track_pos is not None and frames_since_seen < MAX_COAST_FRAMES:
+            track_pos = (int(predicted_pos[0]), int(predicted_pos[1]))
+            frames_since_seen += 1
+        else:
+            track_pos, track_vel, frames_since_seen = None, (0, 0), 0
+
+
+def run_tracker(frames, hypotheses):
+    tracker = BallTracker(max_hypotheses=hypotheses)
+    for positions, confs in frames:
+        tracker.update(positions, confs)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BallTracker microbenchmark")
+    parser.add_argument("--frames", type=int, default=DEFAULT_FRAMES)
+    parser.add_argument("--clutter", type=int, default=DEFAULT_CLUTTER)
+    args = parser.parse_args()
+
+    frames = synthetic_candidates(args.frames, args.clutter, np.random.default_rng(SEED))
+    print(f"🎾 {args.frames} frames, up to {args.clutter} clutter candidates per frame\n")
+
+    elapsed = timed(run_reference, frames)
+    print(f"{'reference loop':<20} {elapsed * 1e6 / args.frames:>8.1f} us/frame")
+    for hypotheses in (1, 2, 3, 4):
+        elapsed = timed(run_tracker, frames, hypotheses)
+        print(f"{f'BallTracker H={hypotheses}':<20} {elapsed * 1e6 / args.frames:>8.1f} us/frame")
+
+
+if __name__ == "__main__":
+    main()
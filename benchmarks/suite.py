@@ -0,0 +1,343 @@
+"""
+Headless benchmark suite with recorded baselines.
+
+Times process_video on synthetic footage (stand-in colour detector, so no
+weights, test videos or network are needed), FrameUnskew, FrameStack, the
+shared feature stage and every event tester, streaming and batch, then
+compares each case with benchmarks/baselines.json. Exits with status 1 when
+a case is slower than its baseline by more than the threshold.
+
+On another machine the baselines are scaled by a fixed reference workload
+timed in the same run, so numbers recorded elsewhere still mean something;
+on the machine that recorded them they are compared as they are.
+
+Usage:
+    python benchmarks/suite.py                  # Compare against the baselines
+    python benchmarks/suite.py --update         # Record new baselines
+    python benchmarks/suite.py --only tester    # One group: process_video, frame_unskew, frame_stack, features, tester
+"""
+import argparse
+import contextlib
+import copy
+import gc
+import io
+import json
+import math
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+import synthetic
+import vision.calibration as calibration
+from data.Coord import Coord
+from data.Court import Court
+from data.framestack import FrameStack
+from data.tracktable import TrackTable
+from logic.events import EventTesters, required_window, tester_name
+from logic.features import FeatureStage, TrackFeatures, required_features
+from logic.perspective import FrameUnskew, TENNIS_COURT_LENGTH, TENNIS_COURT_SINGLES_WIDTH
+from utils.metrics import REGISTRY
+from vision.core import process_video
+from vision.models import register_model
+
+# --- CONFIG ---
+BASELINES = Path(__file__).resolve().parent / "baselines.json"
+REGRESSION_THRESHOLD = 0.30     # Fraction slower than the (scaled) baseline that fails the run
+NOISE_FLOOR_US = 0.25           # Differences below this per unit never fail, whatever the ratio
+REPEATS = 5                     # Best of, timings on a shared machine only ever get slower
+VIDEO_SECONDS = 10
+TRACK_FRAMES = 20000            # ~5.5 minutes at 60 fps
+DROPOUT = 0.03                  # Frames where the ball goes missing
+SEED = 0
+STAGES = ('decode', 'detect', 'track')     # Reported separately for process_video
+
+
+def reference_workload():
+    # Fixed mix of interpreter and numpy work, the yardstick for this machine
+    total = 0.0
+    for i in range(200000):
+        total += math.sqrt(i) * 0.5
+    values = np.random.default_rng(SEED).random(1_000_000)
+    np.sort(values)
+    return total
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+def best_of(fn, repeats=REPEATS):
+    # Each run returns its own elapsed seconds, so setup stays outside the timing
+    return min(without_gc(fn) for _ in range(repeats))
+
+def without_gc(fn):
+    # Like timeit: garbage left by an earlier case is not collected on this one's clock
+    gc.collect()
+    gc.disable()
+    try:
+        return fn()
+    finally:
+        gc.enable()
+
+
+# --- CASES ---
+# Each one returns {case name: microseconds per unit}
+
+def bench_process_video(directory, seconds):
+    video = Path(directory) / "synthetic.mp4"
+    num_frames = synthetic.write_video(video, seconds, seed=SEED)
+
+    def run():
+        REGISTRY.reset()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in process_video(str(video), cache=False):
+                pass
+        elapsed = time.perf_counter() - start
+        # Stage totals from the metrics, decode overlaps detection on its own thread
+        return [elapsed] + [REGISTRY.histogram(stage).sum for stage in STAGES]
+
+    runs = [without_gc(run) for _ in range(REPEATS)]
+    names = ['process_video'] + [f'process_video:{stage}' for stage in STAGES]
+    return {name: min(times) * 1e6 / num_frames for name, times in zip(names, zip(*runs))}
+
+def bench_frame_unskew(num_calls=20000):
+    corners = [list(c) for c in synthetic.court_corners()]
+    rng = np.random.default_rng(SEED)
+    points = rng.uniform((0, 150), (1280, 720), (num_calls, 3, 2)).tolist()
+    heights = rng.uniform(0, 1, (num_calls, 3)).tolist()
+
+    def build():
+        start = time.perf_counter()
+        for _ in range(num_calls):
+            FrameUnskew(corners)
+        return time.perf_counter() - start
+
+    def unskew():
+        # Ball and both players of one frame, the way Frame.map calls it
+        normaliser = FrameUnskew(corners)
+        start = time.perf_counter()
+        for frame_points, frame_heights in zip(points, heights):
+            normaliser.unskew_coords(frame_points, frame_heights)
+        return time.perf_counter() - start
+
+    return {
+        'frame_unskew_init': best_of(build) * 1e6 / num_calls,
+        'frame_unskew_coords': best_of(unskew) * 1e6 / num_calls,
+    }
+
+def bench_frame_stack(track):
+    window = required_window(EventTesters.ALL)
+
+    def run():
+        stack = FrameStack(synthetic.FPS, capacity=window)
+        start = time.perf_counter()
+        for row in track:
+            stack.push(row)
+            stack.takeFrames(window)
+        return time.perf_counter() - start
+
+    return {'frame_stack_push': best_of(run) * 1e6 / len(track)}
+
+def bench_features(track):
+    names = required_features(EventTesters.ALL)
+
+    def streaming():
+        stage = FeatureStage(names)
+        stack = FrameStack(synthetic.FPS, capacity=stage.window)
+        elapsed = 0.0
+        for row in track:
+            stack.push(row)
+            start = time.perf_counter()
+            stage.update(stack)
+            elapsed += time.perf_counter() - start
+        return elapsed
+
+    def batch():
+        start = time.perf_counter()
+        TrackFeatures(track, names)
+        return time.perf_counter() - start
+
+    return {
+        'features_stream': best_of(streaming) * 1e6 / len(track),
+        'features_track': best_of(batch) * 1e6 / len(track),
+    }
+
+def bench_testers(track):
+    results = {}
+    for original in EventTesters.ALL:
+        name = tester_name(original)
+
+        def streaming():
+            # Only the tester's own calls are timed, the stack and its features are shared setup
+            tester = copy.deepcopy(original)
+            stage = FeatureStage(tester.features)
+            stack = FrameStack(synthetic.FPS, capacity=max(required_window([tester]), stage.window))
+            elapsed = 0.0
+            for row in track:
+                stack.push(row)
+                features = stage.update(stack)
+                start = time.perf_counter()
+                tester.test_event(stack, features)
+                elapsed += time.perf_counter() - start
+            return elapsed
+
+        def batch():
+            tester = copy.deepcopy(original)
+            features = TrackFeatures(track, tester.features)
+            start = time.perf_counter()
+            tester.test_track(track, features)
+            return time.perf_counter() - start
+
+        results[f'tester_stream:{name}'] = best_of(streaming) * 1e6 / len(track)
+        results[f'tester_track:{name}'] = best_of(batch) * 1e6 / len(track)
+    return results
+
+
+def rally_track(num_frames, rng):
+    # The synthetic rally in court metres, as the normalised track the event stage reads
+    court = Court(Coord(0.0, 0.0), Coord(0.0, TENNIS_COURT_SINGLES_WIDTH),
+                  Coord(TENNIS_COURT_LENGTH, TENNIS_COURT_SINGLES_WIDTH), Coord(TENNIS_COURT_LENGTH, 0.0))
+    ball, _, players = synthetic.rally(num_frames, rng)
+    track = TrackTable()
+    for i in range(num_frames):
+        # rally() has x across the court, the track has x along it
+        x, y = ball[i]
+        point = (y, x) if rng.random() > DROPOUT else None
+        (x1, y1), (x2, y2) = players[i]
+        track.append(i + 1, point, (y1, x1), (y2, x2), court)
+    return track
+
+
+# --- BASELINES ---
+
+def load_baselines(path=BASELINES):
+    if not path.exists():
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+def machine():
+    return {'python': platform.python_version(), 'platform': platform.platform(),
+            'processor': platform.processor()}
+
+def save_baselines(results, reference_s, path=BASELINES):
+    data = {
+        'reference_seconds': reference_s,
+        'machine': machine(),
+        'cases': {name: float(f"{us:.4g}") for name, us in sorted(results.items())},
+    }
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+
+def baseline_scale(baselines, reference_s):
+    # The reference is itself noisy, only worth its error when the hardware really differs
+    if baselines.get('machine') == machine():
+        return 1.0
+    return reference_s / baselines['reference_seconds']
+
+def compare(results, baselines, reference_s, threshold, report=True):
+    """Names of the cases slower than their scaled baseline, printing one line per case."""
+    scale = baseline_scale(baselines, reference_s)
+    if report:
+        if scale == 1.0:
+            print("Same machine as the baselines, compared unscaled\n")
+        else:
+            print(f"Machine speed vs baseline: {1 / scale:.2f}x (reference workload {reference_s * 1e3:.0f} ms)\n")
+        print(f"{'case':<44} {'us/unit':>10} {'baseline':>10} {'change':>8}")
+
+    regressed = []
+    for name, us in results.items():
+        base = baselines['cases'].get(name)
+        if base is None:
+            line = f"{name:<44} {us:>10.4g} {'-':>10} {'new':>8}"
+        else:
+            expected = base * scale
+            change = us / expected - 1 if expected > 0 else 0.0
+            flag = ""
+            if change > threshold and us - expected > NOISE_FLOOR_US:
+                regressed.append(name)
+                flag = "  ❌"
+            line = f"{name:<44} {us:>10.4g} {expected:>10.4g} {change:>+8.0%}{flag}"
+        if report:
+            print(line)
+    return regressed
+
+def run_groups(groups, names):
+    """Times the reference workload and the named groups, returns (results, reference seconds, case -> group)."""
+    reference_s = best_of(lambda: timed(reference_workload))
+    results, owner = {}, {}
+    for group, run in groups:
+        if group not in names:
+            continue
+        print(f"⏱️ {group}", flush=True)
+        for case, us in run().items():
+            results[case], owner[case] = us, group
+    return results, reference_s, owner
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless benchmark suite with recorded baselines")
+    parser.add_argument("--update", action="store_true", help="Record the results as the new baselines")
+    parser.add_argument("--only", default=None, help="Run only the groups whose name contains this")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    parser.add_argument("--seconds", type=float, default=VIDEO_SECONDS, help="Length of the synthetic video")
+    parser.add_argument("--frames", type=int, default=TRACK_FRAMES, help="Length of the synthetic track")
+    args = parser.parse_args()
+
+    baselines = load_baselines()
+    if baselines is None and not args.update:
+        raise SystemExit(f"❌ No baselines at {BASELINES}, record them with --update")
+    track = rally_track(args.frames, np.random.default_rng(SEED))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Calibration results stay in the temporary directory, not in outputs/
+        calibration.CALIBRATION_DIR = tmp
+        register_model(synthetic.ColourDetector())
+        groups = [
+            ('process_video', lambda: bench_process_video(tmp, args.seconds)),
+            ('frame_unskew', bench_frame_unskew),
+            ('frame_stack', lambda: bench_frame_stack(track)),
+            ('features', lambda: bench_features(track)),
+            ('tester', lambda: bench_testers(track)),
+        ]
+        selected = {group for group, _ in groups if not args.only or args.only in group}
+        results, reference_s, owner = run_groups(groups, selected)
+
+        if not args.update:
+            # A busy machine slows everything at once: regressed groups get one more run, best of both counts
+            regressed = compare(results, baselines, reference_s, args.threshold, report=False)
+            if regressed:
+                print(f"🔁 {len(regressed)} case(s) over the threshold, running their groups again", flush=True)
+                again, _, _ = run_groups(groups, {owner[case] for case in regressed})
+                results = {case: min(us, again.get(case, us)) for case, us in results.items()}
+    print()
+
+    if args.update:
+        if args.only and baselines is not None:
+            # Partial runs keep the other recorded cases, rescaled to this run's reference
+            scale = baseline_scale(baselines, reference_s)
+            results = {**{k: v * scale for k, v in baselines['cases'].items()}, **results}
+        save_baselines(results, reference_s)
+        print(f"✅ Recorded {len(results)} baselines in {BASELINES}")
+        return
+
+    regressed = compare(results, baselines, reference_s, args.threshold)
+    if regressed:
+        print(f"\n❌ {len(regressed)} case(s) more than {args.threshold:.0%} slower than the baseline: "
+              f"{', '.join(regressed)}")
+        sys.exit(1)
+    print(f"\n✅ No case more than {args.threshold:.0%} slower than the baseline")
+
+
+if __name__ == "__main__":
+    main()
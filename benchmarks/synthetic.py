@@ -0,0 +1,163 @@
+"""
+Synthetic match footage for the benchmarks: a broadcast-style court with two
+players and a ball rallying between them, written to a video file, and a
+stand-in detector that finds them by colour. Together they run the whole
+vision pipeline offline, without model weights or test videos.
+
+The stand-in is far cheaper than YOLO, so process_video timings measure
+everything around inference: decode, calibration, zones, tracking, the
+generator itself.
+"""
+import math
+
+import cv2
+import numpy as np
+import torch
+from ultralytics.engine.results import Results
+
+# --- CONFIG ---
+FRAME_SIZE = (1280, 720)
+FPS = 60
+# Singles corners (tl, tr, br, bl) of the hardcoded 1080p court, scaled to FRAME_SIZE
+SINGLES_CORNERS = [(746, 257), (1183, 254), (1879, 836), (27, 841)]
+LENGTH, SINGLES, DOUBLES, SERVICE = 23.77, 8.23, 10.97, 6.40
+LINE_THICKNESS = 3
+RALLY_FRAMES = 70           # Baseline to baseline
+REST_FRAMES = 90            # Ball lying still between points
+MAX_HEIGHT = 90             # px, ball height at the top of its arc
+
+# BGR colours, far enough apart for the detector's thresholds to survive the codec
+GRASS = (60, 120, 50)
+LINES = (235, 235, 235)
+PLAYER = (40, 40, 200)
+BALL = (40, 235, 235)
+PLAYER_RANGE = ((0, 0, 140), (90, 90, 255))
+BALL_RANGE = ((0, 190, 190), (110, 255, 255))
+BALL_RADIUS = 5
+PLAYER_SIZE = (36, 110)     # px, width and height
+
+PERSON, SPORTS_BALL = 0, 32
+NAMES = {PERSON: 'person', SPORTS_BALL: 'sports ball'}
+
+
+def court_corners(size=FRAME_SIZE):
+    sx, sy = size[0] / 1920, size[1] / 1080
+    return [(x * sx, y * sy) for x, y in SINGLES_CORNERS]
+
+def court_matrix(size=FRAME_SIZE):
+    # Court metres (x across the singles court, y from the far baseline) -> pixels
+    model = np.float32([(0, 0), (SINGLES, 0), (SINGLES, LENGTH), (0, LENGTH)])
+    return cv2.getPerspectiveTransform(model, np.float32(court_corners(size)))
+
+def to_pixels(matrix, points):
+    return cv2.perspectiveTransform(np.float32(points).reshape(-1, 1, 2), matrix).reshape(-1, 2)
+
+def court_lines():
+    alley = (DOUBLES - SINGLES) / 2
+    net = LENGTH / 2
+    lines = [((-alley, 0), (SINGLES + alley, 0)), ((-alley, LENGTH), (SINGLES + alley, LENGTH))]
+    for x in (-alley, 0, SINGLES, SINGLES + alley):
+        lines.append(((x, 0), (x, LENGTH)))
+    for y in (net - SERVICE, net + SERVICE):
+        lines.append(((0, y), (SINGLES, y)))
+    lines.append(((SINGLES / 2, net - SERVICE), (SINGLES / 2, net + SERVICE)))
+    return lines
+
+def render_background(size=FRAME_SIZE, seed=0):
+    w, h = size
+    frame = np.full((h, w, 3), GRASS, dtype=np.uint8)
+    frame[:h // 7] = (90, 90, 90)                                       # Stands
+    cv2.rectangle(frame, (w // 48, h // 36), (w // 4, h // 10), (240, 240, 240), -1)   # Scoreboard
+    matrix = court_matrix(size)
+    for a, b in court_lines():
+        p, q = to_pixels(matrix, [a, b])
+        cv2.line(frame, tuple(np.round(p).astype(int)), tuple(np.round(q).astype(int)),
+                 LINES, LINE_THICKNESS, cv2.LINE_AA)
+    noise = np.random.default_rng(seed).normal(0, 3, frame.shape)
+    return np.clip(frame + noise, 0, 255).astype(np.uint8)
+
+def rally(num_frames, rng):
+    """
+    Ball and player positions per frame in court metres, plus the ball's
+    height in px: rallies baseline to baseline with a bounce on the way,
+    then the ball rests between points while the players stay put.
+    """
+    ball, heights, players = [], [], []
+    p1, p2 = [SINGLES / 2, -0.5], [SINGLES / 2, LENGTH + 0.5]
+    start = np.array([SINGLES / 2, 0.5])
+    i = 0
+    while i < num_frames:
+        shots = int(rng.integers(2, 8))
+        for shot in range(shots):
+            end = np.array([rng.uniform(0.5, SINGLES - 0.5), LENGTH - 0.5 if shot % 2 == 0 else 0.5])
+            for t in range(RALLY_FRAMES):
+                f = t / RALLY_FRAMES
+                pos = start + (end - start) * f
+                # Two arcs: over the net to the bounce at 70 %, then up to the racket
+                arc = math.sin(math.pi * f / 0.7) if f < 0.7 else 0.5 * math.sin(math.pi * (f - 0.7) / 0.6)
+                ball.append(tuple(pos))
+                heights.append(MAX_HEIGHT * arc)
+                # The receiver moves across to meet the ball, the hitter recovers to the middle
+                receiver, hitter = (p2, p1) if shot % 2 == 0 else (p1, p2)
+                receiver[0] += (end[0] - receiver[0]) * 0.05
+                hitter[0] += (SINGLES / 2 - hitter[0]) * 0.03
+                players.append((tuple(p1), tuple(p2)))
+            start = end
+        for _ in range(REST_FRAMES):
+            ball.append(tuple(start))
+            heights.append(0.0)
+            players.append((tuple(p1), tuple(p2)))
+        i = len(ball)
+    return ball[:num_frames], heights[:num_frames], players[:num_frames]
+
+def write_video(path, seconds, size=FRAME_SIZE, fps=FPS, seed=0):
+    """Renders `seconds` of rally to `path` (mp4v), returns the number of frames."""
+    num_frames = int(seconds * fps)
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*'mp4v'), fps, size)
+    if not writer.isOpened():
+        raise RuntimeError(f"Could not open a video writer for {path}")
+
+    background = render_background(size, seed)
+    matrix = court_matrix(size)
+    ball, heights, players = rally(num_frames, np.random.default_rng(seed))
+    pw, ph = PLAYER_SIZE
+    try:
+        for i in range(num_frames):
+            frame = background.copy()
+            for foot in to_pixels(matrix, players[i]):
+                x, y = int(foot[0]), int(foot[1])
+                cv2.rectangle(frame, (x - pw // 2, y - ph), (x + pw // 2, y), PLAYER, -1)
+            x, y = to_pixels(matrix, [ball[i]])[0]
+            cv2.circle(frame, (int(x), int(y - heights[i])), BALL_RADIUS, BALL, -1, cv2.LINE_AA)
+            writer.write(frame)
+    finally:
+        writer.release()
+    return num_frames
+
+
+class ColourDetector:
+    """
+    Called like a YOLO model: finds the player rectangles and the ball of
+    the synthetic footage by colour and returns ultralytics Results, so
+    detect_batch and the tracker see exactly what a real model hands them.
+    """
+
+    def __call__(self, frames, classes=None, conf=0.0, imgsz=None, verbose=False):
+        if isinstance(frames, np.ndarray):
+            frames = [frames]
+        return [self.detect(frame, classes, conf) for frame in frames]
+
+    def detect(self, frame, classes, conf):
+        boxes = []
+        for cls, (low, high), score, min_area in ((PERSON, PLAYER_RANGE, 0.9, 200),
+                                                  (SPORTS_BALL, BALL_RANGE, 0.6, 8)):
+            if classes is not None and cls not in classes or score < conf:
+                continue
+            mask = cv2.inRange(frame, low, high)
+            contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            for contour in contours:
+                x, y, w, h = cv2.boundingRect(contour)
+                if w * h >= min_area:
+                    boxes.append([x, y, x + w, y + h, score, cls])
+        data = torch.tensor(boxes, dtype=torch.float32).reshape(-1, 6)
+        return Results(frame, path="synthetic", names=NAMES, boxes=data)
@@ -6,5 +6,4 @@ class Ball:
     self.pos = pos
 
   def map(self, normaliser: FrameUnskew):
-    self.pos = normaliser.unskew_coords_to_coords(self.pos.to_vector())
-    return self
\ No newline at end of file
+    return Ball(normaliser.unskew_coords_to_coords(self.pos.to_vector()))
\ No newline at end of file
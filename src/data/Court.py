@@ -12,8 +12,10 @@ class Court:
     return [self.tl.to_vector(), self.tr.to_vector(), self.br.to_vector(), self.bl.to_vector()]
 
   def map(self, normaliser: FrameUnskew):
-    self.tl = normaliser.unskew_coords_to_coords(self.tl.to_vector())
-    self.tr = normaliser.unskew_coords_to_coords(self.tr.to_vector())
-    self.br = normaliser.unskew_coords_to_coords(self.br.to_vector())
-    self.bl = normaliser.unskew_coords_to_coords(self.bl.to_vector())
-    return self
\ No newline at end of file
+    # New object: the same pixel-space court is shared by every frame of a video
+    return Court(
+      normaliser.unskew_coords_to_coords(self.tl.to_vector()),
+      normaliser.unskew_coords_to_coords(self.tr.to_vector()),
+      normaliser.unskew_coords_to_coords(self.br.to_vector()),
+      normaliser.unskew_coords_to_coords(self.bl.to_vector())
+    )
\ No newline at end of file
@@ -7,5 +7,5 @@ class Player:
     self.name = name
 
   def map(self, normaliser: FrameUnskew):
-    self.pos = normaliser.unskew_coords(self.pos.to_vector())
-    return self
\ No newline at end of file
+    # New object: the vision side keeps reusing the pixel-space player
+    return Player(normaliser.unskew_coords_to_coords(self.pos.to_vector()), self.name)
\ No newline at end of file
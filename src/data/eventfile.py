@@ -0,0 +1,191 @@
+import json
+import mmap as _mmap
+import os
+import struct
+import zlib
+from dataclasses import asdict
+
+import numpy as np
+
+from utils.metrics import REGISTRY
+from .Coord import Coord
+from .Court import Court
+from .eventframe import EventFrame
+from .eventindex import EventIndex
+from .tracktable import COLUMNS, TrackTable
+
+# --- CONFIG ---
+MAGIC = b"BKEV"
+FORMAT_VERSION = 1
+ALIGN = 8                   # Arrays start on 8-byte boundaries, so a mapped file hands out aligned views
+DEFLATE_LEVEL = 6
+ZSTD_LEVEL = 3
+COMPRESSIONS = (None, "deflate", "zstd")
+
+# magic, version, flags (unused), header length
+_PREFIX = struct.Struct("<4sHHI")
+
+class EventFile:
+  """
+  Events (and optionally their track) read back from the binary format.
+
+  Event names are codes into a string table, so `frames` and `codes` are
+  plain arrays; `events()` builds EventFrames only when asked. Read from
+  an uncompressed file with mmap=True the arrays are views straight into
+  the mapped file, nothing is copied or parsed up front.
+  """
+
+  def __init__(self, names, frames, codes, track = None, meta = None):
+    self.names = list(names)
+    self.frames = frames
+    self.codes = codes
+    self.track = track
+    self.meta = meta or {}
+
+  def __len__(self):
+    return len(self.frames)
+
+  def events(self) -> list[EventFrame]:
+    names = self.names
+    return [EventFrame(frame, names[code]) for frame, code in zip(self.frames.tolist(), self.codes.tolist())]
+
+  def of_kind(self, name : str):
+    """Frames of every event called `name`, as an array."""
+    if name not in self.names:
+      return self.frames[:0]
+    return self.frames[self.codes == self.names.index(name)]
+
+  def index(self) -> EventIndex:
+    return EventIndex(self.events())
+
+  def to_json(self) -> str:
+    # Same layout as process_frames returns
+    return json.dumps([asdict(e) for e in self.events()], indent=4)
+
+def _pad(n : int) -> int:
+  return -n % ALIGN
+
+def _compress(body : bytes, compression):
+  if compression == "deflate":
+    return zlib.compress(body, DEFLATE_LEVEL)
+  if compression == "zstd":
+    return _zstd().ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+  return body
+
+def _decompress(block, compression, size : int):
+  if compression == "deflate":
+    return zlib.decompress(block, bufsize=size)
+  if compression == "zstd":
+    return _zstd().ZstdDecompressor().decompress(block, max_output_size=size)
+  return block
+
+def _zstd():
+  try:
+    import zstandard
+  except ImportError:
+    raise ImportError("zstd compression needs the zstandard package (pip install zstandard), or use 'deflate'")
+  return zstandard
+
+def encode_events(events, track : TrackTable = None, compression : str = None) -> bytes:
+  """
+  EventFrames (and the TrackTable they came from) in the binary format:
+
+    "BKEV", u16 version, u16 flags, u32 header length
+    header    JSON: string table, array directory, courts, compression
+    body      little-endian arrays, each 8-byte aligned, optionally one
+              deflate / zstd block
+
+  The string table holds each event name once, events are an int32 frame
+  and a uint16 code each.
+  """
+  if compression not in COMPRESSIONS:
+    raise ValueError(f"Unknown compression: {compression} (expected one of {', '.join(map(str, COMPRESSIONS))})")
+
+  events = list(events)
+  names, codes = {}, []
+  for event in events:
+    codes.append(names.setdefault(event.event, len(names)))
+  arrays = {
+    'event_frame': np.fromiter((e.frameIndex for e in events), np.int32, len(codes)),
+    'event_code': np.array(codes, np.uint16),
+  }
+  header = {'names': list(names), 'compression': compression, 'arrays': {}, 'track': None}
+  if track is not None:
+    for name in COLUMNS:
+      arrays['track/' + name] = track.column(name)
+    header['track'] = {
+      'rows': len(track),
+      'player_names': list(track.player_names),
+      'courts': [[[float(x), float(y)] for x, y in court.to_vectors()] for court in track.courts],
+    }
+
+  parts, offset = [], 0
+  for name, array in arrays.items():
+    data = np.ascontiguousarray(array, array.dtype.newbyteorder('<')).tobytes()
+    header['arrays'][name] = {'dtype': array.dtype.newbyteorder('<').str, 'count': len(array), 'offset': offset}
+    parts += [data, bytes(_pad(len(data)))]
+    offset += len(data) + _pad(len(data))
+  body = b"".join(parts)
+  header['body_bytes'] = len(body)
+
+  header_bytes = json.dumps(header, separators=(',', ':')).encode()
+  header_bytes += b" " * _pad(_PREFIX.size + len(header_bytes))
+  prefix = _PREFIX.pack(MAGIC, FORMAT_VERSION, 0, len(header_bytes))
+  return prefix + header_bytes + _compress(body, compression)
+
+def decode_events(buffer) -> EventFile:
+  """
+  Reads the binary format from bytes or any buffer (an mmap.mmap too).
+  Uncompressed arrays are views into `buffer`, not copies.
+  """
+  view = memoryview(buffer)
+  if len(view) < _PREFIX.size:
+    raise ValueError("Not an event file: too short")
+  magic, version, _, header_len = _PREFIX.unpack_from(view)
+  if magic != MAGIC:
+    raise ValueError(f"Not an event file: bad magic {magic!r}")
+  if version > FORMAT_VERSION:
+    raise ValueError(f"Event file version {version} is newer than this reader ({FORMAT_VERSION})")
+
+  start = _PREFIX.size + header_len
+  header = json.loads(bytes(view[_PREFIX.size:start]))
+  compression = header['compression']
+  if compression is None:
+    body, base = buffer, start
+  else:
+    body, base = _decompress(view[start:], compression, header['body_bytes']), 0
+
+  arrays = {}
+  for name, entry in header['arrays'].items():
+    arrays[name] = np.frombuffer(body, np.dtype(entry['dtype']), entry['count'], base + entry['offset'])
+
+  track = None
+  if header['track'] is not None:
+    meta = header['track']
+    columns = {name: arrays['track/' + name] for name in COLUMNS}
+    courts = [Court(*(Coord(x, y) for x, y in corners)) for corners in meta['courts']]
+    track = TrackTable.from_columns(columns, courts, meta['player_names'])
+  return EventFile(header['names'], arrays['event_frame'], arrays['event_code'], track, header)
+
+def write_events(path, events, track : TrackTable = None, compression : str = None):
+  """encode_events to `path`, written then renamed so readers never see half a file."""
+  data = encode_events(events, track, compression)
+  tmp = str(path) + ".tmp"
+  with REGISTRY.timer('file_write', target='events_binary'):
+    with open(tmp, 'wb') as f:
+      f.write(data)
+    os.replace(tmp, path)
+  return len(data)
+
+def read_events(path, mmap : bool = False) -> EventFile:
+  """
+  Reads a file written by write_events. With `mmap` an uncompressed file is
+  mapped instead of read, so opening it costs nothing until the arrays are
+  touched; a compressed one has to be inflated into memory either way.
+  """
+  with open(path, 'rb') as f:
+    if not mmap:
+      return decode_events(f.read())
+    mapped = _mmap.mmap(f.fileno(), 0, access=_mmap.ACCESS_READ)
+  # The arrays keep the mapping alive, it is unmapped once they are gone
+  return decode_events(mapped)
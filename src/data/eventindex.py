@@ -0,0 +1,110 @@
+import bisect
+
+from .eventframe import EventFrame
+
+# --- CONFIG ---
+RUN_GAP = 1     # Frames apart two events of a type may be and still belong to one run
+
+class EventIndex:
+  """
+  Events sorted by frame, overall and per event type, for time-range
+  queries in O(log n): the events in a window, the last event of a type
+  before a frame, counts per type in a window. Events of a type that fire
+  on (nearly) consecutive frames also form runs, e.g. the ball lying still
+  from frame 310 to 400, so a window can ask which runs overlap it.
+
+  Windows are half-open, [start, end), like process_video's frame ranges.
+  Events arrive in frame order while streaming, so adding one is an append;
+  an earlier frame (a late segment) is inserted in place.
+  """
+
+  def __init__(self, events = (), run_gap : int = RUN_GAP):
+    self.run_gap = run_gap
+    self.frames = []        # Every event's frame, sorted
+    self.events = []        # EventFrames in the same order
+    self.by_type = {}       # type -> (sorted frames, EventFrames)
+    self.runs = {}          # type -> (sorted run starts, run ends), runs of a type never overlap
+    for event in events:
+      self.add(event)
+
+  def __len__(self):
+    return len(self.frames)
+
+  @property
+  def kinds(self):
+    return list(self.by_type)
+
+  def add(self, event : EventFrame):
+    frame = event.frameIndex
+    _insert(self.frames, self.events, frame, event)
+    frames, events = self.by_type.setdefault(event.event, ([], []))
+    _insert(frames, events, frame, event)
+    self._add_to_run(event.event, frame)
+
+  def extend(self, events):
+    for event in events:
+      self.add(event)
+
+  def _add_to_run(self, kind, frame):
+    starts, ends = self.runs.setdefault(kind, ([], []))
+    i = bisect.bisect_right(starts, frame) - 1
+    joins_left = i >= 0 and ends[i] >= frame - self.run_gap
+    joins_right = i + 1 < len(starts) and starts[i + 1] <= frame + self.run_gap
+    if joins_left and joins_right:
+      # Fills the gap between two runs
+      ends[i] = ends[i + 1]
+      del starts[i + 1], ends[i + 1]
+    elif joins_left:
+      ends[i] = max(ends[i], frame)
+    elif joins_right:
+      starts[i + 1] = frame
+    else:
+      starts.insert(i + 1, frame)
+      ends.insert(i + 1, frame)
+
+  # --- QUERIES ---
+
+  def between(self, start : int, end : int, kind : str = None) -> list[EventFrame]:
+    """Events with start <= frameIndex < end, of one type or all of them, in frame order."""
+    frames, events = self.by_type.get(kind, ([], [])) if kind is not None else (self.frames, self.events)
+    return events[bisect.bisect_left(frames, start):bisect.bisect_left(frames, end)]
+
+  def last_before(self, kind : str, frame : int) -> EventFrame | None:
+    """The latest event of `kind` strictly before `frame`."""
+    frames, events = self.by_type.get(kind, ([], []))
+    i = bisect.bisect_left(frames, frame)
+    return events[i - 1] if i > 0 else None
+
+  def first_from(self, kind : str, frame : int) -> EventFrame | None:
+    """The earliest event of `kind` at or after `frame`."""
+    frames, events = self.by_type.get(kind, ([], []))
+    i = bisect.bisect_left(frames, frame)
+    return events[i] if i < len(frames) else None
+
+  def count(self, start : int, end : int, kinds = None) -> dict[str, int]:
+    """Events per type with start <= frameIndex < end, types without any left out."""
+    counts = {}
+    for kind in (self.by_type if kinds is None else kinds):
+      frames = self.by_type.get(kind, ([], []))[0]
+      n = bisect.bisect_left(frames, end) - bisect.bisect_left(frames, start)
+      if n:
+        counts[kind] = n
+    return counts
+
+  def runs_between(self, kind : str, start : int, end : int) -> list[tuple[int, int]]:
+    """(first, last) frames of the runs of `kind` overlapping [start, end)."""
+    starts, ends = self.runs.get(kind, ([], []))
+    # Runs are disjoint and sorted, so their ends are sorted too
+    lo = bisect.bisect_left(ends, start)
+    hi = bisect.bisect_left(starts, end)
+    return list(zip(starts[lo:hi], ends[lo:hi]))
+
+def _insert(frames, events, frame, event):
+  # Append in the common in-order case, after any events already at that frame otherwise
+  if not frames or frame >= frames[-1]:
+    frames.append(frame)
+    events.append(event)
+  else:
+    i = bisect.bisect_right(frames, frame)
+    frames.insert(i, frame)
+    events.insert(i, event)
@@ -1,5 +1,9 @@
+import time
+
 from logic.perspective import FrameUnskew
+from utils.metrics import REGISTRY
 from .Ball import Ball
+from .Coord import Coord
 from .Court import Court
 from .Player import Player
 from .normalisedframe import NormalisedFrame
@@ -11,10 +15,47 @@ class Frame:
     self.player1 = player1
     self.player2 = player2
 
+  def coords(self):
+    # Every pixel point of the frame, in the order map_frames reads them back
+    coords = [self.ball.pos] if self.ball is not None else []
+    if self.court is not None:
+      coords += [self.court.tl, self.court.tr, self.court.br, self.court.bl]
+    coords += [p.pos for p in (self.player1, self.player2) if p is not None]
+    return coords
+
   def map(self, normaliser: FrameUnskew):
-    ball = self.ball.map(normaliser) if self.ball is not None else None
-    court = self.court.map(normaliser) if self.court is not None else None
-    p1 = self.player1.map(normaliser) if self.player1 is not None else None
-    p2 = self.player2.map(normaliser) if self.player2 is not None else None
+    return map_frames([self], normaliser)[0]
+
+def map_frames(frames: list[Frame], normaliser: FrameUnskew = None) -> list[NormalisedFrame]:
+  """
+  Normalises a block of frames with a single perspective transform call.
+  Without a normaliser each frame uses its own court (the homography is
+  cached per corner set, so a whole video still computes it once).
+  """
+  if normaliser is None:
+    groups = {}
+    for i, frame in enumerate(frames):
+      groups.setdefault(tuple(map(tuple, frame.court.to_vectors())), []).append(i)
+    mapped = [None] * len(frames)
+    for corners, indices in groups.items():
+      block = map_frames([frames[i] for i in indices], FrameUnskew(list(corners)))
+      for i, normalised in zip(indices, block):
+        mapped[i] = normalised
+    return mapped
+
+  start = time.perf_counter()
+  points = [coord.to_vector() for frame in frames for coord in frame.coords()]
+  real = iter(normaliser.unskew_coords(points).tolist())
+  def next_coord():
+    x, y = next(real)
+    return Coord(x, y)
 
-    return NormalisedFrame(ball, court, p1, p2)
\ No newline at end of file
+  mapped = []
+  for frame in frames:
+    ball = Ball(next_coord()) if frame.ball is not None else None
+    court = Court(*(next_coord() for _ in range(4))) if frame.court is not None else None
+    p1 = Player(next_coord(), frame.player1.name) if frame.player1 is not None else None
+    p2 = Player(next_coord(), frame.player2.name) if frame.player2 is not None else None
+    mapped.append(NormalisedFrame(ball, court, p1, p2))
+  REGISTRY.observe('normalise', time.perf_counter() - start)
+  return mapped
@@ -1,26 +1,129 @@
+import numpy as np
+
 from .normalisedframe import NormalisedFrame
+from .tracktable import COLUMNS, PLAYER_NAMES, TrackRow
+
+# --- CONFIG ---
+DEFAULT_SECONDS = 5         # Capacity when no tester window is given
+
+class FrameWindow:
+  """
+  The most recent frames of a FrameStack, oldest first, without copying.
+
+  Indexing gives TrackRow views (same attributes as a NormalisedFrame);
+  column() gives NumPy views for vectorised code. Both read the stack's
+  buffer, so a window is only valid until the stack has been pushed
+  `capacity - len(window)` more times.
+  """
+  __slots__ = ('stack', 'rows', 'start', 'stop')
+
+  def __init__(self, stack, start : int, stop : int):
+    self.stack = stack
+    self.rows = stack.rows
+    self.start = start
+    self.stop = stop
+
+  def __len__(self):
+    return self.stop - self.start
+
+  def __getitem__(self, index):
+    # Testers index rows one at a time, so the int case stays as short as possible
+    if index.__class__ is int:
+      if 0 <= index < self.stop - self.start:
+        return self.rows[self.start + index]
+      if -(self.stop - self.start) <= index < 0:
+        return self.rows[self.stop + index]
+      raise IndexError(f"frame {index} out of range for a window of {len(self)}")
+    start, stop, step = index.indices(len(self))
+    if step != 1:
+      raise ValueError("FrameWindow slices must be contiguous")
+    return FrameWindow(self.stack, self.start + start, self.start + max(start, stop))
+
+  def __iter__(self):
+    return map(self.rows.__getitem__, range(self.start, self.stop))
+
+  def column(self, name : str):
+    return self.stack.columns[name][self.start:self.stop]
 
 class FrameStack:
-  def __init__(self, fps : int):
-    self.elements = []
-    self.topPointer = -1
+  """
+  Fixed-capacity circular buffer of the latest frames.
+
+  Each frame is written twice, at slot k and k + capacity of a buffer
+  twice the capacity long, so the last n frames are always one contiguous
+  slice: push and takeFrames are O(1) and never copy frames around.
+  """
+
+  def __init__(self, fps : int, capacity : int = None, player_names = PLAYER_NAMES):
     self.fps = fps
+    self.capacity = max(1, capacity or DEFAULT_SECONDS * fps)
+    # Same columns as a TrackTable, so TrackRow reads the buffer like a table
+    self.columns = {name: np.zeros(2 * self.capacity, dtype) for name, dtype in COLUMNS.items()}
+    # One reusable view per buffer slot, windows hand these out instead of building rows
+    self.rows = [TrackRow(self, i) for i in range(2 * self.capacity)]
+    self.courts = []
+    self.court_ids = {}
+    self.last_court = (None, -1)
+    self.player_names = tuple(player_names)
+    self.pushed = 0
+    self.size = 0
+
+  def __len__(self):
+    return self.size
+
+  @property
+  def topPointer(self):
+    return self.size - 1
+
+  def court_id(self, court):
+    # Consecutive frames share the same Court object, skip the corner lookup for those
+    if court is self.last_court[0]:
+      return self.last_court[1]
+    if court is None:
+      return -1
+    key = tuple(map(tuple, court.to_vectors()))
+    if key not in self.court_ids:
+      self.court_ids[key] = len(self.courts)
+      self.courts.append(court)
+    self.last_court = (court, self.court_ids[key])
+    return self.last_court[1]
 
   def push(self, frame : NormalisedFrame):
-    self.elements.append(frame)
-    self.topPointer += 1
+    # Anything with ball / player1 / player2 / court attributes: a NormalisedFrame or a TrackRow
+    if isinstance(frame, TrackRow):
+      c, i = frame.table.columns, frame.index
+      row = [c[name][i] for name in COLUMNS]
+      row[-1] = self.court_id(frame.court)
+    else:
+      row = [0]
+      for part in (frame.ball, frame.player1, frame.player2):
+        row += [part.pos.x, part.pos.y] if part is not None else [0.0, 0.0]
+      row += [frame.ball is not None, frame.player1 is not None, frame.player2 is not None]
+      row.append(self.court_id(frame.court))
+
+    slot = self.pushed % self.capacity
+    for col, value in zip(self.columns.values(), row):
+      col[slot] = col[slot + self.capacity] = value
+    self.pushed += 1
+    self.size = min(self.size + 1, self.capacity)
 
   def dequeue(self):
-    self.topPointer -= 1
-    return self.elements.pop(0)
-  
+    # Drops the oldest frame; the returned view is only valid until that slot is reused
+    if self.size == 0:
+      raise IndexError("dequeue from an empty FrameStack")
+    oldest = self.takeFrames(self.size)[0]
+    self.size -= 1
+    return oldest
+
   def peek(self):
-    return self.elements[self.topPointer]
-  
+    return self.takeFrames(1)[0]
+
   def takeSeconds(self, seconds: int):
     #Returns the most recent frames covering the last `seconds`.
-    num_frames = seconds * self.fps
-    return self.elements[-num_frames:]
+    return self.takeFrames(int(seconds * self.fps))
 
   def takeFrames(self, noFrames : int):
-    return self.elements[-noFrames:]
+    # Like elements[-noFrames:] on the old list: at most what is stored, oldest first
+    n = min(noFrames, self.size) if noFrames > 0 else self.size
+    end = (self.pushed - 1) % self.capacity + self.capacity + 1 if self.pushed else 0
+    return FrameWindow(self, end - n, end)
@@ -1,11 +1,34 @@
 from .eventframe import EventFrame
+from .eventindex import EventIndex
 
 class OrderOfEvents:
   def __init__(self):
       self.orderedEvents = []  # list[EventFrame]
+      self.lastMerged = None   # Last event mergeEvent let through
+      self._index = None       # EventIndex over orderedEvents, built on the first query
+
+  @property
+  def index(self) -> EventIndex:
+      # Time-range queries over every added event. Built on first use and kept up
+      # to date from then on, so runs that never query it pay nothing per event.
+      if self._index is None:
+          self._index = EventIndex(self.orderedEvents)
+      return self._index
 
   def addEvent(self, event: EventFrame):
       self.orderedEvents.append(event)
+      if self._index is not None:
+          self._index.add(event)
+
+  def mergeEvent(self, event: EventFrame):
+    # Online mergeConsecutiveEvents: a run keeps its first event, so that one is final
+    # as soon as it arrives. Returns it, or None for a repeat of the last event.
+    # Every event is still added, so the index covers streamed runs too.
+    self.addEvent(event)
+    if self.lastMerged is not None and event.event == self.lastMerged.event:
+        return None
+    self.lastMerged = event
+    return event
 
   def mergeConsecutiveEvents(self) -> list[EventFrame]:
     if not self.orderedEvents:
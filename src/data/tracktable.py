@@ -0,0 +1,193 @@
+import numpy as np
+
+from logic.perspective import FrameUnskew
+from .Ball import Ball
+from .Coord import Coord
+from .Court import Court
+from .Player import Player
+
+# --- CONFIG ---
+CHUNK_ROWS = 4096           # Rows added per growth step (~68 s at 60 fps)
+PLAYER_NAMES = ("P1", "P2")
+
+# float32 holds detector pixels and perspectiveTransform output (float32) exactly
+COLUMNS = {
+  'frame': np.int32,
+  'ball_x': np.float32, 'ball_y': np.float32,
+  'p1_x': np.float32, 'p1_y': np.float32,
+  'p2_x': np.float32, 'p2_y': np.float32,
+  'has_ball': np.bool_, 'has_p1': np.bool_, 'has_p2': np.bool_,
+  'court_id': np.int16,     # Index into TrackTable.courts, -1 = no court
+}
+POINTS = {name: ('has_' + name, name + '_x', name + '_y') for name in ('ball', 'p1', 'p2')}
+
+class TrackRow:
+  """
+  View of one row of a TrackTable with the same attributes as a Frame /
+  NormalisedFrame (ball.pos.x, player1.name, court.tl ...). Ball and Player
+  objects are built on access and dropped straight after, nothing per frame
+  outlives the columns.
+  """
+  __slots__ = ('table', 'index')
+
+  def __init__(self, table, index : int):
+    self.table = table
+    self.index = index
+
+  def _point(self, name):
+    # .item() hands back a Python float directly, this runs for every attribute read of every tester
+    has, x, y = POINTS[name]
+    c, i = self.table.columns, self.index
+    if not c[has].item(i):
+      return None
+    return Coord(c[x].item(i), c[y].item(i))
+
+  @property
+  def frame(self):
+    return int(self.table.columns['frame'][self.index])
+
+  @property
+  def ball(self):
+    pos = self._point('ball')
+    return Ball(pos) if pos is not None else None
+
+  @property
+  def player1(self):
+    pos = self._point('p1')
+    return Player(pos, self.table.player_names[0]) if pos is not None else None
+
+  @property
+  def player2(self):
+    pos = self._point('p2')
+    return Player(pos, self.table.player_names[1]) if pos is not None else None
+
+  @property
+  def court(self):
+    court_id = self.table.columns['court_id'][self.index]
+    return self.table.courts[court_id] if court_id >= 0 else None
+
+class TrackTable:
+  """
+  Columnar store of ball and player tracks for a whole video.
+
+  One row per frame in NumPy columns (see COLUMNS) instead of a Frame,
+  Ball, Court, two Players and their Coords per frame. Columns grow in
+  whole chunks, at least doubling, so appends are amortised O(1). The
+  court rarely changes within a video, so rows only hold an index into a
+  small list of distinct Court objects.
+  """
+
+  def __init__(self, capacity : int = CHUNK_ROWS, player_names = PLAYER_NAMES):
+    self.size = 0
+    self.capacity = 0
+    self.columns = {name: np.empty(0, dtype) for name, dtype in COLUMNS.items()}
+    self.courts = []
+    self.court_ids = {}
+    self.player_names = tuple(player_names)
+    self._grow(capacity)
+
+  @classmethod
+  def from_columns(cls, columns, courts = (), player_names = PLAYER_NAMES):
+    """
+    Wraps filled columns (e.g. read back by data.eventfile) without copying
+    them. They may be read-only views, the first append grows into new ones.
+    """
+    table = cls(0, player_names)
+    table.columns = {name: columns[name] for name in COLUMNS}
+    table.size = table.capacity = len(table.columns['frame'])
+    for court in courts:
+      table.court_id(court)
+    return table
+
+  def __len__(self):
+    return self.size
+
+  def __getitem__(self, index : int):
+    if index < 0:
+      index += self.size
+    if not 0 <= index < self.size:
+      raise IndexError(f"row {index} out of range for {self.size} rows")
+    return TrackRow(self, index)
+
+  def __iter__(self):
+    return (TrackRow(self, i) for i in range(self.size))
+
+  def rows(self, start : int = 0, stop : int = None):
+    return [TrackRow(self, i) for i in range(*slice(start, stop).indices(self.size))]
+
+  def column(self, name : str):
+    # View of the filled part, not a copy
+    return self.columns[name][:self.size]
+
+  @property
+  def nbytes(self):
+    return sum(col.nbytes for col in self.columns.values())
+
+  def _grow(self, needed : int):
+    if needed <= self.capacity:
+      return
+    capacity = max(needed, 2 * self.capacity)
+    capacity = -(-capacity // CHUNK_ROWS) * CHUNK_ROWS
+    for name, col in self.columns.items():
+      grown = np.zeros(capacity, col.dtype)
+      grown[:self.size] = col[:self.size]
+      self.columns[name] = grown
+    self.capacity = capacity
+
+  def court_id(self, court : Court):
+    if court is None:
+      return -1
+    key = tuple(map(tuple, court.to_vectors()))
+    if key not in self.court_ids:
+      self.court_ids[key] = len(self.courts)
+      self.courts.append(court)
+    return self.court_ids[key]
+
+  def append(self, frame_index : int, ball = None, player1 = None, player2 = None, court : Court = None):
+    """Adds one row from (x, y) pairs (None = missing), returns its view."""
+    self._grow(self.size + 1)
+    i, c = self.size, self.columns
+    c['frame'][i] = frame_index
+    for name, point in (('ball', ball), ('p1', player1), ('p2', player2)):
+      c['has_' + name][i] = point is not None
+      if point is not None:
+        c[name + '_x'][i], c[name + '_y'][i] = point
+    c['court_id'][i] = self.court_id(court)
+    self.size += 1
+    return TrackRow(self, i)
+
+  def append_frame(self, frame_index : int, frame, normaliser : FrameUnskew = None):
+    """
+    Adds a Frame or NormalisedFrame. With a normaliser, its pixel points are
+    mapped to court metres in one transform call on the way in, so no
+    NormalisedFrame is built.
+    """
+    parts = [frame.ball, frame.player1, frame.player2]
+    points = [p.pos.to_vector() for p in parts if p is not None]
+    court = frame.court
+    if normaliser is not None:
+      corners = court.to_vectors() if court is not None else []
+      real = normaliser.unskew_coords(points + corners).tolist()
+      points = real[:len(points)]
+      if court is not None:
+        court = Court(*(Coord(x, y) for x, y in real[len(points):]))
+
+    it = iter(points)
+    ball, p1, p2 = (next(it) if p is not None else None for p in parts)
+    return self.append(frame_index, ball, p1, p2, court)
+
+  def map(self, normaliser : FrameUnskew):
+    """Whole table to court metres in one transform call (offline path)."""
+    mapped = TrackTable(max(self.size, 1), self.player_names)
+    for name in ('frame', 'has_ball', 'has_p1', 'has_p2', 'court_id'):
+      mapped.columns[name][:self.size] = self.column(name)
+    xy = np.concatenate([np.stack([self.column(n + '_x'), self.column(n + '_y')], axis=1)
+                         for n in ('ball', 'p1', 'p2')])
+    real = normaliser.unskew_coords(xy).reshape(3, self.size, 2)
+    for k, name in enumerate(('ball', 'p1', 'p2')):
+      mapped.columns[name + '_x'][:self.size] = real[k, :, 0]
+      mapped.columns[name + '_y'][:self.size] = real[k, :, 1]
+    mapped.courts = [court.map(normaliser) for court in self.courts]
+    mapped.court_ids = {tuple(map(tuple, c.to_vectors())): k for k, c in enumerate(mapped.courts)}
+    mapped.size = self.size
+    return mapped
@@ -1,6 +1,9 @@
 import numpy as np
+from data.Coord import Coord
 from data.framestack import FrameStack
 from data.frame import NormalisedFrame
+from logic.features import (DISPLACEMENT_FRAMES, FeatureStage, FrameFeatures, RunCounter, TrackFeatures,
+                            feature_window, rolling_all, rolling_sum)
 from logic.perspective import TENNIS_COURT_LENGTH
 
 # --- EVENT CLASSES ---
@@ -30,20 +33,32 @@ class BallInEvent(Event): pass
 class BallOutEvent(Event): pass
 
 # --- BASE TESTER ---
+# Every tester declares `window`: the most frames it needs on the stack, and
+# `features`: the per-frame kinematics it reads (see logic.features). The
+# pipeline computes the features once per frame and hands them to every
+# tester; called on their own, testers compute them with a stage of their own.
+# test_track(track, features) is the offline form of test_event: it sees a
+# whole TrackTable at once and returns (mask, EventClass) pairs, mask[t] True
+# where test_event would have returned that event with row t on top of the stack.
 
 class SideTester:
+    features = ('ball',)
+
     def __init__(self, side: str):
         self.side = side
         self.net_pos_x = TENNIS_COURT_LENGTH/2
+        self.window = 1
+        self.stage = FeatureStage(self.features)
 
-    def test_event(self, frames: FrameStack):
-        recent = frames.takeFrames(1)
+    def test_event(self, frames: FrameStack, features: FrameFeatures = None):
+        if features is None:
+            features = self.stage.update(frames)
 
         # Guard against nulls
-        if not recent or recent[0].ball is None:
+        if features.ball is None:
             return None
 
-        ball_x = recent[0].ball.pos.x
+        ball_x = features.ball[0]
 
         if self.side == "right":
             if ball_x > self.net_pos_x:
@@ -55,18 +70,33 @@ class SideTester:
 
         return None
 
+    def test_track(self, track, features: TrackFeatures = None):
+        has, x, _ = (features or TrackFeatures(track, self.features)).ball
+        if self.side == "right":
+            return [(has & (x > self.net_pos_x), RightOfNetEvent)]
+        if self.side == "left":
+            return [(has & (x <= self.net_pos_x), LeftOfNetEvent)]
+        return []
+
 # --- COMPLEX TESTERS ---
 
 class BounceOrShotTester:
-    def test_event(self, frames: FrameStack):
-        recent = frames.takeFrames(3)
+    window = 3
+    features = ('ball_velocity',)
+
+    def __init__(self):
+        self.stage = FeatureStage(self.features)
 
-        # Ensure we have 3 frames and all have ball data
-        if len(recent) < 3 or any(f is None or f.ball is None for f in recent):
+    def test_event(self, frames: FrameStack, features: FrameFeatures = None):
+        if features is None:
+            features = self.stage.update(frames)
+
+        # Ensure the ball is in all of the last 3 frames
+        if features.ball_velocity is None or features.last_ball_velocity is None:
             return None
 
-        v1_x = recent[1].ball.pos.x - recent[0].ball.pos.x
-        v2_x = recent[2].ball.pos.x - recent[1].ball.pos.x
+        v1_x = features.last_ball_velocity[0]
+        v2_x = features.ball_velocity[0]
 
         # Detect Shot: Horizontal direction reversal
         if (v1_x > 0) != (v2_x > 0) and abs(v1_x) > 0.05:
@@ -80,40 +110,38 @@ class BounceOrShotTester:
 
         return None
 
+    def test_track(self, track, features: TrackFeatures = None):
+        features = features or TrackFeatures(track, self.features)
+        ok, v2_x, _ = features.ball_velocity
+        last_ok, v1_x, _ = features.last_ball_velocity
+        ok = ok & last_ok
+
+        shot = ok & ((v1_x > 0) != (v2_x > 0)) & (np.abs(v1_x) > 0.05)
+        moving = np.abs(v1_x) > 0
+        speed_ratio = np.divide(np.abs(v2_x), np.abs(v1_x), out=np.ones_like(v2_x), where=moving)
+        bounce = ok & ~shot & moving & (speed_ratio < 0.8)
+        return [(shot, ShotEvent), (bounce, BounceEvent)]
+
 class PlayerMovementTester:
+    features = ('player_displacement',)
+
     def __init__(self, player_index: int, direction: str, movement_threshold: float = 0.5):
         self.player_index = player_index
         self.direction = direction
         self.movement_threshold = movement_threshold
+        self.window = DISPLACEMENT_FRAMES     # Look at movement over ~0.17 seconds
+        self.stage = FeatureStage(self.features)
 
-    def test_event(self, frames: FrameStack):
-        recent = frames.takeFrames(5)  # Look at movement over ~0.17 seconds
+    def test_event(self, frames: FrameStack, features: FrameFeatures = None):
+        if features is None:
+            features = self.stage.update(frames)
 
-        # Guard against nulls
-        if len(recent) < 5:
+        # Net displacement, None unless the player is in every frame of the window
+        displacement = features.player_displacement[self.player_index]
+        if displacement is None:
             return None
 
-        # Get the correct player based on index
-        players = []
-        for f in recent:
-            if f is None:
-                players.append(None)
-            elif self.player_index == 0 and f.player1 is not None:
-                players.append(f.player1)
-            elif self.player_index == 1 and f.player2 is not None:
-                players.append(f.player2)
-            else:
-                players.append(None)
-
-        if any(p is None for p in players):
-            return None
-
-        # Calculate net displacement
-        start_pos = players[0].pos
-        end_pos = players[-1].pos
-
-        dx = end_pos.x - start_pos.x
-        dy = end_pos.y - start_pos.y
+        dx, dy = displacement
 
         # Check direction-specific movement
         if self.direction == "up":
@@ -131,62 +159,84 @@ class PlayerMovementTester:
 
         return None
 
+    def test_track(self, track, features: TrackFeatures = None):
+        features = features or TrackFeatures(track, self.features)
+        ok, dx, dy = features.player_displacement[self.player_index]
+
+        if self.direction == "up":
+            return [(ok & (dy > self.movement_threshold), PlayerUpEvent)]
+        if self.direction == "down":
+            return [(ok & (dy < -self.movement_threshold), PlayerDownEvent)]
+        if self.direction == "left":
+            return [(ok & (dx < -self.movement_threshold), PlayerLeftEvent)]
+        if self.direction == "right":
+            return [(ok & (dx > self.movement_threshold), PlayerRightEvent)]
+        return []
+
 class BallStoppedTester:
+    features = ('ball', 'ball_speed')
+
     def __init__(self, velocity_threshold: float = 0.05, min_stopped_seconds: float = 0.5, fps: int = 60):
         self.min_stopped_seconds = min_stopped_seconds
         self.velocity_threshold = velocity_threshold
         self.fps = fps
-        
-    def test_event(self, frames: FrameStack):
-        # Calculate number of frames needed based on seconds and fps
-        min_stopped_frames = int(self.min_stopped_seconds * self.fps)
-        
-        recent = frames.takeFrames(min_stopped_frames + 1)
-
-        # Guard against nulls
-        if len(recent) < min_stopped_frames + 1:
-            return None
+        # Only the last step is needed, however long the stop has to last
+        self.window = 2
+        self.stopped = RunCounter()
+        self.stage = FeatureStage(self.features)
 
-        if any(f is None or f.ball is None for f in recent):
-            return None
+    def test_event(self, frames: FrameStack, features: FrameFeatures = None):
+        if features is None:
+            features = self.stage.update(frames)
 
-        # Check velocity for consecutive frames
-        stopped_count = 0
-        for i in range(len(recent) - 1):
-            dx = recent[i + 1].ball.pos.x - recent[i].ball.pos.x
-            dy = recent[i + 1].ball.pos.y - recent[i].ball.pos.y
-            
-            # Ball only has x and y coordinates based on Coord class
-            velocity = np.sqrt(dx**2 + dy**2)
+        # Calculate number of frames needed based on seconds and fps
+        min_stopped_frames = int(self.min_stopped_seconds * self.fps)
 
-            if velocity < self.velocity_threshold:
-                stopped_count += 1
+        # Newest step: ball in both frames and moving slower than the threshold
+        stopped = features.ball_speed is not None and features.ball_speed < self.velocity_threshold
 
-        # Ball has been stopped for minimum duration
-        if stopped_count >= min_stopped_frames:
+        # Ball has been stopped for minimum duration: that many stopped steps in a row
+        if self.stopped.update(frames, stopped) >= min_stopped_frames and features.ball is not None:
             return BallStoppedEvent()
 
         return None
 
+    def test_track(self, track, features: TrackFeatures = None):
+        features = features or TrackFeatures(track, self.features)
+        min_stopped_frames = int(self.min_stopped_seconds * self.fps)
+        has = features.ball[0]
+
+        # Step t is the move from frame t - 1 to t, a window holds the last min_stopped_frames steps
+        ok, speed = features.ball_speed
+        stopped = ok & (speed < self.velocity_threshold)
+        stopped_count = rolling_sum(stopped, min_stopped_frames)
+        return [(rolling_all(has, min_stopped_frames + 1) & (stopped_count >= min_stopped_frames), BallStoppedEvent)]
+
 class BallInOutTester:
+    window = 3
+    features = ('ball', 'ball_speed')
+
     def __init__(self):
         self.last_state = None  # Track last known state to detect transitions
+        self.stage = FeatureStage(self.features)
 
-    def test_event(self, frames: FrameStack):
-        recent = frames.takeFrames(3)
+    def test_event(self, frames: FrameStack, features: FrameFeatures = None):
+        if features is None:
+            features = self.stage.update(frames)
 
-        # Guard against nulls
-        if len(recent) < 3 or any(f is None or f.ball is None or f.court is None for f in recent):
+        # Guard against nulls: ball in the last 3 frames, all with a court
+        if features.ball_speed is None or features.last_ball_speed is None:
+            return None
+        recent = frames.takeFrames(self.window)
+        if len(recent) < 3 or any(f.court is None for f in recent):
             return None
 
         # Check if ball has just bounced (reversal in vertical velocity)
         # We need to infer vertical movement from the trajectory
-        # Calculate distances between consecutive ball positions
-        d1 = np.sqrt((recent[1].ball.pos.x - recent[0].ball.pos.x)**2 + 
-                     (recent[1].ball.pos.y - recent[0].ball.pos.y)**2)
-        d2 = np.sqrt((recent[2].ball.pos.x - recent[1].ball.pos.x)**2 + 
-                     (recent[2].ball.pos.y - recent[1].ball.pos.y)**2)
-        
+        # Distances between consecutive ball positions
+        d1 = features.last_ball_speed
+        d2 = features.ball_speed
+
         # Detect bounce: significant change in velocity/direction (similar to BounceEvent logic)
         if d1 > 0:
             speed_ratio = d2 / d1
@@ -200,7 +250,7 @@ class BallInOutTester:
 
         # Get court boundaries
         court = recent[-1].court
-        ball_pos = recent[-1].ball.pos
+        ball_pos = Coord(*features.ball)
         
         # Check if ball is within court boundaries using point-in-polygon test
         # Court corners: tl (top-left), tr (top-right), br (bottom-right), bl (bottom-left)
@@ -224,6 +274,42 @@ class BallInOutTester:
 
         return None
 
+    def test_track(self, track, features: TrackFeatures = None, initial_state: str = None):
+        """
+        A finished track is self-contained: the first bounce always fires,
+        unless `initial_state` ("in" / "out") says where an earlier part left off.
+        The tester's own last_state is neither read nor changed.
+        """
+        features = features or TrackFeatures(track, self.features)
+        has, x, y = features.ball
+        court_id = track.column('court_id')
+        ok = rolling_all(has & (court_id >= 0), 3)
+
+        d1, d2 = features.last_ball_speed[1], features.ball_speed[1]
+        speed_ratio = np.divide(d2, d1, out=np.ones_like(d1), where=d1 > 0)
+        bounced = np.flatnonzero(ok & (d1 > 0) & (speed_ratio < 0.8))
+
+        # Same cross-product test as _point_in_quadrilateral, for every bounce at once
+        corners = np.array([court.to_vectors() for court in track.courts] or np.zeros((0, 4, 2)), dtype=np.float64)
+        quad = corners[court_id[bounced]]
+        px, py = x[bounced], y[bounced]
+        signs = []
+        for a, b in ((0, 1), (1, 2), (2, 3), (3, 0)):
+            ax, ay, bx, by = quad[:, a, 0], quad[:, a, 1], quad[:, b, 0], quad[:, b, 1]
+            signs.append((px - bx) * (ay - by) - (ax - bx) * (py - by))
+        signs = np.array(signs).reshape(4, -1)
+        is_in_bounds = ~(np.any(signs < 0, axis=0) & np.any(signs > 0, axis=0))
+
+        # Only state changes fire
+        start = {None: -1, "out": 0, "in": 1}[initial_state]
+        states = is_in_bounds.astype(np.int64)
+        changed = states != np.concatenate([[start], states[:-1]])
+
+        into, out_of = np.zeros(len(x), dtype=bool), np.zeros(len(x), dtype=bool)
+        into[bounced[changed & is_in_bounds]] = True
+        out_of[bounced[changed & ~is_in_bounds]] = True
+        return [(into, BallInEvent), (out_of, BallOutEvent)]
+
     def _point_in_quadrilateral(self, point, tl, tr, br, bl) -> bool:
         """
         Check if a point is inside a quadrilateral using the cross product method.
@@ -281,4 +367,28 @@ class EventTesters:
         PLAYER0_UP, PLAYER0_DOWN, PLAYER0_LEFT, PLAYER0_RIGHT,
         PLAYER1_UP, PLAYER1_DOWN, PLAYER1_LEFT, PLAYER1_RIGHT,
         BALL_STOPPED, BALL_IN_OUT
-    ]
\ No newline at end of file
+    ]
+
+# Registry names double as the testers' labels in metrics
+for _name, _tester in list(vars(EventTesters).items()):
+    if hasattr(_tester, 'test_event'):
+        _tester.name = _name
+
+def tester_name(tester) -> str:
+    return getattr(tester, 'name', None) or type(tester).__name__
+
+def required_window(testers) -> int:
+    """Frames a FrameStack must hold for every tester in `testers`"""
+    return max((max(tester.window, feature_window(getattr(tester, 'features', ()))) for tester in testers),
+               default=1)
+
+def stream_track(tester, track, fps: int = 60):
+    """test_track for testers that only have test_event: replays the track through a FrameStack."""
+    stack = FrameStack(fps, capacity=required_window([tester]) if hasattr(tester, 'window') else None)
+    masks = {}
+    for t, row in enumerate(track):
+        stack.push(row)
+        result = tester.test_event(stack)
+        if result is not None:
+            masks.setdefault(type(result), np.zeros(len(track), dtype=bool))[t] = True
+    return [(mask, event) for event, mask in masks.items()]
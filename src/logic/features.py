@@ -0,0 +1,190 @@
+import math
+import weakref
+
+import numpy as np
+
+from data.framestack import FrameStack
+
+# --- CONFIG ---
+DISPLACEMENT_FRAMES = 5     # Player displacement is measured over ~0.17 s at 60 fps
+
+# Frames of the stack each feature reads; speed and acceleration come with the velocity
+FEATURE_WINDOWS = {
+    'ball': 1,
+    'ball_velocity': 3,     # This step and the last one
+    'ball_speed': 3,
+    'ball_acceleration': 3,
+    'player_displacement': DISPLACEMENT_FRAMES,
+}
+
+# --- BATCH HELPERS ---
+# The offline forms work on whole TrackTable columns: mask[t] True where the
+# streaming form would have a value with row t on top of the stack.
+
+def rolling_sum(values, window: int) -> np.ndarray:
+    # out[t] = sum of values[t - window + 1 .. t], 0 until a full window exists
+    out = np.zeros(len(values), dtype=np.int64)
+    if window > 0 and len(values) >= window:
+        c = np.concatenate([[0], np.cumsum(values, dtype=np.int64)])
+        out[window - 1:] = c[window:] - c[:-window]
+    return out
+
+def rolling_all(mask, window: int) -> np.ndarray:
+    # Full window (len(recent) == window) with every frame passing
+    full = np.arange(len(mask)) >= window - 1
+    return full & (rolling_sum(mask, window) == window)
+
+def lagged(values, lag: int) -> np.ndarray:
+    # values[t - lag], zero before the start (always masked out by rolling_all)
+    out = np.zeros_like(values)
+    if lag < len(values):
+        out[lag:] = values[:len(values) - lag]
+    return out
+
+def point_columns(track, name: str):
+    # float64 like the Coord attributes test_event reads, so every comparison is the same
+    return (track.column('has_' + name), track.column(name + '_x').astype(np.float64),
+            track.column(name + '_y').astype(np.float64))
+
+# --- INCREMENTAL STATE ---
+
+class RunCounter:
+    """
+    Length of the current run of consecutive frames passing a check, kept
+    across test_event calls so a tester never re-reads a long window. Fed
+    once per pushed frame; a different stack or a skipped frame restarts the
+    run, and asking again about the same frame returns the same length.
+    """
+
+    def __init__(self):
+        self.stack = None       # weakref: deepcopy keeps it as is instead of copying the stack
+        self.pushed = 0
+        self.run = 0
+
+    def update(self, frames: FrameStack, passing: bool) -> int:
+        same_stack = self.stack is not None and self.stack() is frames
+        if same_stack and frames.pushed == self.pushed:
+            return self.run
+        if not same_stack or frames.pushed != self.pushed + 1:
+            self.run = 0
+            self.stack = weakref.ref(frames)
+        self.pushed = frames.pushed
+        self.run = self.run + 1 if passing else 0
+        return self.run
+
+# --- FEATURES ---
+
+def resolve_features(names) -> set:
+    """`names` plus the features they are derived from"""
+    names = set(names)
+    unknown = names - FEATURE_WINDOWS.keys()
+    if unknown:
+        raise ValueError(f"Unknown features {sorted(unknown)}, expected some of: {', '.join(FEATURE_WINDOWS)}")
+    if names & {'ball_speed', 'ball_acceleration'}:
+        names.add('ball_velocity')
+    return names
+
+def required_features(testers) -> set:
+    """Union of the features `testers` declare"""
+    return resolve_features(name for tester in testers for name in getattr(tester, 'features', ()))
+
+def feature_window(names) -> int:
+    """Frames a FrameStack must hold for the features in `names`"""
+    return max((FEATURE_WINDOWS[name] for name in names), default=1)
+
+class FrameFeatures:
+    """
+    Kinematics of the newest frame on the stack, None where the ball or
+    player is missing from a frame they need. Points and vectors are (x, y)
+    in court metres; `last_` values are the same feature one frame earlier.
+    """
+    __slots__ = ('ball', 'ball_velocity', 'last_ball_velocity', 'ball_speed', 'last_ball_speed',
+                 'ball_acceleration', 'player_displacement')
+
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, None)
+        self.player_displacement = [None, None]
+
+class FeatureStage:
+    """
+    Computes the features the testers declare once per frame, so every tester
+    reads the same ball velocity or player displacement instead of working it
+    out from the stack itself. Only the declared features are computed.
+    """
+
+    def __init__(self, names):
+        self.names = resolve_features(names)
+        self.window = feature_window(self.names)
+        self.present = [RunCounter(), RunCounter()]
+
+    def update(self, frames: FrameStack) -> FrameFeatures:
+        features = FrameFeatures()
+        recent = frames.takeFrames(self.window)
+        n = len(recent)
+        if n == 0:
+            return features
+
+        # Straight from the stack's columns, .item() gives the same float64 as the Coord attributes
+        c, i = frames.columns, recent.stop - 1
+        has, xs, ys = c['has_ball'], c['ball_x'], c['ball_y']
+        if has.item(i):
+            features.ball = (xs.item(i), ys.item(i))
+
+        if 'ball_velocity' in self.names:
+            # Steps ending at i and i - 1, when the ball is in both of their frames
+            steps = []
+            for end in (i, i - 1):
+                if n > i - end + 1 and has.item(end) and has.item(end - 1):
+                    steps.append((xs.item(end) - xs.item(end - 1), ys.item(end) - ys.item(end - 1)))
+                else:
+                    steps.append(None)
+            features.ball_velocity, features.last_ball_velocity = steps
+            features.ball_speed, features.last_ball_speed = (
+                math.sqrt(v[0]**2 + v[1]**2) if v is not None else None for v in steps)
+            if 'ball_acceleration' in self.names and None not in steps:
+                features.ball_acceleration = (steps[0][0] - steps[1][0], steps[0][1] - steps[1][1])
+
+        if 'player_displacement' in self.names:
+            # Player seen in each of the last DISPLACEMENT_FRAMES frames: only the newest frame is
+            # checked, the counter remembers the rest
+            start = i - DISPLACEMENT_FRAMES + 1
+            for k, name in enumerate(('p1', 'p2')):
+                present = c['has_' + name].item(i)
+                if self.present[k].update(frames, present) >= DISPLACEMENT_FRAMES and n >= DISPLACEMENT_FRAMES:
+                    x, y = c[name + '_x'], c[name + '_y']
+                    features.player_displacement[k] = (x.item(i) - x.item(start), y.item(i) - y.item(start))
+        return features
+
+class TrackFeatures:
+    """
+    The same features for every row of a TrackTable at once. Each one is a
+    tuple of a validity mask and its columns: ball is (has, x, y), a velocity
+    (ok, vx, vy), a speed (ok, speed), player_displacement one (ok, dx, dy)
+    per player.
+    """
+
+    def __init__(self, track, names):
+        self.names = resolve_features(names)
+        has, x, y = point_columns(track, 'ball')
+        self.ball = (has, x, y)
+
+        if 'ball_velocity' in self.names:
+            ok = has & lagged(has, 1)
+            vx, vy = x - lagged(x, 1), y - lagged(y, 1)
+            speed = np.sqrt(vx**2 + vy**2)
+            self.ball_velocity = (ok, vx, vy)
+            self.last_ball_velocity = (lagged(ok, 1), lagged(vx, 1), lagged(vy, 1))
+            self.ball_speed = (ok, speed)
+            self.last_ball_speed = (lagged(ok, 1), lagged(speed, 1))
+            if 'ball_acceleration' in self.names:
+                last_ok, last_vx, last_vy = self.last_ball_velocity
+                self.ball_acceleration = (ok & last_ok, vx - last_vx, vy - last_vy)
+
+        if 'player_displacement' in self.names:
+            self.player_displacement = []
+            for name in ('p1', 'p2'):
+                has_p, px, py = point_columns(track, name)
+                lag = DISPLACEMENT_FRAMES - 1
+                self.player_displacement.append(
+                    (rolling_all(has_p, DISPLACEMENT_FRAMES), px - lagged(px, lag), py - lagged(py, lag)))
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 import cv2
 import numpy as np
 
@@ -5,41 +7,55 @@ from data.Coord import Coord
 
 TENNIS_COURT_LENGTH: float = 23.77
 TENNIS_COURT_SINGLES_WIDTH: float = 8.23
+NET_X: float = TENNIS_COURT_LENGTH / 2
+MAX_PARALLAX: float = 1.25      # m, shift for a ball at peak height near the net
+HOMOGRAPHY_CACHE_SIZE = 64      # Distinct courts kept, one per camera in practice
+
+@lru_cache(maxsize=HOMOGRAPHY_CACHE_SIZE)
+def court_homography(corners: tuple) -> np.ndarray:
+    """Pixel -> court metres matrix for ((x, y) tl, tr, br, bl); cached, so treat as read-only"""
+    src_points = np.array(corners, dtype="float32")
+    dst_points = np.array([
+        [0, 0],
+        [0, TENNIS_COURT_SINGLES_WIDTH],
+        [TENNIS_COURT_LENGTH, TENNIS_COURT_SINGLES_WIDTH],
+        [TENNIS_COURT_LENGTH, 0]
+    ], dtype="float32")
+    matrix = cv2.getPerspectiveTransform(src_points, dst_points)
+    matrix.flags.writeable = False
+    return matrix
+
+def apply_parallax(x_vals: np.ndarray, height_factors: np.ndarray) -> np.ndarray:
+    """Pulls coordinates back toward the net based on height, for whole arrays at once."""
+    correction = height_factors * MAX_PARALLAX
+    # If far (x < net), pull closer by adding. If near (x > net), pull further by subtracting.
+    return np.where(x_vals < NET_X, x_vals + correction, x_vals - correction)
 
 class FrameUnskew:
     def __init__(self, corners: list[list[float]]):
         if len(corners) == 4:
-            src_points = np.array(corners, dtype="float32")
-            dst_points = np.array([
-                [0, 0],
-                [0, TENNIS_COURT_SINGLES_WIDTH],
-                [TENNIS_COURT_LENGTH, TENNIS_COURT_SINGLES_WIDTH],
-                [TENNIS_COURT_LENGTH, 0]
-            ], dtype="float32")
-            self.matrix = cv2.getPerspectiveTransform(src_points, dst_points)
+            # Every frame of a video shares the same corners, so the matrix is computed once
+            self.matrix = court_homography(tuple((float(x), float(y)) for x, y in corners))
         else:
             raise ValueError()
 
     def _apply_parallax(self, x_val: float, height_factor: float) -> float:
         """Internal helper to pull coordinates back toward the net based on height."""
-        # 1.25m is the max shift for a ball at peak height near the net
-        correction = height_factor * 1.25
-
-        # Net is at 11.885.
-        # If far (x < 11.885), pull closer by adding.
-        # If near (x > 11.885), pull further by subtracting.
-        return x_val + correction if x_val < 11.885 else x_val - correction
+        return float(apply_parallax(np.float64(x_val), np.float64(height_factor)))
 
     def unskew_coords(self, points: list[list[float]], height_factors: list[float] = None):
-        # 1. Raw Transform
+        # 1. Raw Transform, every point in one call
         pts_array = np.array(points, dtype="float32").reshape(-1, 1, 2)
+        if len(pts_array) == 0:
+            return np.empty((0, 2), dtype="float32")
         transformed = cv2.perspectiveTransform(pts_array, self.matrix).reshape(-1, 2)
 
-        # 2. Apply fix to all points if height factors are provided
+        # 2. Apply fix to all points if height factors are provided (missing ones count as ground level)
         if height_factors is not None:
-            for i in range(len(transformed)):
-                h = height_factors[i] if i < len(height_factors) else 0.0
-                transformed[i][0] = self._apply_parallax(transformed[i][0], h)
+            heights = np.zeros(len(transformed), dtype="float32")
+            given = np.asarray(height_factors, dtype="float32")[:len(transformed)]
+            heights[:len(given)] = given
+            transformed[:, 0] = apply_parallax(transformed[:, 0], heights)
 
         return transformed  # Returns list[list[float]] (as a numpy array)
 
@@ -49,7 +65,3 @@ class FrameUnskew:
         res = self.unskew_coords([points], height_factors=[height_factor])[0]
 
         return Coord(float(res[0]), float(res[1]))
-
-
-frame = FrameUnskew([[0, 0], [0, 1], [1, 1], [1, 0]])
-print(frame.unskew_coords([[0.5, 0]]))
\ No newline at end of file
@@ -1,69 +1,316 @@
+import copy
 import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import asdict
 
+import cv2
+import numpy as np
+
+from data.eventfile import write_events
 from data.eventframe import EventFrame
 from data.frame import Frame
 from data.framestack import FrameStack
 from data.orderofevents import OrderOfEvents
-from logic.events import EventTesters
+from data.tracktable import TrackTable
+from logic.events import EventTesters, required_window, stream_track, tester_name
+from logic.features import FeatureStage, TrackFeatures, required_features
 from logic.perspective import FrameUnskew
-from vision.core import VisionSystem, get_court_calibration
+from utils.metrics import REGISTRY, Progress
+from vision.cache import video_hash
+from vision.core import VisionSystem, DEFAULT_PROFILE, USE_DETECTION_CACHE
+from vision.models import DEFAULT_BACKEND
 
-def process_frames(url):
-    print(f"\n{'='*80}", flush=True)
-    print(f"🎬 process_frames() CALLED with video: {url}", flush=True)
-    print(f"{'='*80}\n", flush=True)
+# --- CONFIG ---
+FPS = 60
+WORKERS = 1                 # >1 splits the video into segments processed in parallel
+OVERLAP_SECONDS = 2         # Warm-up replayed before each segment, events from it are dropped
+MIN_SEGMENT_SECONDS = 30    # Shorter segments are not worth a worker (model load, seek)
+BATCH_EVENTS = True         # Finished uploads: record the whole track, then test it in one vectorised pass
 
-    fps = 60
-    print(f"📹 Initializing VisionSystem...", flush=True)
-    system = VisionSystem(url)
-    stack = FrameStack(fps)
-    i = 0
-    order = OrderOfEvents()
+def plan_segments(total_frames, workers, overlap, min_frames):
+    """
+    Splits [0, total_frames) into at most `workers` contiguous segments.
+    Returns (read_start, start, end) per segment: frames from read_start only
+    warm up the tracker and testers, events are kept from start up to end
+    (None = to the end of the video, since frame counts can be approximate).
+    """
+    count = max(1, min(workers, total_frames // max(1, min_frames)))
+    bounds = [round(k * total_frames / count) for k in range(count + 1)]
+    segments = []
+    for k in range(count):
+        start = bounds[k]
+        end = bounds[k + 1] if k < count - 1 else None
+        segments.append((max(0, start - overlap), start, end))
+    return segments
 
-    print(f"🔄 Starting frame processing loop...", flush=True)
+def analyse_track(track, testers, emit_from=1, fps=FPS, merge=False):
+    """
+    Offline form of analyse_frames over a finished TrackTable: every tester
+    runs once over the whole track (test_track) and the hits are put back in
+    streaming order (frame, then tester), so the EventFrames are the same.
+    With `merge` only the first of each run of equal events is built, what
+    OrderOfEvents.mergeConsecutiveEvents would keep anyway.
+    """
+    start = time.perf_counter()
+    frames = track.column('frame')
+    # Velocities and displacements are worked out once for every tester that reads them
+    features = TrackFeatures(track, required_features(testers))
+    REGISTRY.observe('features', time.perf_counter() - start)
+    rows, order, labels = [], [], []
+    for k, tester in enumerate(testers):
+        with REGISTRY.timer('tester', tester=tester_name(tester)):
+            test_track = getattr(tester, 'test_track', None)
+            if test_track is None:
+                hits = stream_track(tester, track, fps)
+            else:
+                hits = test_track(track, features) if hasattr(tester, 'features') else test_track(track)
+        for mask, event in hits:
+            # Warm-up frames of a segment only prime the testers
+            hit = np.flatnonzero(mask & (frames >= emit_from))
+            rows.append(hit)
+            order.append(np.full(len(hit), k))
+            labels.append(event().to_string())
+
+    events = []
+    if rows:
+        label = np.concatenate([np.full(len(hit), j) for j, hit in enumerate(rows)])
+        rows, order = np.concatenate(rows), np.concatenate(order)
+        # A tester fires at most one event per frame, so (frame, tester) is the streaming order
+        ranked = np.lexsort((order, rows))
+        rows, label = rows[ranked], label[ranked]
+        REGISTRY.inc('events', len(rows))
+        if merge and len(label):
+            with REGISTRY.timer('merge'):
+                # Testers can share an event type, compare names rather than labels
+                names = {name: k for k, name in enumerate(dict.fromkeys(labels))}
+                name_id = np.array([names[name] for name in labels])[label]
+                first = np.concatenate([[True], name_id[1:] != name_id[:-1]])
+                rows, label = rows[first], label[first]
+        events = [EventFrame(f, labels[j]) for f, j in zip(frames[rows].tolist(), label.tolist())]
+    print(f"⚡ Tested {len(track)} frames with {len(testers)} testers in {time.perf_counter() - start:.3f}s", flush=True)
+    return events
+
+def _record_frames(system, track, first_frame=0):
+    # Normalises each decoded frame into `track`, yields its row view
+    normalise_seconds, frames_seen = REGISTRY.histogram('normalise'), REGISTRY.counter('frames')
+    i = first_frame
     while True:
         i += 1
         frame: Frame = system.getNextFrame()
         if frame is None:
-            break
-            
-        # REVERTED: Use the exact function call that worked before
-        court_calib = get_court_calibration(frame)
-        normaliser = FrameUnskew(court_calib.to_vectors())
-        normalised = frame.map(normaliser)
-        
-        # Push onto frame stack
-        stack.push(normalised)
-        
-        # Iterate through event testers
-        results = []
-        for tester in EventTesters.ALL:
-            result = tester.test_event(stack)
-            if result is not None:
-                results.append(result)
-                # Add to our order object
-                order.addEvent(EventFrame(i, result.to_string()))
-        
-        # Print progress so we know it's working
-        event_descriptions = [res.to_string() for res in results]
-        print(f"Frame {i}: {' | '.join(event_descriptions)}", flush=True)
-            
-        if len(stack.elements) > 5 * fps:
-            stack.dequeue()
+            return
+
+        # The vision system calibrated the court once for the whole video
+        start = time.perf_counter()
+        normaliser = FrameUnskew(frame.court.to_vectors())
+
+        # Stored as columns, the stack and testers see a row view instead of a NormalisedFrame
+        row = track.append_frame(i, frame, normaliser)
+        normalise_seconds.observe(time.perf_counter() - start)
+        frames_seen.inc()
+        yield row
+
+def iter_events(system, testers, fps=FPS, first_frame=0, emit_from=1, track=None):
+    """
+    Streaming form of analyse_frames: runs the testers on each frame as it is
+    decoded and yields its EventFrames straight away, raw like analyse_frames.
+    """
+    stage = FeatureStage(required_features(testers))
+    stack = FrameStack(fps, capacity=max(required_window(testers), stage.window))
+    track = track if track is not None else TrackTable()
+    # Testers that declare features get the shared ones, others only read the stack
+    shared = [hasattr(tester, 'features') for tester in testers]
+    # Call times are buffered and handed to the metrics with each progress line
+    buffers = [REGISTRY.buffer('tester', tester=tester_name(tester)) for tester in testers]
+    buffers.append(REGISTRY.buffer('features'))
+    record = [buffer.add for buffer in buffers]
+    event_count = REGISTRY.counter('events')
+    progress = Progress("Events")
+    clock = time.perf_counter
+
+    try:
+        for row in _record_frames(system, track, first_frame):
+            i = row.frame
+            stack.push(row)
+            start = clock()
+            features = stage.update(stack)
+            record[-1](clock() - start)
+
+            # Iterate through event testers
+            emitted = 0
+            for tester, takes_features, add in zip(testers, shared, record):
+                start = clock()
+                result = tester.test_event(stack, features) if takes_features else tester.test_event(stack)
+                add(clock() - start)
+                # Warm-up frames of a segment only prime the testers
+                if result is not None and i >= emit_from:
+                    emitted += 1
+                    yield EventFrame(i, result.to_string())
+
+            # A sampled progress line, a print per frame costs more than the testers
+            if emitted:
+                event_count.inc(emitted)
+            if progress.update(i, emitted):
+                for buffer in buffers:
+                    buffer.flush()
+    finally:
+        for buffer in buffers:
+            buffer.flush()
+
+def analyse_frames(system, testers, fps=FPS, first_frame=0, emit_from=1, track=None, batch=BATCH_EVENTS,
+                   merge=False):
+    """
+    Runs the event testers over every frame of `system`, returns the raw EventFrames.
+    The normalised tracks are recorded into `track` (a TrackTable), pass one in to keep them.
+    With `batch` the testers run once over the finished track instead of once per frame
+    (and `merge` is passed on to analyse_track).
+    """
+    track = track if track is not None else TrackTable()
+    if not batch:
+        return list(iter_events(system, testers, fps, first_frame, emit_from, track))
+
+    # The testers only run at the end, the progress lines cover decoding and detection
+    progress = Progress("Frames", count_events=False)
+    for row in _record_frames(system, track, first_frame):
+        progress.update(row.frame)
+    return analyse_track(track, testers, emit_from, fps, merge=merge)
+
+def _init_worker(threads):
+    # Every worker runs its own model, split the cores instead of oversubscribing them
+    cv2.setNumThreads(threads)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+def _run_segment(url, profile, backend, options, read_start, start, end):
+    system = VisionSystem(url, profile=profile, backend=backend, start_frame=read_start, end_frame=end, **options)
+    # Fresh tester state per segment, the registry instances are never shared across processes
+    testers = copy.deepcopy(EventTesters.ALL)
+    # A pool process can run more than one segment, only this one's metrics go back
+    REGISTRY.reset()
+    events = analyse_frames(system, testers, first_frame=read_start, emit_from=start + 1, merge=True)
+    return events, REGISTRY.snapshot()
+
+def _iter_parallel(url, profile, backend, workers, options):
+    cap = cv2.VideoCapture(url)
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+
+    segments = plan_segments(total_frames, workers, OVERLAP_SECONDS * FPS, MIN_SEGMENT_SECONDS * FPS)
+    print(f"🧩 Splitting {total_frames} frames into {len(segments)} segments", flush=True)
+    # Hashed once here instead of once per worker for the detection cache key
+    if options.get('cache', USE_DETECTION_CACHE):
+        options = dict(options, content_hash=video_hash(url))
+
+    threads = max(1, (os.cpu_count() or 1) // len(segments))
+    # spawn, not fork: torch and the decoder threads don't survive a fork
+    context = multiprocessing.get_context("spawn")
+    pool = ProcessPoolExecutor(max_workers=len(segments), mp_context=context,
+                               initializer=_init_worker, initargs=(threads,))
+    futures, finished = [], False
+    try:
+        futures = [pool.submit(_run_segment, url, profile, backend, options, *segment) for segment in segments]
+        # Segments are contiguous, so concatenating in order gives one ordered stream
+        for future in futures:
+            events, metrics = future.result()
+            REGISTRY.merge(metrics)
+            yield from events
+        finished = True
+    finally:
+        # Closed early (a streaming client went away) or failed: drop the segments nobody will read
+        # instead of waiting for them, running ones finish in the background
+        if not finished:
+            for future in futures:
+                future.cancel()
+        pool.shutdown(wait=finished, cancel_futures=not finished)
+
+def _process_parallel(url, profile, backend, workers, options):
+    return list(_iter_parallel(url, profile, backend, workers, options))
+
+def process_frames(url, profile=DEFAULT_PROFILE, workers=WORKERS, backend=DEFAULT_BACKEND, export_path=None,
+                   compression=None, **options):
+    """
+    Analyses the video at `url`, returns its merged events as JSON. With
+    `export_path` they are also written in the binary format (data.eventfile),
+    serially together with the normalised track. `options` go to process_video
+    in every worker (max_stride, ...).
+    """
+    print(f"\n{'='*80}", flush=True)
+    print(f"🎬 process_frames() CALLED with video: {url}", flush=True)
+    print(f"{'='*80}\n", flush=True)
+
+    order = OrderOfEvents()
+    track = None
+
+    if workers > 1:
+        print(f"📹 Processing in parallel with {workers} workers...", flush=True)
+        events = _process_parallel(url, profile, backend, workers, options)
+    else:
+        print(f"📹 Initializing VisionSystem...", flush=True)
+        system = VisionSystem(url, profile=profile, backend=backend, **options)
+        print(f"🔄 Starting frame processing loop...", flush=True)
+        # Only kept for the export, the segments' tracks stay in their workers
+        track = TrackTable() if export_path is not None else None
+        # Fresh tester state per video, uploads follow each other and the server can run several at once
+        events = analyse_frames(system, copy.deepcopy(EventTesters.ALL), track=track, merge=True)
+
+    for event in events:
+        order.addEvent(event)
 
     # --- THE COMPRESSION LOGIC ---
     print(f"\n{'='*80}", flush=True)
-    print(f"✅ Frame processing complete! Total frames processed: {i}", flush=True)
+    print(f"✅ Frame processing complete! Total events detected: {len(events)}", flush=True)
     print(f"🔄 Merging consecutive events...", flush=True)
 
-    # Capture the result of the merge
-    merged_events = order.mergeConsecutiveEvents()
+    # Capture the result of the merge (also joins events repeated across segment boundaries)
+    with REGISTRY.timer('merge'):
+        merged_events = order.mergeConsecutiveEvents()
 
     print(f"📊 Total events after merge: {len(merged_events)}", flush=True)
     print(f"{'='*80}\n", flush=True)
 
     # Serialize the MERGED events
     json_array = json.dumps([asdict(e) for e in merged_events], indent=4)
+    if export_path is not None:
+        size = write_events(export_path, merged_events, track, compression)
+        print(f"💾 Exported {len(merged_events)} events ({size} bytes) to {export_path}", flush=True)
+
+    return json_array
+
+def stream_events(url, profile=DEFAULT_PROFILE, workers=WORKERS, backend=DEFAULT_BACKEND, **options):
+    """
+    Generator form of process_frames: yields the merged EventFrames as soon as
+    they are final instead of one JSON string once the whole video is done.
+    Serially an event is final the frame it fires (a merged run keeps its
+    first event); with workers, a segment's events come once it and every
+    segment before it have finished. `options` go to process_video as in
+    process_frames.
+    """
+    print(f"🎬 stream_events() CALLED with video: {url}", flush=True)
+    order = OrderOfEvents()
+
+    if workers > 1:
+        events = _iter_parallel(url, profile, backend, workers, options)
+    else:
+        system = VisionSystem(url, profile=profile, backend=backend, **options)
+        # Fresh tester state per stream, the server can run several at once
+        events = iter_events(system, copy.deepcopy(EventTesters.ALL))
 
-    return json_array
\ No newline at end of file
+    count = 0
+    try:
+        for event in events:
+            start = time.perf_counter()
+            merged = order.mergeEvent(event)
+            REGISTRY.observe('merge', time.perf_counter() - start)
+            if merged is not None:
+                count += 1
+                yield event
+    finally:
+        # Stopped early: stop the decoder or the segment pool now, not whenever the generator is collected
+        events.close()
+    print(f"📊 Streamed {count} merged events", flush=True)
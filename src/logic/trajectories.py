@@ -0,0 +1,204 @@
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+from data.Coord import Coord
+from data.Court import Court
+from data.tracktable import TrackTable
+from logic.perspective import NET_X, TENNIS_COURT_LENGTH, TENNIS_COURT_SINGLES_WIDTH
+
+# --- CONFIG ---
+FPS = 60
+SHOT_SPEED = 25.0           # m/s along the ground, ~90 km/h
+BOUNCE_RETENTION = 0.6      # Share of the ground speed kept through a bounce
+CARRY = 0.4                 # After the bounce the ball carries on for this share of the flight
+SPRINT_SPEED = 9.0          # m/s, clear of the movement testers' 0.5 m in 5 frames (7.5 m/s)
+BEHIND_BASELINE = 0.5       # m, where the players stand
+OUT_MARGIN = 1.0            # m, how far past a line random out balls land
+
+# Normalised court: x along the court (0 = far baseline), y across the singles court
+COURT = Court(Coord(0.0, 0.0), Coord(0.0, TENNIS_COURT_SINGLES_WIDTH),
+              Coord(TENNIS_COURT_LENGTH, TENNIS_COURT_SINGLES_WIDTH), Coord(TENNIS_COURT_LENGTH, 0.0))
+
+@dataclass
+class Mark:
+    """
+    Something the script made happen, at the track frame it happens on:
+    'shot' (ball on the racket), 'bounce' (ball on the ground, `inside` the
+    court or not), 'stop' (first frame the ball lies still) or 'move' (a
+    player sprinting until `end`).
+    """
+    kind: str
+    frame: int
+    position: tuple
+    inside: bool = None
+    player: int = None
+    end: int = None
+
+@dataclass
+class Trajectory:
+    track: TrackTable
+    marks: list
+
+    def of_kind(self, kind: str) -> list:
+        return [mark for mark in self.marks if mark.kind == kind]
+
+def is_inside(point, court: Court = COURT) -> bool:
+    # Bounds of the normalised court, lines count as in
+    xs = [c.x for c in (court.tl, court.tr, court.br, court.bl)]
+    ys = [c.y for c in (court.tl, court.tr, court.br, court.bl)]
+    return min(xs) <= point[0] <= max(xs) and min(ys) <= point[1] <= max(ys)
+
+class TrajectoryBuilder:
+    """
+    Scripts a ball and player track in normalised court space, frame by
+    frame, for the event testers without any video: shots with their bounce,
+    balls landing out, the ball lying still, players sprinting. Every step
+    is recorded as a Mark, the ground truth fixtures check the testers against.
+
+        builder = TrajectoryBuilder()
+        builder.shot(bounce=(18.0, 3.0))
+        builder.shot(bounce=(25.0, 4.0))     # Long, out
+        builder.stop(2.0)
+        trajectory = builder.build()
+
+    Player moves run alongside the ball from the frame they are scripted on.
+    """
+
+    def __init__(self, fps: int = FPS, ball=(BEHIND_BASELINE, TENNIS_COURT_SINGLES_WIDTH / 2),
+                 players=((-BEHIND_BASELINE, TENNIS_COURT_SINGLES_WIDTH / 2),
+                          (TENNIS_COURT_LENGTH + BEHIND_BASELINE, TENNIS_COURT_SINGLES_WIDTH / 2)),
+                 court: Court = COURT, first_frame: int = 1):
+        self.fps = fps
+        self.court = court
+        self.first_frame = first_frame
+        self.ball = [tuple(map(float, ball))]       # One position per frame so far
+        self.players = [tuple(map(float, p)) for p in players]
+        self.moves = []         # (player, start row, target, speed)
+        self.marks = []
+
+    @property
+    def position(self):
+        return self.ball[-1]
+
+    def frame(self, row: int) -> int:
+        return self.first_frame + row
+
+    def _fly(self, to, speed: float):
+        # Equal steps no longer than speed / fps, ending exactly on `to`
+        (x0, y0), (x1, y1) = self.position, to
+        distance = math.hypot(x1 - x0, y1 - y0)
+        steps = max(1, math.ceil(distance * self.fps / speed))
+        for i in range(1, steps + 1):
+            self.ball.append((x0 + (x1 - x0) * i / steps, y0 + (y1 - y0) * i / steps))
+
+    def shot(self, bounce, to=None, speed: float = SHOT_SPEED, retention: float = BOUNCE_RETENTION):
+        """
+        Hits the ball from where it is to `bounce` at `speed` (m/s), then lets
+        it carry on at `retention` of that speed to `to`, by default a further
+        CARRY of the flight in the same direction.
+        """
+        start = self.position
+        bounce = tuple(map(float, bounce))
+        if to is None:
+            to = (bounce[0] + (bounce[0] - start[0]) * CARRY, bounce[1] + (bounce[1] - start[1]) * CARRY)
+
+        self.marks.append(Mark('shot', self.frame(len(self.ball) - 1), start))
+        self._fly(bounce, speed)
+        self.marks.append(Mark('bounce', self.frame(len(self.ball) - 1), bounce, inside=is_inside(bounce, self.court)))
+        self._fly(to, speed * retention)
+        return self
+
+    def stop(self, seconds: float):
+        """The ball lies where it is for `seconds`."""
+        frames = max(1, round(seconds * self.fps))
+        self.marks.append(Mark('stop', self.frame(len(self.ball)), self.position))
+        self.ball += [self.position] * frames
+        return self
+
+    def move_player(self, player: int, to, speed: float = SPRINT_SPEED):
+        """Player 0 or 1 runs in a straight line to `to`, starting on the current frame."""
+        self.moves.append((player, len(self.ball) - 1, tuple(map(float, to)), speed))
+        return self
+
+    def _player_track(self, player: int, num_rows: int):
+        # Positions per frame and a 'move' mark per scripted move
+        positions, marks = [self.players[player]] * num_rows, []
+        current, free_from = self.players[player], 0
+        for index, start, to, speed in self.moves:
+            if index != player:
+                continue
+            # Queued behind the player's previous move
+            start = max(start, free_from)
+            (x0, y0), (x1, y1) = current, to
+            steps = max(1, math.ceil(math.hypot(x1 - x0, y1 - y0) * self.fps / speed))
+            for i in range(1, steps + 1):
+                if start + i < num_rows:
+                    positions[start + i] = (x0 + (x1 - x0) * i / steps, y0 + (y1 - y0) * i / steps)
+            end = start + steps
+            positions[end + 1:] = [to] * max(0, num_rows - end - 1)
+            marks.append(Mark('move', self.frame(start + 1), to, player=index, end=self.frame(end)))
+            current, free_from = to, end
+        return positions, marks
+
+    def build(self, dropout: float = 0.0, rng: np.random.Generator = None) -> Trajectory:
+        """
+        The scripted frames as a TrackTable. `dropout` is the chance the ball
+        goes undetected on a frame (marks stay where they were scripted).
+        """
+        if dropout and rng is None:
+            rng = np.random.default_rng()
+        num_rows = len(self.ball)
+        (p1, p1_marks), (p2, p2_marks) = self._player_track(0, num_rows), self._player_track(1, num_rows)
+
+        track = TrackTable()
+        for row, ball in enumerate(self.ball):
+            if dropout and rng.random() < dropout:
+                ball = None
+            track.append(self.frame(row), ball, p1[row], p2[row], self.court)
+        return Trajectory(track, sorted(self.marks + p1_marks + p2_marks, key=lambda mark: mark.frame))
+
+def random_rally(num_frames: int, rng: np.random.Generator, fps: int = FPS, out_rate: float = 0.1,
+                 dropout: float = 0.03) -> Trajectory:
+    """
+    Points of 2 to 8 shots, each ending on an out ball (`out_rate` of the
+    bounces) or the last shot, then the ball lying still for 1 to 3 s while
+    the players walk back. Receivers sprint across to meet the ball.
+    """
+    builder = TrajectoryBuilder(fps=fps)
+    length, width = TENNIS_COURT_LENGTH, TENNIS_COURT_SINGLES_WIDTH
+    while len(builder.ball) < num_frames:
+        for shot in range(int(rng.integers(2, 9))):
+            # Hitting towards the near baseline while on the far half, and back
+            far_side = builder.position[0] < NET_X
+            out = rng.random() < out_rate
+            x = rng.uniform(NET_X + 1.0, length - 0.3) if far_side else rng.uniform(0.3, NET_X - 1.0)
+            y = rng.uniform(0.3, width - 0.3)
+            if out:
+                if rng.random() < 0.5:
+                    x = length + rng.uniform(0.2, OUT_MARGIN) if far_side else -rng.uniform(0.2, OUT_MARGIN)
+                else:
+                    y = -rng.uniform(0.2, OUT_MARGIN) if rng.random() < 0.5 else width + rng.uniform(0.2, OUT_MARGIN)
+
+            receiver = 1 if far_side else 0
+            baseline = length + BEHIND_BASELINE if far_side else -BEHIND_BASELINE
+            builder.move_player(receiver, (baseline, min(max(y, 0.0), width)))
+            builder.shot((x, y), speed=rng.uniform(0.8, 1.2) * SHOT_SPEED)
+            if out:
+                break
+
+        builder.stop(rng.uniform(1.0, 3.0))
+        for player, baseline in ((0, -BEHIND_BASELINE), (1, length + BEHIND_BASELINE)):
+            builder.move_player(player, (baseline, width / 2), speed=2.0)
+
+        # Next point served from behind a baseline
+        side = 0 if rng.random() < 0.5 else 1
+        serve = (BEHIND_BASELINE if side == 0 else length - BEHIND_BASELINE, width / 2)
+        builder.ball.append(serve)
+
+    builder.ball = builder.ball[:num_frames]
+    trajectory = builder.build(dropout=dropout, rng=rng)
+    last = builder.frame(num_frames - 1)
+    trajectory.marks = [mark for mark in trajectory.marks if mark.frame <= last]
+    return trajectory
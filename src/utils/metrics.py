@@ -0,0 +1,214 @@
+import bisect
+import threading
+import time
+
+import numpy as np
+
+# --- CONFIG ---
+PREFIX = "ballknowledge"
+# Seconds, from one tester call (~µs) up to an LLM or TTS request (~s)
+BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+           1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+PROGRESS_EVERY = 600        # Frames between progress lines (~10 s of video at 60 fps)
+
+class Histogram:
+    """
+    Call durations of one stage: per-bucket counts, sum and count. Hot loops
+    keep the handle from Metrics.histogram() instead of looking it up per call.
+    """
+    __slots__ = ('lock', 'counts', 'sum', 'count')
+
+    def __init__(self, lock):
+        self.lock = lock
+        self.counts = [0] * (len(BUCKETS) + 1)     # Last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds : float):
+        k = bisect.bisect_left(BUCKETS, seconds)
+        with self.lock:
+            self.counts[k] += 1
+            self.sum += seconds
+            self.count += 1
+
+    def observe_many(self, seconds):
+        seconds = np.asarray(seconds, dtype=np.float64)
+        counts = np.bincount(np.searchsorted(BUCKETS, seconds, side='left'), minlength=len(self.counts))
+        self.merge(counts.tolist(), float(seconds.sum()), len(seconds))
+
+    def merge(self, counts, total, count):
+        with self.lock:
+            for k, n in enumerate(counts):
+                self.counts[k] += n
+            self.sum += total
+            self.count += count
+
+class Buffer:
+    """
+    Observations for one histogram collected in a plain list and handed over
+    in bulk by flush(), for loops that time several calls per frame.
+    """
+    __slots__ = ('histogram', 'values', 'add')
+
+    def __init__(self, histogram : Histogram):
+        self.histogram = histogram
+        self.values = []
+        self.add = self.values.append
+
+    def flush(self):
+        if self.values:
+            self.histogram.observe_many(self.values)
+            self.values.clear()
+
+class Counter:
+    __slots__ = ('lock', 'value')
+
+    def __init__(self, lock):
+        self.lock = lock
+        self.value = 0
+
+    def inc(self, amount : float = 1):
+        with self.lock:
+            self.value += amount
+
+class Timer:
+    """`with metrics.timer("llm"):` observes the block's wall time, even when it raises."""
+    __slots__ = ('histogram', 'start')
+
+    def __init__(self, histogram : Histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+        return False
+
+class Metrics:
+    """
+    Process-wide stage timings and counters, rendered in the Prometheus text
+    format. Stages are histograms labelled by stage (and any extra labels, e.g.
+    the tester); counters are plain running totals. Cheap enough to observe every
+    tester call: one bisect and a few adds under a lock.
+    """
+
+    def __init__(self):
+        # Re-entrant: merge() holds it while Histogram.merge() adds under it again
+        self.lock = threading.RLock()
+        self.stages = {}        # (stage, labels) -> Histogram
+        self.counters = {}      # (name, labels) -> Counter
+
+    def histogram(self, stage : str, **labels) -> Histogram:
+        key = (stage, tuple(sorted(labels.items())))
+        with self.lock:
+            if key not in self.stages:
+                self.stages[key] = Histogram(self.lock)
+            return self.stages[key]
+
+    def counter(self, name : str, **labels) -> Counter:
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            if key not in self.counters:
+                self.counters[key] = Counter(self.lock)
+            return self.counters[key]
+
+    def buffer(self, stage : str, **labels) -> Buffer:
+        return Buffer(self.histogram(stage, **labels))
+
+    def observe(self, stage : str, seconds : float, **labels):
+        self.histogram(stage, **labels).observe(seconds)
+
+    def timer(self, stage : str, **labels):
+        return Timer(self.histogram(stage, **labels))
+
+    def inc(self, name : str, amount : float = 1, **labels):
+        self.counter(name, **labels).inc(amount)
+
+    def reset(self):
+        # Zeroed in place, so handles held by running loops stay registered
+        with self.lock:
+            for histogram in self.stages.values():
+                histogram.counts = [0] * len(histogram.counts)
+                histogram.sum, histogram.count = 0.0, 0
+            for counter in self.counters.values():
+                counter.value = 0
+
+    def _copy(self):
+        with self.lock:
+            stages = [(key, list(h.counts), h.sum, h.count) for key, h in self.stages.items() if h.count]
+            counters = [(key, c.value) for key, c in self.counters.items() if c.value]
+        return sorted(stages), sorted(counters)
+
+    def snapshot(self):
+        """Plain data copy, picklable, so worker processes can hand their metrics back."""
+        stages, counters = self._copy()
+        return {'stages': stages, 'counters': counters}
+
+    def merge(self, snapshot):
+        with self.lock:
+            for (stage, labels), counts, total, count in snapshot['stages']:
+                self.histogram(stage, **dict(labels)).merge(counts, total, count)
+            for (name, labels), amount in snapshot['counters']:
+                self.counter(name, **dict(labels)).inc(amount)
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        stages, counters = self._copy()
+
+        name = f"{PREFIX}_stage_seconds"
+        lines = [f"# HELP {name} Wall time per call of each pipeline stage",
+                 f"# TYPE {name} histogram"]
+        for (stage, labels), counts, total, count in stages:
+            base = _labels((('stage', stage),) + labels)
+            cumulative = 0
+            for bound, n in zip(BUCKETS + (float('inf'),), counts):
+                cumulative += n
+                le = "+Inf" if bound == float('inf') else repr(bound)
+                lines.append(f"{name}_bucket{{{base},le=\"{le}\"}} {cumulative}")
+            lines.append(f"{name}_sum{{{base}}} {total!r}")
+            lines.append(f"{name}_count{{{base}}} {count}")
+
+        seen = set()
+        for (counter, labels), value in counters:
+            full = f"{PREFIX}_{counter}_total"
+            if full not in seen:
+                seen.add(full)
+                lines += [f"# HELP {full} Running total of {counter.replace('_', ' ')}", f"# TYPE {full} counter"]
+            lines.append(f"{full}{{{_labels(labels)}}} {value:g}" if labels else f"{full} {value:g}")
+        return "\n".join(lines) + "\n"
+
+def _labels(pairs):
+    escape = lambda v: str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return ",".join(f'{k}="{escape(v)}"' for k, v in pairs)
+
+class Progress:
+    """
+    Sampled progress line instead of a print per frame: every PROGRESS_EVERY
+    frames, with the frame rate since the last line. Without `count_events`
+    (frames recorded before any tester runs) the line leaves out the events.
+    """
+
+    def __init__(self, label : str, every : int = None, count_events : bool = True):
+        self.label = label
+        self.every = every or PROGRESS_EVERY
+        self.count_events = count_events
+        self.frames = 0
+        self.events = 0
+        self.last = time.perf_counter()
+
+    def update(self, frame_index : int, events : int = 0) -> bool:
+        # True on the frames that print, callers flush buffered metrics then
+        self.frames += 1
+        self.events += events
+        if self.frames % self.every:
+            return False
+        now = time.perf_counter()
+        fps = self.every / max(now - self.last, 1e-9)
+        self.last = now
+        events = f", {self.events} events so far" if self.count_events else ""
+        print(f"🔄 {self.label}: frame {frame_index}{events}, {fps:.0f} fps", flush=True)
+        return True
+
+REGISTRY = Metrics()
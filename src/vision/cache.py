@@ -0,0 +1,136 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import supervision as sv
+
+from utils.metrics import REGISTRY
+
+# --- CONFIG ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(BASE_DIR, '..', '..', 'outputs', 'detection_cache')
+CACHE_VERSION = 1       # Bump when the stored layout or detection semantics change
+HASH_CHUNK = 1 << 20
+HASH_SAMPLES = 16       # Chunks hashed, spread over the file from the first to the last
+
+
+def video_hash(path: str, samples: int = HASH_SAMPLES) -> str:
+    """
+    sha256 of the file size and `samples` chunks spread over the contents,
+    so renamed or re-uploaded copies still hit without reading a whole
+    multi-GB match. Another video, or another encode of the same one,
+    differs in every chunk. Files no bigger than the samples are hashed whole.
+    """
+    size = os.path.getsize(path)
+    digest = hashlib.sha256(str(size).encode())
+    with open(path, 'rb') as f:
+        if size <= samples * HASH_CHUNK:
+            for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+                digest.update(chunk)
+        else:
+            for k in range(samples):
+                f.seek((size - HASH_CHUNK) * k // (samples - 1))
+                digest.update(f.read(HASH_CHUNK))
+    return digest.hexdigest()
+
+
+def cache_path(content_hash: str, settings: dict, cache_dir: str = None) -> str:
+    # Everything that changes what the detector returns goes into the key
+    cache_dir = cache_dir or CACHE_DIR
+    settings = dict(settings, version=CACHE_VERSION)
+    settings_hash = hashlib.sha256(json.dumps(settings, sort_keys=True).encode()).hexdigest()[:16]
+    return os.path.normpath(os.path.join(cache_dir, f"{content_hash[:32]}_{settings_hash}.npz"))
+
+
+class CachedDetections:
+    """
+    Raw detector output for one video, or one segment of it, stored
+    column-wise. Frame indices are global; a segment's frames before its
+    start are simply neither detected nor held.
+
+    Frame i owns rows offsets[i]:offsets[i + 1] of xyxy / class_id /
+    confidence. `detected` marks frames the detector actually ran on and
+    `held` frames the motion gate skipped (previous result kept); the rest
+    were filled in by the tracker (detection stride). All are replayed the
+    same way. Boxes are in the working resolution of the run's profile.
+    """
+
+    def __init__(self, detected, offsets, xyxy, class_id, confidence, meta, held=None):
+        self.detected = detected
+        self.held = held if held is not None else np.zeros_like(detected)
+        self.offsets = offsets
+        self.xyxy = xyxy
+        self.class_id = class_id
+        self.confidence = confidence
+        self.meta = meta
+
+    @property
+    def num_frames(self):
+        return len(self.detected)
+
+    def detections(self, index):
+        a, b = self.offsets[index], self.offsets[index + 1]
+        return sv.Detections(xyxy=self.xyxy[a:b], class_id=self.class_id[a:b], confidence=self.confidence[a:b])
+
+    @classmethod
+    def load(cls, path):
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                meta = json.loads(str(data['meta']))
+                held = data['held'] if 'held' in data.files else None
+                return cls(data['detected'], data['offsets'], data['xyxy'], data['class_id'],
+                           data['confidence'], meta, held)
+        except Exception as e:
+            # A truncated or stale file is just a miss
+            print(f"⚠️ Ignoring unreadable detection cache {path}: {e}", flush=True)
+            return None
+
+
+class DetectionRecorder:
+    """Collects detector output frame by frame during a live run, then writes it once."""
+
+    def __init__(self, meta: dict):
+        self.meta = meta
+        self.frames = {}
+        self.held = []
+
+    def record(self, index, detections):
+        self.frames[index] = (
+            detections.xyxy.astype(np.float32),
+            detections.class_id.astype(np.int16),
+            detections.confidence.astype(np.float32),
+        )
+
+    def hold(self, index):
+        self.held.append(index)
+
+    def save(self, path, num_frames):
+        held = np.zeros(num_frames, dtype=bool)
+        held[self.held] = True
+        detected = np.zeros(num_frames, dtype=bool)
+        counts = np.zeros(num_frames, dtype=np.int64)
+        for index, (xyxy, _, _) in self.frames.items():
+            detected[index] = True
+            counts[index] = len(xyxy)
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+
+        ordered = [self.frames[i] for i in sorted(self.frames)]
+        empty = (np.empty((0, 4), np.float32), np.empty(0, np.int16), np.empty(0, np.float32))
+        xyxy, class_id, confidence = (np.concatenate(col) for col in zip(empty, *ordered))
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        ignore = os.path.join(os.path.dirname(path), '.gitignore')
+        if not os.path.exists(ignore):
+            with open(ignore, 'w') as f:
+                f.write("*\n")
+
+        # Write then rename, so a crash never leaves a half-written cache behind
+        tmp = path + ".tmp.npz"
+        with REGISTRY.timer('file_write', target='detection_cache'):
+            np.savez_compressed(tmp, detected=detected, held=held, offsets=offsets, xyxy=xyxy, class_id=class_id,
+                                confidence=confidence, meta=json.dumps(self.meta))
+            os.replace(tmp, path)
+        print(f"💾 Cached detections for {num_frames} frames ({len(xyxy)} boxes) to {path}", flush=True)
@@ -0,0 +1,315 @@
+import json
+import os
+import time
+
+import cv2
+import numpy as np
+
+from data.Coord import Coord
+from data.Court import Court
+from utils.metrics import REGISTRY
+
+# --- CONFIG ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CALIBRATION_DIR = os.path.join(BASE_DIR, '..', '..', 'outputs', 'calibration_cache')
+CALIBRATION_FILE = 'cameras.json'
+MAX_CAMERAS = 200           # Oldest entries are dropped beyond this
+
+# SAMPLING: Frames spread over the first couple of seconds, so a player
+# standing on a line in one of them does not hide it
+CALIBRATION_FRAMES = 5
+CALIBRATION_STEP = 15
+
+# FINGERPRINT: A tiny greyscale thumbnail, the median of the sampled frames. The
+# same fixed camera gives nearly the same thumbnail (players are a few pixels at
+# this size). Near-uniform ones (black frames, fades) say nothing about the camera
+# and are never cached, and cached corners must still lie on this video's lines.
+FINGERPRINT_SIZE = (32, 18)
+FINGERPRINT_TOLERANCE = 6.0     # Mean grey-level difference still counted as the same camera
+MIN_FINGERPRINT_STD = 8.0       # Grey-level spread below which a thumbnail is too uniform to key on
+MIN_LINE_SUPPORT = 0.6          # Share of a cached court's outline that must be on a painted line
+FAILED_CAMERA_SECONDS = 3600    # A camera without lines is retried after this long
+
+# LINE DETECTION: Thresholds relative to frame height so every resolution behaves the same
+LINE_WIDTH = 0.012          # Top-hat kernel, wider than a court line but narrower than a player
+LINE_CONTRAST = 40          # Grey levels a line must stand out from its surroundings
+MIN_LINE_LENGTH = 0.08      # Shortest Hough segment kept
+MAX_LINE_GAP = 0.01         # Gaps bridged inside a segment (net posts, ball, shadows)
+MERGE_DISTANCE = 0.012      # Segments closer than this belong to the same court line
+MAX_BASELINE_SLOPE = 0.15   # |dy/dx| of a baseline
+MIN_SIDELINE_SLOPE = 0.15   # |dx/dy| of a sideline, the centre service line is steeper
+ALLEY_RATIO = (0.07, 0.18)  # Doubles alley / baseline width, a second sideline in this range is the singles line
+MIN_COURT_AREA = 0.05       # Fraction of the frame the court must cover
+
+
+def fingerprint(frames) -> np.ndarray:
+    thumbnails = [cv2.resize(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), FINGERPRINT_SIZE, interpolation=cv2.INTER_AREA)
+                  for frame in frames]
+    return np.median(thumbnails, axis=0).astype(np.uint8)
+
+
+def is_distinctive(thumbnail) -> bool:
+    return float(np.std(thumbnail)) >= MIN_FINGERPRINT_STD
+
+
+def line_mask(frames) -> np.ndarray:
+    """Pixels that are a thin bright line in at least half the frames."""
+    h = frames[0].shape[0]
+    k = max(3, int(h * LINE_WIDTH) | 1)
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (k, k))
+    votes = np.zeros(frames[0].shape[:2], dtype=np.uint8)
+    for frame in frames:
+        grey = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        # Top-hat keeps what is brighter than its neighbourhood and thinner than the kernel
+        tophat = cv2.morphologyEx(grey, cv2.MORPH_TOPHAT, kernel)
+        votes += (tophat > LINE_CONTRAST).astype(np.uint8)
+    return ((votes * 2 >= len(frames)) * 255).astype(np.uint8)
+
+
+def line_support(court, mask) -> float:
+    """Share of the court's outline within a line width of a painted line in `mask`."""
+    k = max(3, int(mask.shape[0] * LINE_WIDTH) | 1)
+    near_line = cv2.dilate(mask, np.ones((k, k), np.uint8))
+    outline = np.zeros_like(mask)
+    cv2.polylines(outline, [np.int32(court.to_vectors())], True, 255, 1)
+    on_outline = outline > 0
+    return float(np.count_nonzero(near_line[on_outline])) / max(1, np.count_nonzero(on_outline))
+
+
+def merge_lines(lines, key, distance):
+    """
+    Groups (slope, intercept, length) lines whose `key` value is within
+    `distance`, returns the length-weighted mean line of each group sorted by key.
+    """
+    merged = []
+    for slope, intercept, length in sorted(lines, key=key):
+        if merged and key((slope, intercept, length)) - merged[-1]['last'] <= distance:
+            group = merged[-1]
+        else:
+            group = {'sum': np.zeros(2), 'weight': 0.0}
+            merged.append(group)
+        group['sum'] += length * np.array([slope, intercept])
+        group['weight'] += length
+        group['last'] = key((slope, intercept, length))
+    return [tuple(g['sum'] / g['weight']) + (g['weight'],) for g in merged]
+
+
+def pick_sideline(lines, at_y, outer_first, baseline_width):
+    # Outermost line is the doubles sideline; an inner one an alley's width away is the singles line
+    xs = sorted(((a * at_y + b, (a, b)) for a, b, _ in lines), reverse=not outer_first)
+    outer_x, outer = xs[0]
+    for x, line in xs[1:]:
+        ratio = abs(x - outer_x) / baseline_width
+        if ALLEY_RATIO[0] <= ratio <= ALLEY_RATIO[1]:
+            return line
+    return outer
+
+
+def detect_court(frames, mask=None) -> Court | None:
+    """
+    Finds the singles court corners from its painted lines, or None.
+
+    Long straight segments (Hough) on the line mask are split into
+    baselines (near horizontal) and sidelines (slanted towards the far end),
+    near-duplicates from thick lines merged, and the outermost baselines
+    intersected with the sidelines. The result only counts when it looks
+    like a court seen from behind a baseline. `mask` is line_mask(frames)
+    when the caller already has it.
+    """
+    h, w = frames[0].shape[:2]
+    mask = line_mask(frames) if mask is None else mask
+    segments = cv2.HoughLinesP(mask, 1, np.pi / 180, threshold=int(h * MIN_LINE_LENGTH),
+                               minLineLength=h * MIN_LINE_LENGTH, maxLineGap=h * MAX_LINE_GAP)
+    if segments is None:
+        return None
+
+    horizontal, left, right = [], [], []
+    for x1, y1, x2, y2 in segments.reshape(-1, 4).astype(float):
+        length = np.hypot(x2 - x1, y2 - y1)
+        if x1 != x2 and abs((y2 - y1) / (x2 - x1)) <= MAX_BASELINE_SLOPE:
+            c = (y2 - y1) / (x2 - x1)                       # y = c * x + d
+            horizontal.append((c, y1 - c * x1, length))
+        elif y1 != y2:
+            a = (x2 - x1) / (y2 - y1)                       # x = a * y + b
+            if a <= -MIN_SIDELINE_SLOPE:
+                left.append((a, x1 - a * y1, length))       # Leans right towards the far baseline
+            elif a >= MIN_SIDELINE_SLOPE:
+                right.append((a, x1 - a * y1, length))
+    if not horizontal or not left or not right:
+        return None
+
+    merge = h * MERGE_DISTANCE
+    mid_y = h / 2
+    left = merge_lines(left, lambda l: l[0] * mid_y + l[1], merge)
+    right = merge_lines(right, lambda l: l[0] * mid_y + l[1], merge)
+    horizontal = merge_lines(horizontal, lambda l: l[0] * w / 2 + l[1], merge)
+
+    # Baselines run between the outermost sidelines; ad boards and the scoreboard do not
+    outer_left = min(left, key=lambda l: l[0] * mid_y + l[1])
+    outer_right = max(right, key=lambda l: l[0] * mid_y + l[1])
+    def span(y):
+        return (outer_left[0] * y + outer_left[1], outer_right[0] * y + outer_right[1])
+
+    baselines = []
+    for c, d, length in horizontal:
+        y = c * w / 2 + d
+        x0, x1 = span(y)
+        if x1 - x0 > 0 and length >= 0.5 * (x1 - x0):
+            baselines.append((c, d, y))
+    if len(baselines) < 2:
+        return None
+    far = min(baselines, key=lambda l: l[2])
+    near = max(baselines, key=lambda l: l[2])
+
+    near_width = np.subtract(*span(near[2])[::-1])
+    left_line = pick_sideline(left, near[2], True, near_width)
+    right_line = pick_sideline(right, near[2], False, near_width)
+
+    def corner(base, side):
+        # y = c * x + d and x = a * y + b
+        c, d = base[:2]
+        a, b = side
+        y = (c * b + d) / (1 - c * a)
+        return Coord(int(round(a * y + b)), int(round(y)))
+
+    court = Court(tl=corner(far, left_line), tr=corner(far, right_line),
+                  br=corner(near, right_line), bl=corner(near, left_line))
+    return court if looks_like_court(court, w, h) else None
+
+
+def looks_like_court(court, w, h) -> bool:
+    quad = np.array(court.to_vectors(), dtype=np.float32)
+    margin = 0.05
+    if np.any(quad[:, 0] < -margin * w) or np.any(quad[:, 0] > (1 + margin) * w):
+        return False
+    if np.any(quad[:, 1] < -margin * h) or np.any(quad[:, 1] > (1 + margin) * h):
+        return False
+    far_width, near_width = court.tr.x - court.tl.x, court.br.x - court.bl.x
+    if far_width <= 0 or near_width < far_width or court.bl.y <= court.tl.y or court.br.y <= court.tr.y:
+        return False
+    return cv2.isContourConvex(quad) and cv2.contourArea(quad) >= MIN_COURT_AREA * w * h
+
+
+class CalibrationCache:
+    """
+    Court corners per camera, stored as JSON next to the other outputs.
+    Cameras whose lines could not be found are stored too, with corners
+    null, so they go straight to the fallback until FAILED_CAMERA_SECONDS
+    have passed.
+    """
+
+    def __init__(self, cache_dir: str = None):
+        self.path = os.path.normpath(os.path.join(cache_dir or CALIBRATION_DIR, CALIBRATION_FILE))
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return []
+        try:
+            with open(self.path) as f:
+                return json.load(f)['cameras']
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable calibration cache {self.path}: {e}", flush=True)
+            return []
+
+    def lookup(self, thumbnail, shape):
+        # The closest stored camera ({'corners': ... or None, ...}), None for a new one
+        best, best_diff = None, FINGERPRINT_TOLERANCE
+        for camera in self.load():
+            if _expired(camera):
+                continue
+            diff = _difference(camera, thumbnail, shape)
+            if diff <= best_diff:
+                best, best_diff = camera, diff
+        return best
+
+    def store(self, thumbnail, shape, court):
+        # court None: the lines were not found for this camera. Replaces an
+        # entry for the same camera whose corners no longer matched.
+        cameras = [camera for camera in self.load()
+                   if not _expired(camera) and _difference(camera, thumbnail, shape) > FINGERPRINT_TOLERANCE]
+        cameras.append({
+            'fingerprint': thumbnail.tobytes().hex(), 'shape': list(shape[:2]),
+            'corners': court.to_vectors() if court is not None else None, 'created': time.time(),
+        })
+        cameras = cameras[-MAX_CAMERAS:]
+
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        ignore = os.path.join(directory, '.gitignore')
+        if not os.path.exists(ignore):
+            with open(ignore, 'w') as f:
+                f.write("*\n")
+
+        # Parallel segment workers may calibrate at once, each writes its own temp file
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with REGISTRY.timer('file_write', target='calibration_cache'):
+            with open(tmp, 'w') as f:
+                json.dump({'cameras': cameras}, f)
+            os.replace(tmp, self.path)
+
+
+def _difference(camera, thumbnail, shape) -> float:
+    # Mean grey-level difference of the thumbnails, infinite for another frame size
+    if camera['shape'] != list(shape[:2]):
+        return float('inf')
+    stored = np.frombuffer(bytes.fromhex(camera['fingerprint']), dtype=np.uint8)
+    return float(np.mean(cv2.absdiff(stored, thumbnail.reshape(-1))))
+
+
+def _expired(camera) -> bool:
+    return camera['corners'] is None and time.time() - camera['created'] > FAILED_CAMERA_SECONDS
+
+
+def calibrate_court(frames, cache: bool = True, cache_dir: str = None) -> Court | None:
+    """
+    Court corners for a video, or None when they cannot be found.
+
+    Reads up to CALIBRATION_FRAMES of `frames`. A cached camera skips the
+    line search, but its corners are only used if they lie on this video's
+    lines; otherwise it is calibrated afresh.
+    """
+    samples = [frame for _, frame in zip(range(CALIBRATION_FRAMES), frames)]
+    if not samples:
+        return None
+
+    shape = samples[0].shape
+    thumbnail = fingerprint(samples)
+    store = CalibrationCache(cache_dir) if cache and is_distinctive(thumbnail) else None
+    mask = None
+    if store is not None:
+        camera = store.lookup(thumbnail, shape)
+        if camera is not None and camera['corners'] is None:
+            print(f"⚠️ No court lines for this camera in the last {FAILED_CAMERA_SECONDS // 60} min "
+                  f"(calibration cache), delete {store.path} to retry now", flush=True)
+            return None
+        if camera is not None:
+            court = Court(*(Coord(*corner) for corner in camera['corners']))
+            mask = line_mask(samples)
+            if line_support(court, mask) >= MIN_LINE_SUPPORT:
+                print("✅ Court corners from calibration cache (same camera)", flush=True)
+                return court
+            print("⚠️ Cached court corners are not on this video's lines, calibrating again", flush=True)
+
+    start = time.perf_counter()
+    court = detect_court(samples, mask)
+    if court is None:
+        print(f"⚠️ Could not find the court lines in {len(samples)} frames", flush=True)
+    else:
+        print(f"✅ Detected court corners {court.to_vectors()} in {time.perf_counter() - start:.2f}s", flush=True)
+    # Failures are remembered too, so the fallback is immediate for a while
+    if store is not None:
+        store.store(thumbnail, shape, court)
+    return court
+
+
+def sample_frames(cap, first_frame, count: int = CALIBRATION_FRAMES, step: int = CALIBRATION_STEP):
+    """Yields `first_frame` then every `step`-th following frame of `cap`, lazily."""
+    yield first_frame
+    for _ in range(count - 1):
+        for _ in range(step - 1):
+            if not cap.grab():
+                return
+        ret, frame = cap.read()
+        if not ret:
+            return
+        yield frame
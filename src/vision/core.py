@@ -1,7 +1,6 @@
 import cv2
 import numpy as np
 import os
-from ultralytics import YOLO
 import supervision as sv
 
 # --- IMPORTS ---
@@ -10,34 +9,94 @@ from data.Ball import Ball
 from data.Court import Court
 from data.Player import Player
 from data.frame import Frame
+from vision.cache import CachedDetections, DetectionRecorder, cache_path, video_hash
+from vision.calibration import calibrate_court, sample_frames
+from vision.framesource import FrameSource, BLOCK, QUEUE_SIZE
+from vision.models import get_model, MODEL_NAME, DEFAULT_BACKEND
+from vision.motion import MotionGate, GATE_WIDTH, PIXEL_DIFF, MIN_CHANGED_PIXELS, MAX_STATIC_FRAMES
+from vision.zones import CourtZones, PLAYER_BUFFER, BALL_BUFFER
+from vision.tracker import BallTracker
+from utils.metrics import REGISTRY
 
 # --- CONFIG ---
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-MODEL_NAME = os.path.join(BASE_DIR, '..', '..', 'assets', 'models', 'yolov8m.pt')
-
 # THRESHOLDS
 CONF_BALL = 0.10      
 MAX_COAST_FRAMES = 5 
 MAX_DIST_ERROR = 100 
+BALL_HYPOTHESES = 3   # Competing ball tracks kept alive, 1 = single track
+
+# BATCHING: Number of frames decoded and sent to YOLO in a single call
+BATCH_SIZE = 4
+
+# STRIDE: Run the detector every N frames and let the tracker fill the gaps.
+# MAX_STRIDE = 1 detects every frame; the stride only grows while the ball is
+# slow or has been absent for a while, and drops back to 1 as soon as it moves
+# fast or the track is lost.
+MAX_STRIDE = 1
+FAST_BALL_SPEED = 8         # px/frame, always detect every frame above this
+STATIONARY_BALL_SPEED = 2   # px/frame, use the full stride below this
+ABSENT_BALL_FRAMES = 30     # Frames without a ball before it counts as out of play
+
+# ROI: While the ball track is confident, look for the ball only in a window
+# around the predicted position at native resolution, and find the (large)
+# players on a cheaper low resolution pass. Falls back to the full 1280 pass
+# whenever the track is lost.
+ROI_SEARCH = False
+ROI_SIZE = 320          # Crop side in px, also the imgsz so the crop is not rescaled
+PLAYER_IMGSZ = 640
+
+# MOTION GATE: Skip the detector on frames where nothing inside the court or
+# ball zone changed since the last detected frame (between points), holding
+# the previous players and ball instead
+MOTION_GATE = False
+
+# PROFILES: "preview" resizes frames on the decoder thread and runs a smaller
+# inference size. Court corners and pixel thresholds are scaled to match and
+# every output is mapped back to source resolution, so downstream code never
+# knows which profile ran.
+PROFILES = {
+    'full': {'max_width': None, 'imgsz': 1280},
+    'preview': {'max_width': 960, 'imgsz': 640},
+}
+DEFAULT_PROFILE = 'full'
+MAX_BALL_AREA = 400     # px^2 at source resolution, anything bigger is not a ball
+
+# CACHE: Raw detections are stored per video content hash and settings, so
+# re-analysing the same upload replays them instead of running YOLO again
+USE_DETECTION_CACHE = True
+
+# CALIBRATION: Find the court corners from the painted lines of the first few
+# frames, cached per camera. The hardcoded corners below are the fallback.
+AUTO_CALIBRATION = True
 
 # TOGGLE: If True, returns the last known location when detection fails
 RETURN_LAST_KNOWN_POS = False 
 
-def get_court_calibration(frame):
+def get_court_calibration(frames, auto=AUTO_CALIBRATION):
+    # `frames` is one BGR frame, an iterable of frames from the start of the video, or None
+    if frames is not None and auto:
+        court = calibrate_court([frames] if isinstance(frames, np.ndarray) else frames)
+        if court is not None:
+            return court
     print("✅ Using Hardcoded Court Coordinates", flush=True)
     return Court(
         tl=Coord(746, 257), tr=Coord(1183, 254),
         br=Coord(1879, 836), bl=Coord(27, 841)
     )
 
-def is_player_in_court(point, court, buffer=100):
+def is_player_in_court(point, court, buffer=100, zones=None):
+    # O(1) raster lookup when the precomputed zones were built for this buffer
+    if zones is not None and zones.player_buffer == buffer:
+        return bool(zones.players_in_court([point])[0])
     polygon = np.array([
         [court.tl.x, court.tl.y], [court.tr.x, court.tr.y],
         [court.br.x, court.br.y], [court.bl.x, court.bl.y]
     ], np.int32)
     return cv2.pointPolygonTest(polygon, (float(point[0]), float(point[1])), True) >= -buffer
 
-def is_ball_in_zone(point, court, buffer=50):
+def is_ball_in_zone(point, court, buffer=50, zones=None):
+    if zones is not None and zones.ball_buffer == buffer:
+        return bool(zones.balls_in_zone([point])[0])
     sky_polygon = np.array([
         [court.bl.x - buffer, -1000],       
         [court.br.x + buffer, -1000],       
@@ -46,37 +105,186 @@ def is_ball_in_zone(point, court, buffer=50):
     ], np.int32)
     return cv2.pointPolygonTest(sky_polygon, (float(point[0]), float(point[1])), True) >= 0
 
-def get_best_two_players(detections, court):
-    top, bottom = None, None
-    net_y = (court.tl.y + court.bl.y) / 2
-    
+def get_best_two_players(detections, court, zones=None):
+    if zones is None: zones = CourtZones(court)
+
     mask = (detections.class_id == 0)
     if not np.any(mask): return []
-    people = detections[mask]
-
-    for i, box in enumerate(people.xyxy):
-        x1, y1, x2, y2 = box
-        # Calculate feet (bottom center) and torso (center)
-        feet = (int((x1 + x2) / 2), int(y2))
-        torso = (int((x1 + x2) / 2), int((y1 + y2) / 2))
-        conf = people.confidence[i]
+    boxes = detections.xyxy[mask]
+    conf = detections.confidence[mask]
 
-        if not is_player_in_court(feet, court, buffer=150): continue
+    # Feet (bottom center) for every box at once, truncated like int() did
+    feet = np.stack([((boxes[:, 0] + boxes[:, 2]) / 2).astype(int), boxes[:, 3].astype(int)], axis=1)
 
-        # --- UPDATED: Save 'feet' instead of 'torso' ---
-        if feet[1] < net_y:
-            if top is None or conf > top['conf']: 
-                top = {'pos': feet, 'conf': conf} 
-        else:
-            if bottom is None or conf > bottom['conf']: 
-                bottom = {'pos': feet, 'conf': conf}
+    in_court = zones.players_in_court(feet)
+    above_net = feet[:, 1] < zones.net_y
+    top = in_court & above_net
+    bottom = in_court & ~above_net
 
+    # argmax keeps the first of equal confidences, same as the old strict '>' scan
     players = []
-    if top: players.append(Player(pos=Coord(*top['pos']), name="P2"))
-    if bottom: players.append(Player(pos=Coord(*bottom['pos']), name="P1"))
+    if np.any(top):
+        i = np.argmax(np.where(top, conf, -np.inf))
+        players.append(Player(pos=Coord(int(feet[i, 0]), int(feet[i, 1])), name="P2"))
+    if np.any(bottom):
+        i = np.argmax(np.where(bottom, conf, -np.inf))
+        players.append(Player(pos=Coord(int(feet[i, 0]), int(feet[i, 1])), name="P1"))
     return players
 
-def process_video(source_path: str):
+def get_ball_candidates(detections, court, zones=None, max_area=MAX_BALL_AREA):
+    # Returns (positions (N, 2) int, confidences (N,)) in detection order
+    if zones is None: zones = CourtZones(court)
+
+    mask = (detections.class_id == 32)
+    if not np.any(mask): return np.empty((0, 2), dtype=int), np.empty(0, dtype=np.float32)
+    boxes = detections.xyxy[mask]
+    conf = detections.confidence[mask]
+
+    # Drop anything too big to be a ball, then keep centres inside the ball zone
+    area = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    centres = np.stack([((boxes[:, 0] + boxes[:, 2]) / 2).astype(int), ((boxes[:, 1] + boxes[:, 3]) / 2).astype(int)], axis=1)
+    keep = (area <= max_area) & zones.balls_in_zone(centres)
+
+    return centres[keep], conf[keep]
+
+def read_batch(source, batch_size):
+    indices, frames = [], []
+    while len(frames) < batch_size:
+        index, frame = source.read()
+        if frame is None: break
+        indices.append(index)
+        frames.append(frame)
+    return indices, frames
+
+def detect_batch(model, frames, imgsz=1280):
+    # One forward pass over the whole list, results come back in input order
+    results = model(frames, classes=[0, 32], conf=CONF_BALL, imgsz=imgsz, verbose=False)
+    return [sv.Detections.from_ultralytics(r) for r in results]
+
+def crop_window(center, frame_shape, size=ROI_SIZE):
+    # Window of `size` px around center, shifted (not shrunk) to stay inside the frame
+    h, w = frame_shape[:2]
+    size_x, size_y = min(size, w), min(size, h)
+    x0 = int(np.clip(center[0] - size_x // 2, 0, w - size_x))
+    y0 = int(np.clip(center[1] - size_y // 2, 0, h - size_y))
+    return x0, y0, x0 + size_x, y0 + size_y
+
+def detect_batch_roi(model, frames, centers, player_imgsz=PLAYER_IMGSZ):
+    people_results = model(frames, classes=[0], conf=CONF_BALL, imgsz=player_imgsz, verbose=False)
+
+    windows = [crop_window(c, f.shape) for f, c in zip(frames, centers)]
+    crops = [f[y0:y1, x0:x1] for f, (x0, y0, x1, y1) in zip(frames, windows)]
+    ball_results = model(crops, classes=[32], conf=CONF_BALL, imgsz=ROI_SIZE, verbose=False)
+
+    batch_detections = []
+    for people_res, ball_res, (x0, y0, _, _) in zip(people_results, ball_results, windows):
+        # Map crop boxes back to full frame coordinates
+        balls = sv.Detections.from_ultralytics(ball_res)
+        balls.xyxy = balls.xyxy + np.array([x0, y0, x0, y0], dtype=balls.xyxy.dtype)
+        people = sv.Detections.from_ultralytics(people_res)
+        batch_detections.append(sv.Detections.merge([people, balls]))
+    return batch_detections
+
+def profile_size(profile, frame_shape):
+    # (width, height) to resize to, or None to keep the source resolution
+    max_width = PROFILES[profile]['max_width']
+    h, w = frame_shape[:2]
+    if max_width is None or w <= max_width:
+        return None
+    return max_width, int(round(h * max_width / w))
+
+def scale_court(court, scale):
+    return Court(
+        tl=Coord(court.tl.x * scale, court.tl.y * scale), tr=Coord(court.tr.x * scale, court.tr.y * scale),
+        br=Coord(court.br.x * scale, court.br.y * scale), bl=Coord(court.bl.x * scale, court.bl.y * scale)
+    )
+
+def to_source(pos, scale):
+    # Working resolution -> source resolution
+    if scale == 1.0: return Coord(int(pos[0]), int(pos[1]))
+    return Coord(int(pos[0] / scale), int(pos[1] / scale))
+
+def copy_players(players):
+    return [Player(pos=Coord(p.pos.x, p.pos.y), name=p.name) for p in players]
+
+def copy_ball(ball):
+    return None if ball is None else Ball(pos=Coord(ball.pos.x, ball.pos.y))
+
+def detect_frames(model, frames, frame_indices, tracker, tracked_index, roi_search, imgsz):
+    REGISTRY.inc('detected_frames', len(frames))
+    with REGISTRY.timer('detect'):
+        if roi_search and tracker.seen:
+            # Centre each crop on where the ball should be by that frame
+            (x, y), (vx, vy) = tracker.position, tracker.velocity
+            centers = [(x + (i - tracked_index) * vx, y + (i - tracked_index) * vy) for i in frame_indices]
+            return detect_batch_roi(model, frames, centers, min(PLAYER_IMGSZ, imgsz))
+        return detect_batch(model, frames, imgsz)
+
+def make_ball(pos, tracker, scale=1.0):
+    if pos is not None:
+        return Ball(pos=to_source(pos, scale))
+    if RETURN_LAST_KNOWN_POS and tracker.last_valid_pos is not None:
+        return Ball(pos=to_source(tracker.last_valid_pos, scale))
+    return None
+
+def players_and_ball(detections, court, zones, tracker, scale, max_ball_area):
+    with REGISTRY.timer('track'):
+        players = get_best_two_players(detections, court, zones)
+        if scale != 1.0:
+            players = [Player(pos=to_source((p.pos.x, p.pos.y), scale), name=p.name) for p in players]
+
+        # 2-5. TRACK (predict, gate candidates, match and update)
+        positions, confidences = get_ball_candidates(detections, court, zones, max_ball_area)
+        ball_obj = make_ball(tracker.update(positions, confidences), tracker, scale)
+    return players, ball_obj
+
+def replay_detections(cached, start_frame, end_frame, raw_court, court, zones, tracker, scale, max_ball_area):
+    # Same per-frame steps as a live run, with the detector output read from the cache
+    end = cached.num_frames if end_frame is None else min(end_frame, cached.num_frames)
+    carried_players, carried_ball = [], None
+    for index in range(start_frame, end):
+        if cached.held[index]:
+            yield (index + 1, copy_players(carried_players), copy_ball(carried_ball), raw_court)
+            continue
+        if cached.detected[index]:
+            players, ball_obj = players_and_ball(cached.detections(index), court, zones, tracker, scale, max_ball_area)
+            carried_players = copy_players(players)
+        else:
+            players = copy_players(carried_players)
+            ball_obj = make_ball(tracker.predict(), tracker, scale)
+        carried_ball = copy_ball(ball_obj)
+        yield (index + 1, players, ball_obj, raw_court)
+
+def choose_stride(tracker, frames_without_ball, max_stride, scale=1.0):
+    if max_stride <= 1:
+        return 1
+
+    # No track: only back off once the ball has been gone long enough to be out of play
+    if tracker.position is None:
+        return max_stride if frames_without_ball >= ABSENT_BALL_FRAMES else 1
+
+    # Coasting on a missed detection, find it again as soon as possible
+    if tracker.frames_since_seen > 0:
+        return 1
+
+    speed = np.hypot(*tracker.velocity) / scale
+    if speed >= FAST_BALL_SPEED:
+        return 1
+    if speed <= STATIONARY_BALL_SPEED:
+        return max_stride
+    return max(1, max_stride // 2)
+
+def process_video(source_path: str, batch_size: int = BATCH_SIZE, decode_policy: str = BLOCK,
+                  max_stride: int = MAX_STRIDE, roi_search: bool = ROI_SEARCH,
+                  ball_hypotheses: int = BALL_HYPOTHESES, profile: str = DEFAULT_PROFILE,
+                  start_frame: int = 0, end_frame: int = None, backend: str = DEFAULT_BACKEND,
+                  cache: bool = USE_DETECTION_CACHE, motion_gate: bool = MOTION_GATE, content_hash: str = None):
+    # start_frame/end_frame select a half-open range of the video; frame counts
+    # stay global so segments of one video line up with a full run.
+    # content_hash is video_hash(source_path) when the caller already has it (segment workers)
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown profile: {profile} (expected one of {', '.join(PROFILES)})")
+
     # DEBUG: Video file
     print(f"🔍 Attempting to open video: {source_path}")
     print(f"   File exists: {os.path.exists(source_path)}")
@@ -91,17 +299,6 @@ def process_video(source_path: str):
         print(f"   Frame count: {int(cap.get(cv2.CAP_PROP_FRAME_COUNT))}")
         print(f"   FPS: {cap.get(cv2.CAP_PROP_FPS)}")
     
-    # DEBUG: Model loading
-    print(f"🔍 Looking for model at: {MODEL_NAME}")
-    print(f"   Model exists: {os.path.exists(MODEL_NAME)}")
-    
-    if os.path.exists(MODEL_NAME):
-        print(f"   Loading model from {MODEL_NAME}")
-        model = YOLO(MODEL_NAME)
-    else:
-        print(f"⚠️ Model not found at {MODEL_NAME}, downloading to CWD...")
-        model = YOLO("yolov8m.pt")
-    
     ret, first_frame = cap.read()
     if not ret:
         print(f"❌ Failed to read first frame!")
@@ -110,89 +307,183 @@ def process_video(source_path: str):
     
     print(f"✅ Successfully read first frame: {first_frame.shape}")
     
-    raw_court = get_court_calibration(first_frame)
-    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-    frame_count = 0
+    raw_court = get_court_calibration(sample_frames(cap, first_frame))
+    cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+
+    # Detection runs at the profile's working resolution, raw_court stays in source pixels
+    size = profile_size(profile, first_frame.shape)
+    scale = size[0] / first_frame.shape[1] if size else 1.0
+    imgsz = PROFILES[profile]['imgsz']
+    court = scale_court(raw_court, scale) if size else raw_court
+    work_shape = (size[1], size[0]) if size else first_frame.shape[:2]
+    if size:
+        print(f"⚡ Profile '{profile}': {first_frame.shape[1]}x{first_frame.shape[0]} -> {size[0]}x{size[1]}, imgsz {imgsz}", flush=True)
+
+    # Court geometry is fixed for the whole video, build the zone raster once
+    zones = CourtZones(court, frame_shape=work_shape,
+                       player_buffer=PLAYER_BUFFER * scale, ball_buffer=BALL_BUFFER * scale)
+    max_ball_area = MAX_BALL_AREA * scale * scale
 
     # --- TRACKER STATE ---
-    track_pos = None      
-    track_vel = (0, 0)    
-    frames_since_seen = 0 
-    last_valid_pos = None 
-
-    while True:
-        ret, frame = cap.read()
-        if not ret: break
-        frame_count += 1
-        
-        # 1. DETECT 
-        results = model(frame, classes=[0, 32], conf=CONF_BALL, imgsz=1280, verbose=False)[0]
-        detections = sv.Detections.from_ultralytics(results)
-        
-        players = get_best_two_players(detections, raw_court)
-        ball_obj = None 
-
-        # 2. PREDICT
-        predicted_pos = None
-        if track_pos is not None:
-            predicted_pos = (track_pos[0] + track_vel[0], track_pos[1] + track_vel[1])
-
-        # 3. GATHER CANDIDATES
-        ball_candidates = []
-        mask_balls = (detections.class_id == 32)
-        if np.any(mask_balls):
-            ball_dets = detections[mask_balls]
-            for i, box in enumerate(ball_dets.xyxy):
-                w, h = box[2] - box[0], box[3] - box[1]
-                if w * h > 400: continue 
-                
-                cx, cy = int((box[0] + box[2]) / 2), int((box[1] + box[3]) / 2)
-                
-                if is_ball_in_zone((cx, cy), raw_court, buffer=50):
-                    ball_candidates.append({'pos': (cx, cy), 'conf': ball_dets.confidence[i]})
-
-        # 4. MATCH
-        matched_candidate = None
-        if predicted_pos is not None:
-            best_dist = float('inf')
-            for cand in ball_candidates:
-                dist = np.linalg.norm(np.array(cand['pos']) - np.array(predicted_pos))
-                if dist < best_dist and dist < MAX_DIST_ERROR:
-                    best_dist = dist
-                    matched_candidate = cand
-        elif ball_candidates:
-            matched_candidate = max(ball_candidates, key=lambda x: x['conf'])
-
-        # 5. UPDATE
-        if matched_candidate:
-            new_pos = matched_candidate['pos']
-            if track_pos is not None:
-                inst_vel = (new_pos[0] - track_pos[0], new_pos[1] - track_pos[1])
-                track_vel = (0.7 * inst_vel[0] + 0.3 * track_vel[0], 
-                             0.7 * inst_vel[1] + 0.3 * track_vel[1])
-            track_pos = new_pos
-            frames_since_seen = 0 
-            ball_obj = Ball(pos=Coord(*track_pos))
-            last_valid_pos = track_pos 
-        elif track_pos is not None and frames_since_seen < MAX_COAST_FRAMES:
-            track_pos = (int(predicted_pos[0]), int(predicted_pos[1]))
-            frames_since_seen += 1
-            ball_obj = Ball(pos=Coord(*track_pos))
-            last_valid_pos = track_pos 
-        else:
-            track_pos = None
-            track_vel = (0, 0)
-            frames_since_seen = 0
-            if RETURN_LAST_KNOWN_POS and last_valid_pos is not None:
-                ball_obj = Ball(pos=Coord(*last_valid_pos))
+    tracker = BallTracker(max_hypotheses=ball_hypotheses, max_coast_frames=MAX_COAST_FRAMES,
+                          max_dist=MAX_DIST_ERROR * scale)
+
+    # --- DETECTION CACHE ---
+    cached, recorder, cache_file = None, None, None
+    if cache:
+        settings = {
+            'model': os.path.basename(MODEL_NAME), 'backend': backend, 'profile': profile, 'imgsz': imgsz,
+            'size': size, 'conf': CONF_BALL, 'max_stride': max_stride, 'roi_search': roi_search,
+        }
+        # Stride and ROI windows follow the tracker, so its settings decide which frames get detected
+        if max_stride > 1 or roi_search:
+            settings.update(ball_hypotheses=ball_hypotheses, roi_size=ROI_SIZE, player_imgsz=PLAYER_IMGSZ)
+        if motion_gate:
+            settings.update(motion_gate=[GATE_WIDTH, PIXEL_DIFF, MIN_CHANGED_PIXELS, MAX_STATIC_FRAMES])
+        # Which frames get detected then also depends on the zones, a new calibration must not replay them
+        if max_stride > 1 or roi_search or motion_gate:
+            settings.update(court=raw_court.to_vectors())
+        # A segment (parallel workers) is stored under its own range, its detections start from a fresh tracker
+        if start_frame != 0 or end_frame is not None:
+            settings.update(frames=[start_frame, end_frame])
+        cache_file = cache_path(content_hash or video_hash(source_path), settings)
+        cached = CachedDetections.load(cache_file)
+        # Only a lossless run is worth storing
+        if cached is None and decode_policy == BLOCK:
+            recorder = DetectionRecorder(settings)
+
+    if cached is not None:
+        cap.release()
+        print(f"💾 Replaying cached detections from {cache_file}", flush=True)
+        yield from replay_detections(cached, start_frame, end_frame, raw_court, court, zones, tracker,
+                                     scale, max_ball_area)
+        return
+
+    # Shared per process: loaded (and usually warmed up) once, not per video.
+    # Every backend is called the same way and returns ultralytics Results.
+    model = get_model(MODEL_NAME, backend)
+
+    # --- STRIDE STATE ---
+    stride = 1
+    next_detect = start_frame
+    frames_without_ball = 0
+    carried_players, carried_ball = [], None
+    tracked_index = start_frame - 1     # Frame the tracker's position refers to
+
+    # --- MOTION GATE ---
+    gate = MotionGate(zones, work_shape) if motion_gate else None
+    # The end-of-video summary is this run's share of the metrics totals
+    detected, detect_time = REGISTRY.counter('detected_frames'), REGISTRY.histogram('detect')
+    detected_before, detect_seconds_before = detected.value, detect_time.sum
+
+    # Decode ahead on a background thread while the detector is busy
+    max_frames = None if end_frame is None else end_frame - start_frame
+    source = FrameSource(cap, buffers=QUEUE_SIZE + batch_size, policy=decode_policy, size=size,
+                         first_index=start_frame, max_frames=max_frames).start()
+
+    num_frames = start_frame
+    try:
+        while True:
+            index, frame = source.read()
+            if frame is None: break
+            num_frames = index + 1
+
+            # --- SKIPPED FRAME: fill in from the tracker's prediction ---
+            if index < next_detect:
+                source.release(frame)
+                frame_count = index + 1
+
+                players = copy_players(carried_players)
+                ball_obj = make_ball(tracker.predict(), tracker, scale)
+                tracked_index = index
+                carried_ball = copy_ball(ball_obj)
+
+                yield (frame_count, players, ball_obj, raw_court)
+                continue
+
+            # Only batch while detecting every frame, otherwise each result sets the next stride
+            indices, frames = [index], [frame]
+            if stride == 1 and batch_size > 1:
+                more_indices, more_frames = read_batch(source, batch_size - 1)
+                indices += more_indices
+                frames += more_frames
+                num_frames = indices[-1] + 1
+
+            # 0. GATE (frames where nothing moved in the zones keep the last result).
+            # Not while coasting: a prediction is not a result worth holding.
+            coasting = tracker.position is not None and tracker.frames_since_seen > 0
+            if gate is not None and not coasting:
+                moving = [not gate.is_static(f) for f in frames]
+                moving_indices = [i for i, m in zip(indices, moving) if m]
+                moving_frames = [f for f, m in zip(frames, moving) if m]
+            else:
+                moving_indices, moving_frames = indices, frames
+
+            # 1. DETECT (one call for the whole batch, then track frame by frame in order)
+            batch_detections = []
+            if moving_frames:
+                batch_detections = detect_frames(model, moving_frames, moving_indices, tracker, tracked_index,
+                                                 roi_search, imgsz)
+
+            results = dict(zip(moving_indices, batch_detections))
+            for index, frame in zip(indices, frames):
+                frame_count = index + 1
+
+                if index not in results:
+                    if tracker.position is None or tracker.frames_since_seen == 0:
+                        # Static frame: players and ball are where the last detection left them
+                        if recorder is not None:
+                            recorder.hold(index)
+                        yield (frame_count, copy_players(carried_players), copy_ball(carried_ball), raw_court)
+                        continue
+
+                    # An earlier frame of this batch lost the ball, holding would freeze its prediction
+                    results[index] = detect_frames(model, [frame], [index], tracker, tracked_index, roi_search, imgsz)[0]
+
+                detections = results[index]
+                if recorder is not None:
+                    recorder.record(index, detections)
+
+                players, ball_obj = players_and_ball(detections, court, zones, tracker, scale, max_ball_area)
+                tracked_index = index
+
+                # 6. STRIDE (how far ahead the next detection can wait)
+                frames_without_ball = 0 if tracker.seen else frames_without_ball + 1
+                stride = choose_stride(tracker, frames_without_ball, max_stride, scale)
+                next_detect = index + stride
+
+                # Keep private copies for the frames that reuse this result
+                carried_players = copy_players(players)
+                carried_ball = copy_ball(ball_obj)
+
+                yield (frame_count, players, ball_obj, raw_court)
+
+            for frame in frames:
+                source.release(frame)
 
-        yield (frame_count, players, ball_obj, raw_court)
+        # Reached the end of the video (an abandoned generator never gets here)
+        frames_seen = num_frames - start_frame
+        # Videos analysed at the same time in one process add to the same totals
+        detected_frames = detected.value - detected_before
+        detect_seconds = detect_time.sum - detect_seconds_before
+        if detected_frames:
+            print(f"⏱️ Detector ran on {detected_frames}/{frames_seen} frames, "
+                  f"{detect_seconds * 1000 / detected_frames:.1f} ms per frame", flush=True)
+        if gate is not None:
+            gate_ms = gate.seconds * 1000 / max(1, gate.checked)
+            print(f"🎞️ Motion gate skipped {gate.skipped}/{gate.checked} checked frames "
+                  f"({gate.skip_ratio:.0%}), {gate_ms:.2f} ms per check", flush=True)
+        if recorder is not None:
+            recorder.save(cache_file, num_frames)
 
-    cap.release()
+    finally:
+        source.stop()
+        cap.release()
 
 class VisionSystem:
-    def __init__(self, video_path):
-        self.pipeline = process_video(video_path)
+    def __init__(self, video_path, **options):
+        # options are forwarded untouched to process_video (batch_size, decode_policy, ...)
+        self.pipeline = process_video(video_path, **options)
 
     def getNextFrame(self):
         try:
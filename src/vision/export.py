@@ -0,0 +1,115 @@
+"""
+Exports the YOLO weights for the CPU inference backends in vision.models.
+
+    cd src
+    python -m vision.export --backend onnx
+    python -m vision.export --backend onnx-int8 --calibration ../assets/videos/tennis2.mp4
+
+Needs `pip install onnx onnxruntime`. The ONNX model is exported with
+dynamic batch and image size so the same file serves the full, preview and
+ROI passes. INT8 uses static QDQ quantisation calibrated on frames from a
+real match video; dynamic (weight-only) quantisation gives no speedup for
+a conv net on CPU.
+"""
+import argparse
+import os
+
+import cv2
+import numpy as np
+
+# --- CONFIG ---
+EXPORT_IMGSZ = 1280
+CALIBRATION_FRAMES = 32     # Spread evenly over the calibration video
+LETTERBOX_COLOUR = 114      # Same padding ultralytics uses at inference
+
+
+def export_onnx(weights: str, onnx_path: str, imgsz: int = EXPORT_IMGSZ) -> str:
+    from ultralytics import YOLO
+
+    print(f"📦 Exporting {weights} to ONNX (dynamic shapes)...", flush=True)
+    exported = YOLO(weights).export(format="onnx", dynamic=True, imgsz=imgsz, verbose=False)
+    if os.path.abspath(exported) != os.path.abspath(onnx_path):
+        os.replace(exported, onnx_path)
+    print(f"✅ Saved {onnx_path}", flush=True)
+    return onnx_path
+
+
+def letterbox(frame, imgsz):
+    # BGR frame -> (1, 3, imgsz, imgsz) float RGB in [0, 1], aspect ratio kept
+    h, w = frame.shape[:2]
+    scale = imgsz / max(h, w)
+    nh, nw = int(round(h * scale)), int(round(w * scale))
+    canvas = np.full((imgsz, imgsz, 3), LETTERBOX_COLOUR, dtype=np.uint8)
+    top, left = (imgsz - nh) // 2, (imgsz - nw) // 2
+    canvas[top:top + nh, left:left + nw] = cv2.resize(frame, (nw, nh), interpolation=cv2.INTER_LINEAR)
+    return np.ascontiguousarray(canvas[..., ::-1].transpose(2, 0, 1)[None], dtype=np.float32) / 255.0
+
+
+def calibration_frames(video_path: str, count: int = CALIBRATION_FRAMES):
+    cap = cv2.VideoCapture(video_path)
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    if not cap.isOpened() or total <= 0:
+        raise ValueError(f"Cannot read calibration video: {video_path}")
+
+    frames = []
+    for index in np.linspace(0, total - 1, min(count, total)).astype(int):
+        cap.set(cv2.CAP_PROP_POS_FRAMES, int(index))
+        ret, frame = cap.read()
+        if ret:
+            frames.append(frame)
+    cap.release()
+    return frames
+
+
+def quantize_int8(onnx_path: str, int8_path: str, calibration_video: str,
+                  imgsz: int = EXPORT_IMGSZ, count: int = CALIBRATION_FRAMES) -> str:
+    import onnxruntime as ort
+    from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType, quantize_static
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    input_name = ort.InferenceSession(onnx_path, providers=["CPUExecutionProvider"]).get_inputs()[0].name
+    frames = calibration_frames(calibration_video, count)
+    print(f"🎯 Calibrating INT8 on {len(frames)} frames from {calibration_video}", flush=True)
+
+    class FrameReader(CalibrationDataReader):
+        def __init__(self):
+            self.batches = iter({input_name: letterbox(f, imgsz)} for f in frames)
+
+        def get_next(self):
+            return next(self.batches, None)
+
+    # Folding and shape inference first, quantisation works on the cleaned-up graph
+    prepared = int8_path + ".prep.onnx"
+    quant_pre_process(onnx_path, prepared, skip_symbolic_shape=True)
+    try:
+        quantize_static(prepared, int8_path, FrameReader(), quant_format=QuantFormat.QDQ,
+                        activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8, per_channel=True)
+    finally:
+        os.remove(prepared)
+
+    print(f"✅ Saved {int8_path}", flush=True)
+    return int8_path
+
+
+def main():
+    from vision.models import BACKENDS, MODEL_NAME, ONNX, ONNX_INT8, TORCH, backend_path
+
+    parser = argparse.ArgumentParser(description="Export YOLO weights for a CPU inference backend")
+    parser.add_argument("--weights", default=MODEL_NAME)
+    parser.add_argument("--backend", default=ONNX, choices=[b for b in BACKENDS if b != TORCH])
+    parser.add_argument("--calibration", help="Match video to calibrate INT8 activations on")
+    parser.add_argument("--imgsz", type=int, default=EXPORT_IMGSZ)
+    args = parser.parse_args()
+
+    onnx_path = backend_path(args.weights, ONNX)
+    if not os.path.exists(onnx_path):
+        export_onnx(args.weights, onnx_path, args.imgsz)
+
+    if args.backend == ONNX_INT8:
+        if not args.calibration:
+            parser.error("--calibration is required for onnx-int8")
+        quantize_int8(onnx_path, backend_path(args.weights, ONNX_INT8), args.calibration, args.imgsz)
+
+
+if __name__ == "__main__":
+    main()
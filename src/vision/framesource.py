@@ -0,0 +1,186 @@
+import queue
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from utils.metrics import REGISTRY
+
+# --- CONFIG ---
+QUEUE_SIZE = 16         # Decoded frames allowed to wait for the detector
+POLL_INTERVAL = 0.1     # Seconds between stop checks while blocked
+
+# Backpressure policies
+BLOCK = "block"         # Decoder waits for the consumer, no frame is ever lost
+DROP = "drop"           # Decoder skips frames while the consumer is behind
+
+DECODE_SECONDS = REGISTRY.histogram('decode')   # Per decoded frame, on the decoder thread
+
+
+class FrameSource:
+    """
+    Decodes a cv2.VideoCapture on a background thread into a bounded queue.
+
+    Frames are decoded into a fixed pool of preallocated buffers, so the hot
+    loop never allocates. Consumers must hand each buffer back with release()
+    once they are done with it. Every item is (frame_index, frame) where
+    frame_index counts up from first_index at the position the capture was at
+    when start() ran, so dropped frames still advance the index and timings
+    stay aligned. With max_frames set, decoding stops after that many indices.
+
+    With size=(width, height) every frame is resized on the decoder thread
+    straight after capture, so the pool and everything downstream only ever
+    holds the smaller frames.
+    """
+
+    def __init__(self, cap, queue_size: int = QUEUE_SIZE, buffers: int = None, policy: str = BLOCK,
+                 size: tuple = None, first_index: int = 0, max_frames: int = None):
+        if policy not in (BLOCK, DROP):
+            raise ValueError(f"Unknown backpressure policy: {policy}")
+
+        self.cap = cap
+        self.policy = policy
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.pool = queue.Queue()
+        self.pool_size = buffers if buffers is not None else queue_size + 1
+        self.size = size
+        self.first_index = first_index
+        self.max_frames = max_frames
+        self._scratch = None    # Full resolution decode target when resizing
+
+        self.dropped = 0
+        self.decoded = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self._error = None
+        self._finished = False
+
+    # --- LIFECYCLE ---
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="FrameSource", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # --- CONSUMER SIDE ---
+
+    def read(self):
+        """Returns (frame_index, frame), or (None, None) once the video is exhausted."""
+        if self._finished:
+            return None, None
+
+        item = self.queue.get()
+        if item is None:
+            self._finished = True
+            if self._error is not None:
+                raise self._error
+            return None, None
+        return item
+
+    def release(self, frame):
+        """Returns a buffer to the pool so the decoder can reuse it."""
+        self.pool.put(frame)
+
+    def __iter__(self):
+        while True:
+            index, frame = self.read()
+            if frame is None:
+                return
+            yield index, frame
+
+    # --- DECODER THREAD ---
+
+    def _acquire_buffer(self):
+        while not self._stop.is_set():
+            try:
+                # DROP never waits: no free buffer means the consumer is behind
+                if self.policy == DROP:
+                    return self.pool.get_nowait()
+                return self.pool.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                if self.policy == DROP:
+                    return None
+        return None
+
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self.queue.put(item, timeout=POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _decode(self, buffer):
+        start = time.perf_counter()
+        if self.size is None:
+            ret, frame = self.cap.read(image=buffer)
+        else:
+            ret, self._scratch = self.cap.read(image=self._scratch)
+            frame = cv2.resize(self._scratch, self.size, dst=buffer, interpolation=cv2.INTER_AREA) if ret else None
+        if ret:
+            DECODE_SECONDS.observe(time.perf_counter() - start)
+        return ret, frame
+
+    def _run(self):
+        index = self.first_index
+        last_index = None if self.max_frames is None else self.first_index + self.max_frames - 1
+        try:
+            if last_index is not None and last_index < index:
+                return
+
+            # First frame sizes the pool; cv2 allocates it for us
+            ret, first = self._decode(None)
+            if not ret:
+                return
+            for _ in range(self.pool_size - 1):
+                self.pool.put(np.empty_like(first))
+
+            self.decoded += 1
+            if not self._put((index, first)):
+                return
+
+            while not self._stop.is_set() and index != last_index:
+                index += 1
+                buffer = self._acquire_buffer()
+
+                if buffer is None:
+                    if self._stop.is_set():
+                        return
+                    # Skip the frame without paying for the colour conversion
+                    if not self.cap.grab():
+                        return
+                    self.dropped += 1
+                    continue
+
+                ret, frame = self._decode(buffer)
+                if not ret:
+                    return
+
+                self.decoded += 1
+                if not self._put((index, frame)):
+                    return
+        except Exception as e:
+            self._error = e
+        finally:
+            # Sentinel must always get through so read() never hangs
+            while True:
+                try:
+                    self.queue.put(None, timeout=POLL_INTERVAL)
+                    break
+                except queue.Full:
+                    if self._stop.is_set():
+                        break
@@ -0,0 +1,181 @@
+import os
+import threading
+import time
+
+import numpy as np
+from ultralytics import YOLO
+
+# --- CONFIG ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_NAME = os.path.join(BASE_DIR, '..', '..', 'assets', 'models', 'yolov8m.pt')
+WARMUP_SIZE = 1280
+
+# Inference backends: the PyTorch weights, or a copy exported by vision.export
+TORCH = "torch"
+ONNX = "onnx"               # ONNX Runtime, fp32
+ONNX_INT8 = "onnx-int8"     # ONNX Runtime, static INT8 (needs calibration, see vision.export)
+BACKENDS = (TORCH, ONNX, ONNX_INT8)
+DEFAULT_BACKEND = TORCH
+
+# One entry per model path, shared by every request in the process
+_REGISTRY = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def backend_path(name: str, backend: str = DEFAULT_BACKEND) -> str:
+    """Where the weights for `backend` live, next to the .pt file."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown detector backend: {backend} (expected one of {', '.join(BACKENDS)})")
+    stem = os.path.splitext(name)[0]
+    if backend == ONNX: return stem + ".onnx"
+    if backend == ONNX_INT8: return stem + ".int8.onnx"
+    return name
+
+
+class SharedModel:
+    """
+    A YOLO model loaded once per process.
+
+    Ultralytics predictors keep per-call state, so concurrent requests take
+    turns through the lock instead of each loading their own copy. Calling the
+    wrapper works exactly like calling the YOLO model, whichever backend runs
+    underneath: exported ONNX files go through the same ultralytics pre- and
+    post-processing (letterbox, NMS, class filter), so results are comparable.
+    """
+
+    def __init__(self, name: str, backend: str = DEFAULT_BACKEND):
+        self.name = name
+        self.backend = backend
+        self.path = backend_path(name, backend)
+        self.model = None
+        self.lock = threading.Lock()
+        self.status = "pending"
+        self.error = None
+        self.load_seconds = None
+        self.warmup_seconds = None
+
+    def __call__(self, *args, **kwargs):
+        with self.lock:
+            return self.model(*args, **kwargs)
+
+    def load(self):
+        start = time.perf_counter()
+        self.status = "loading"
+
+        # DEBUG: Model loading
+        print(f"🔍 Looking for model at: {self.path}")
+        print(f"   Model exists: {os.path.exists(self.path)}")
+
+        if self.backend != TORCH:
+            self.model = YOLO(self._exported_path(), task="detect")
+        elif os.path.exists(self.name):
+            print(f"   Loading model from {self.name}")
+            self.model = YOLO(self.name)
+        else:
+            print(f"⚠️ Model not found at {self.name}, downloading to CWD...")
+            self.model = YOLO(os.path.basename(self.name))
+
+        self.load_seconds = time.perf_counter() - start
+        self.status = "loaded"
+        print(f"✅ Model loaded in {self.load_seconds:.2f}s", flush=True)
+
+    def _exported_path(self):
+        if os.path.exists(self.path):
+            return self.path
+        if self.backend == ONNX:
+            # One-off, fp32 needs no calibration data
+            from vision.export import export_onnx
+            return export_onnx(self.name, self.path)
+        raise FileNotFoundError(
+            f"{self.path} not found, export it first: "
+            f"python -m vision.export --backend {self.backend} --calibration <match video>"
+        )
+
+    def warm_up(self, imgsz: int = WARMUP_SIZE):
+        # The first inference pays for kernel selection and buffer allocation
+        start = time.perf_counter()
+        self.status = "warming"
+        dummy = np.zeros((imgsz, imgsz, 3), dtype=np.uint8)
+        self(dummy, imgsz=imgsz, verbose=False)
+
+        self.warmup_seconds = time.perf_counter() - start
+        self.status = "ready"
+        print(f"🔥 Model warmed up in {self.warmup_seconds:.2f}s", flush=True)
+
+    def to_dict(self):
+        return {
+            'backend': self.backend,
+            'status': self.status,
+            'load_seconds': self.load_seconds,
+            'warmup_seconds': self.warmup_seconds,
+            'error': self.error,
+        }
+
+
+def get_model(name: str = MODEL_NAME, backend: str = DEFAULT_BACKEND) -> SharedModel:
+    """Returns the shared model for `name` on `backend`, loading it on first use."""
+    path = backend_path(name, backend)
+    with _REGISTRY_LOCK:
+        entry = _REGISTRY.get(path)
+        if entry is None:
+            entry = SharedModel(name, backend)
+            _REGISTRY[path] = entry
+
+    # Loading happens under the entry lock so a second caller waits instead of loading again
+    with entry.lock:
+        if entry.model is None:
+            try:
+                entry.load()
+            except Exception as e:
+                entry.status = "error"
+                entry.error = str(e)
+                raise
+    return entry
+
+
+def register_model(model, name: str = MODEL_NAME, backend: str = DEFAULT_BACKEND) -> SharedModel:
+    """
+    Serves an already built model for `name` on `backend`, e.g. a stand-in
+    detector in the benchmarks. It must be called like a YOLO model and
+    return ultralytics Results.
+    """
+    entry = SharedModel(name, backend)
+    entry.model = model
+    entry.status = "ready"
+    with _REGISTRY_LOCK:
+        _REGISTRY[entry.path] = entry
+    return entry
+
+
+def warm_up(name: str = MODEL_NAME, imgsz: int = WARMUP_SIZE, backend: str = DEFAULT_BACKEND) -> SharedModel:
+    """Loads (if needed) and warms up a model, recording errors instead of raising."""
+    try:
+        entry = get_model(name, backend)
+        if entry.status != "ready":
+            entry.warm_up(imgsz)
+    except Exception as e:
+        entry = _record_error(name, backend, e)
+        print(f"❌ Model warm-up failed: {e}", flush=True)
+    return entry
+
+
+def _record_error(name: str, backend: str, error: Exception) -> SharedModel:
+    # get_model may fail before registering anything (unknown backend), the
+    # error still gets an entry so registry_status reports it
+    path = backend_path(name, backend) if backend in BACKENDS else f"{name} ({backend})"
+    with _REGISTRY_LOCK:
+        entry = _REGISTRY.get(path)
+        if entry is None:
+            entry = SharedModel(name)
+            entry.backend, entry.path = backend, path
+            _REGISTRY[path] = entry
+    entry.status = "error"
+    entry.error = str(error)
+    return entry
+
+
+def registry_status() -> dict:
+    with _REGISTRY_LOCK:
+        models = {os.path.basename(name): entry.to_dict() for name, entry in _REGISTRY.items()}
+    ready = bool(models) and all(m['status'] == "ready" for m in models.values())
+    return {'ready': ready, 'models': models}
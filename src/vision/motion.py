@@ -0,0 +1,78 @@
+import time
+
+import cv2
+import numpy as np
+
+# --- CONFIG ---
+GATE_WIDTH = 320            # px, the ball still covers a sample or two at this size
+PIXEL_DIFF = 20             # Grey levels a pixel must change by to count (above codec noise)
+MIN_CHANGED_PIXELS = 2      # Changed pixels inside the zones that count as motion
+MAX_STATIC_FRAMES = 60      # Detect at least this often, even on a still picture
+
+
+class MotionGate:
+    """
+    Decides whether a frame is worth a detector pass.
+
+    Each frame is shrunk to a small greyscale copy and compared with the
+    copy of the last frame that was detected. If nothing changed inside the
+    court (with the player buffer) or the ball zone, the detector's answer
+    would be the same as last time, so the caller can hold the previous
+    players and ball instead. Comparing against the last detected frame,
+    not the previous frame, means slow drift still adds up to motion.
+    """
+
+    def __init__(self, zones, frame_shape, width=GATE_WIDTH, pixel_diff=PIXEL_DIFF,
+                 min_changed=MIN_CHANGED_PIXELS, max_static=MAX_STATIC_FRAMES):
+        h, w = frame_shape[:2]
+        self.size = (min(width, w), max(1, int(round(h * min(width, w) / w))))
+        self.pixel_diff = pixel_diff
+        self.min_changed = min_changed
+        self.max_static = max_static
+
+        # Zone mask at gate resolution, tested at each small pixel's centre in frame coordinates
+        sx, sy = w / self.size[0], h / self.size[1]
+        xs = (np.arange(self.size[0]) + 0.5) * sx
+        ys = (np.arange(self.size[1]) + 0.5) * sy
+        points = np.stack(np.meshgrid(xs, ys), axis=-1).reshape(-1, 2)
+        inside = zones.court_zone.contains(points, buffer=zones.player_buffer) | zones.ball_zone.contains(points)
+        self.mask = inside.reshape(self.size[1], self.size[0])
+
+        self.reference = None
+        self.static_run = 0
+
+        # Per-video report
+        self.checked = 0
+        self.skipped = 0
+        self.seconds = 0.0
+
+    def shrink(self, frame):
+        # Bilinear samples rather than averages (INTER_AREA costs ~15x more): anything at
+        # least one sample step wide, like the ball at broadcast resolution, still shows up
+        small = cv2.resize(frame, self.size, interpolation=cv2.INTER_LINEAR)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+    def is_static(self, frame) -> bool:
+        start = time.perf_counter()
+        small = self.shrink(frame)
+        self.checked += 1
+
+        static = False
+        if self.reference is not None and self.static_run < self.max_static:
+            changed = np.count_nonzero((cv2.absdiff(small, self.reference) > self.pixel_diff) & self.mask)
+            static = changed < self.min_changed
+
+        if static:
+            self.static_run += 1
+            self.skipped += 1
+        else:
+            # This frame gets detected and becomes the new reference
+            self.reference = small
+            self.static_run = 0
+
+        self.seconds += time.perf_counter() - start
+        return static
+
+    @property
+    def skip_ratio(self):
+        return self.skipped / self.checked if self.checked else 0.0
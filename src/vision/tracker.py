@@ -0,0 +1,167 @@
+import numpy as np
+
+# --- CONFIG ---
+MAX_HYPOTHESES = 3
+MAX_COAST_FRAMES = 5
+MAX_DIST_ERROR = 100
+
+# Velocity smoothing: new = VEL_NEW * instantaneous + VEL_OLD * previous
+VEL_NEW = 0.7
+VEL_OLD = 0.3
+
+
+class BallTracker:
+    """
+    Constant-velocity ball tracker holding several hypotheses at once.
+
+    All state lives in fixed NumPy arrays indexed by hypothesis slot, and every
+    frame gates all candidates against all hypotheses in one (C, H) distance
+    computation. One hypothesis is the primary and is what gets reported; the
+    others follow competing candidates (a second ball, a false positive, the
+    real ball while the primary chases noise) so that when the primary is lost
+    there is already a track with a velocity estimate to fall back on.
+
+    With max_hypotheses=1 this is exactly the original single track from
+    process_video: nearest candidate within max_dist, coast up to
+    max_coast_frames on the prediction, otherwise drop the track and restart
+    from the most confident candidate on the next frame.
+    """
+
+    def __init__(self, max_hypotheses: int = MAX_HYPOTHESES, max_coast_frames: int = MAX_COAST_FRAMES,
+                 max_dist: float = MAX_DIST_ERROR):
+        self.max_hypotheses = max_hypotheses
+        self.max_coast_frames = max_coast_frames
+        self.max_dist = max_dist
+
+        self.pos = np.zeros((max_hypotheses, 2), dtype=np.float64)
+        self.vel = np.zeros((max_hypotheses, 2), dtype=np.float64)
+        self.active = np.zeros(max_hypotheses, dtype=bool)
+        self.missed = np.zeros(max_hypotheses, dtype=np.int64)    # frames since last matched
+        self.hits = np.zeros(max_hypotheses, dtype=np.int64)      # matched frames in total
+
+        self.primary = -1
+        self.last_valid_pos = None
+
+    # --- PRIMARY TRACK ---
+
+    @property
+    def position(self):
+        if self.primary < 0: return None
+        return (int(self.pos[self.primary, 0]), int(self.pos[self.primary, 1]))
+
+    @property
+    def velocity(self):
+        if self.primary < 0: return (0, 0)
+        return (float(self.vel[self.primary, 0]), float(self.vel[self.primary, 1]))
+
+    @property
+    def frames_since_seen(self):
+        return 0 if self.primary < 0 else int(self.missed[self.primary])
+
+    @property
+    def seen(self):
+        """True if the primary was matched to a detection on the last update."""
+        return self.primary >= 0 and self.missed[self.primary] == 0
+
+    # --- UPDATES ---
+
+    def reset(self):
+        self.active[:] = False
+        self.vel[:] = 0
+        self.missed[:] = 0
+        self.hits[:] = 0
+        self.primary = -1
+
+    def predict(self):
+        """Frame without a detection pass: move every hypothesis along its velocity."""
+        a = self.active
+        self.pos[a] = np.trunc(self.pos[a] + self.vel[a])
+        return self._report()
+
+    def update(self, positions, confidences):
+        """Feeds one frame of ball candidates, returns the primary position (or None)."""
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        confidences = np.asarray(confidences, dtype=np.float64).reshape(-1)
+        num_candidates = len(positions)
+
+        live = np.flatnonzero(self.active).tolist()
+        matched = {}
+        taken = np.zeros(num_candidates, dtype=bool)
+
+        if live:
+            predicted = self.pos[live] + self.vel[live]
+
+            # 1. GATE: every candidate against every live hypothesis in one (C, L) computation
+            if num_candidates:
+                diff = positions[:, None, :] - predicted[None, :, :]
+                dist = np.sqrt((diff * diff).sum(axis=2))
+                dist[dist >= self.max_dist] = np.inf
+
+                # 2. MATCH: primary first (so it behaves like a lone tracker), then by hits.
+                # argmin keeps the first of equal distances like the old strict '<' scan.
+                for j in self._match_order(live):
+                    c = int(dist[:, j].argmin())
+                    if dist[c, j] != np.inf:
+                        matched[live[j]] = c
+                        taken[c] = True
+                        dist[c, :] = np.inf
+
+            # 3. UPDATE: matched hypotheses take the detection, others coast or die
+            if matched:
+                slots, cands = list(matched), list(matched.values())
+                self.vel[slots] = VEL_NEW * (positions[cands] - self.pos[slots]) + VEL_OLD * self.vel[slots]
+                self.pos[slots] = positions[cands]
+                self.missed[slots] = 0
+                self.hits[slots] += 1
+
+            if len(matched) < len(live):
+                for j, h in enumerate(live):
+                    if h in matched: continue
+                    if self.missed[h] < self.max_coast_frames:
+                        self.pos[h] = np.trunc(predicted[j])
+                        self.missed[h] += 1
+                    else:
+                        self.active[h] = False
+                        self.vel[h] = 0
+                        self.missed[h] = 0
+                        self.hits[h] = 0
+
+        # 4. SPAWN: unclaimed candidates start hypotheses in slots that were free at the
+        # start of the frame, most confident first (stable, so ties keep detection order)
+        if num_candidates > len(matched) and len(live) < self.max_hypotheses:
+            free = [h for h in range(self.max_hypotheses) if h not in live]
+            unclaimed = np.flatnonzero(~taken)
+            order = unclaimed[np.argsort(-confidences[unclaimed], kind="stable")]
+            for slot, c in zip(free, order):
+                self.pos[slot] = positions[c]
+                self.vel[slot] = 0
+                self.missed[slot] = 0
+                self.hits[slot] = 1
+                self.active[slot] = True
+
+        # 5. PRIMARY: keep it while alive, otherwise promote the best remaining hypothesis
+        if self.primary < 0 or not self.active[self.primary]:
+            self.primary = self._best_hypothesis()
+
+        return self._report()
+
+    # --- HELPERS ---
+
+    def _match_order(self, live):
+        # Column order into `live`: primary first, then the rest by hits
+        if len(live) == 1: return [0]
+        hits = self.hits[live].tolist()
+        return sorted(range(len(live)), key=lambda j: (live[j] != self.primary, -hits[j]))
+
+    def _best_hypothesis(self):
+        live = np.flatnonzero(self.active)
+        if len(live) == 0: return -1
+        # Seen this frame beats coasting, then the longest history wins
+        score = (self.missed[live] == 0) * (self.hits.max() + 1) + self.hits[live]
+        return int(live[np.argmax(score)])
+
+    def _report(self):
+        pos = self.position
+        if pos is not None:
+            self.last_valid_pos = pos
+        return pos
@@ -0,0 +1,164 @@
+import numpy as np
+
+# --- CONFIG ---
+PLAYER_BUFFER = 150     # px a player's feet may be outside the court lines
+BALL_BUFFER = 50        # px the ball zone extends past the sidelines and baseline
+SKY_TOP = -1000         # Ball zone reaches well above the frame for lobs
+RASTER_CELL = 4         # px per cell of the zone lookup raster
+
+# Raster labels, stored as bit flags since the zones overlap
+OUTSIDE = 0
+IN_COURT = 1
+IN_BUFFER = 2           # Within PLAYER_BUFFER of the court (court cells included)
+BALL_ZONE = 4
+# A boundary runs through the cell, so its points need the exact test
+UNSURE_BUFFER = 8
+UNSURE_BALL = 16
+
+
+def court_polygon(court):
+    return np.array([
+        [court.tl.x, court.tl.y], [court.tr.x, court.tr.y],
+        [court.br.x, court.br.y], [court.bl.x, court.bl.y]
+    ], np.float64)
+
+def sky_polygon(court, buffer=BALL_BUFFER):
+    return np.array([
+        [court.bl.x - buffer, SKY_TOP],
+        [court.br.x + buffer, SKY_TOP],
+        [court.br.x + buffer, court.br.y + buffer],
+        [court.bl.x - buffer, court.bl.y + buffer]
+    ], np.float64)
+
+
+class ConvexZone:
+    """
+    A convex polygon stored as one half-plane per edge.
+
+    For each edge, a*x + b*y + c is the signed distance of a point to the edge
+    line (positive inside), so testing N points is a single (N, 2) @ (2, E)
+    product. Gives the same answer as cv2.pointPolygonTest(..., True) >= -buffer.
+    """
+
+    def __init__(self, polygon):
+        self.start = np.asarray(polygon, dtype=np.float64)
+        self.edge = np.roll(self.start, -1, axis=0) - self.start
+        self.edge_len_sq = np.sum(self.edge ** 2, axis=1)
+
+        # Inward normal depends on winding: left of each edge for positive area
+        end = self.start + self.edge
+        area2 = np.sum(self.start[:, 0] * end[:, 1] - end[:, 0] * self.start[:, 1])
+        orientation = 1.0 if area2 > 0 else -1.0
+
+        length = np.sqrt(self.edge_len_sq)
+        self.normals = orientation * np.stack([-self.edge[:, 1], self.edge[:, 0]], axis=1) / length[:, None]
+        self.offsets = -np.sum(self.normals * self.start, axis=1)
+
+    def plane_distances(self, points):
+        return points @ self.normals.T + self.offsets
+
+    def boundary_distance(self, points):
+        # Distance from each point to the closest point on any edge segment
+        rel = points[:, None, :] - self.start[None, :, :]
+        t = np.clip(np.sum(rel * self.edge[None], axis=2) / self.edge_len_sq, 0.0, 1.0)
+        closest = rel - t[..., None] * self.edge[None]
+        return np.sqrt(np.min(np.sum(closest ** 2, axis=2), axis=1))
+
+    def signed_distance(self, points):
+        # Distance to the boundary, positive inside, like cv2.pointPolygonTest(..., True)
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        planes = self.plane_distances(points)
+        inside = np.all(planes >= 0, axis=1)
+        return np.where(inside, np.min(planes, axis=1), -self.boundary_distance(points))
+
+    def contains(self, points, buffer=0.0):
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        planes = self.plane_distances(points)
+        inside = np.all(planes >= 0, axis=1)
+        if buffer <= 0:
+            return inside
+
+        # A point can only be within `buffer` of the polygon if it is within `buffer`
+        # of every edge line, so the exact segment distance is only needed for those
+        near = ~inside & np.all(planes >= -buffer, axis=1)
+        if np.any(near):
+            inside[near] = self.boundary_distance(points[near]) <= buffer
+        return inside
+
+
+class CourtZones:
+    """
+    Zone geometry for one calibrated court, computed once and reused every frame.
+
+    Given the frame shape, a downsampled label raster is built up front and
+    membership tests become an array index per point. Cells that a zone
+    boundary passes through are flagged as unsure, and only points landing in
+    those cells (or off the frame) go through the exact ConvexZone test, so
+    the answers never differ from the exact geometry.
+    """
+
+    def __init__(self, court, frame_shape=None, player_buffer=PLAYER_BUFFER, ball_buffer=BALL_BUFFER,
+                 cell=RASTER_CELL):
+        self.net_y = (court.tl.y + court.bl.y) / 2
+        self.player_buffer = player_buffer
+        self.ball_buffer = ball_buffer
+        self.court_zone = ConvexZone(court_polygon(court))
+        self.ball_zone = ConvexZone(sky_polygon(court, ball_buffer))
+
+        self.cell = cell
+        self.raster = None
+        if frame_shape is not None:
+            self.raster = self._build_raster(frame_shape[0], frame_shape[1])
+
+    def _build_raster(self, height, width):
+        rows, cols = -(-height // self.cell), -(-width // self.cell)
+        xs = (np.arange(cols) + 0.5) * self.cell
+        ys = (np.arange(rows) + 0.5) * self.cell
+        centres = np.stack(np.meshgrid(xs, ys), axis=-1).reshape(-1, 2)
+
+        # Every point of a cell is within this distance of its centre, and signed
+        # distance changes by at most that much, so cells further from the
+        # threshold than this have a single label throughout
+        margin = self.cell / np.sqrt(2) + 1e-6
+
+        court_d = self.court_zone.signed_distance(centres)
+        ball_d = self.ball_zone.signed_distance(centres)
+
+        raster = np.zeros(len(centres), dtype=np.uint8)
+        raster[court_d >= 0] |= IN_COURT
+        raster[court_d >= -self.player_buffer] |= IN_BUFFER
+        raster[ball_d >= 0] |= BALL_ZONE
+        raster[np.abs(court_d + self.player_buffer) <= margin] |= UNSURE_BUFFER
+        raster[np.abs(ball_d) <= margin] |= UNSURE_BALL
+        return raster.reshape(rows, cols)
+
+    def labels(self, points):
+        """Raster label per point; points off the frame get every unsure flag."""
+        points = np.asarray(points).reshape(-1, 2)
+        cols = np.floor_divide(points[:, 0], self.cell).astype(np.intp)
+        rows = np.floor_divide(points[:, 1], self.cell).astype(np.intp)
+        on_raster = (cols >= 0) & (cols < self.raster.shape[1]) & (rows >= 0) & (rows < self.raster.shape[0])
+
+        labels = np.full(len(points), UNSURE_BUFFER | UNSURE_BALL, dtype=np.uint8)
+        labels[on_raster] = self.raster[rows[on_raster], cols[on_raster]]
+        return labels
+
+    def _lookup(self, points, flag, unsure_flag, exact):
+        labels = self.labels(points)
+        result = (labels & flag) != 0
+        unsure = (labels & unsure_flag) != 0
+        if np.any(unsure):
+            result[unsure] = exact(np.asarray(points).reshape(-1, 2)[unsure])
+        return result
+
+    def players_in_court(self, points):
+        exact = lambda p: self.court_zone.contains(p, buffer=self.player_buffer)
+        if self.raster is None:
+            return exact(points)
+        return self._lookup(points, IN_BUFFER, UNSURE_BUFFER, exact)
+
+    def balls_in_zone(self, points):
+        exact = self.ball_zone.contains
+        if self.raster is None:
+            return exact(points)
+        return self._lookup(points, BALL_ZONE, UNSURE_BALL, exact)
@@ -0,0 +1,174 @@
+import copy
+import sys
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from data.Ball import Ball
+from data.Coord import Coord
+from data.Court import Court
+from data.eventframe import EventFrame
+from data.frame import Frame
+from data.framestack import FrameStack
+from data.orderofevents import OrderOfEvents
+from data.Player import Player
+from data.tracktable import TrackTable
+from logic.events import BallInOutTester, BallStoppedTester, EventTesters, LeftOfNetEvent, required_window
+from logic.perspective import TENNIS_COURT_LENGTH, TENNIS_COURT_SINGLES_WIDTH
+from logic.pipeline import analyse_frames, analyse_track, iter_events
+
+# --- CONFIG ---
+NUM_FRAMES = 3000
+SEED = 23
+COURT = Court(Coord(0.0, 0.0), Coord(0.0, TENNIS_COURT_SINGLES_WIDTH),
+              Coord(TENNIS_COURT_LENGTH, TENNIS_COURT_SINGLES_WIDTH), Coord(TENNIS_COURT_LENGTH, 0.0))
+
+
+def rally_track(rng, num_frames=NUM_FRAMES):
+    """Ball flying end to end with bounces, dead-ball pauses and dropouts; wandering players."""
+    track = TrackTable()
+    ball = np.array([2.0, 4.0])
+    vel = np.array([0.35, 0.02])
+    players = np.array([[1.0, 4.0], [22.5, 4.0]])
+    for i in range(num_frames):
+        phase = i % 400
+        if phase < 300:
+            ball += vel
+            if ball[0] < 0.5 or ball[0] > TENNIS_COURT_LENGTH - 0.5:
+                vel[0] = -vel[0]                               # Shot
+                vel[1] = rng.normal(0, 0.03)
+            if rng.random() < 0.02:
+                vel *= rng.uniform(0.5, 0.9)                   # Bounce
+                vel[0] = np.sign(vel[0]) * max(abs(vel[0]), 0.15)
+        elif phase < 360:
+            ball += rng.normal(0, 0.01, 2)                     # Dead ball, nearly still
+        else:
+            ball = np.array([rng.uniform(1, 22), rng.uniform(-1, 9.5)])
+        players += rng.normal(0, 0.3, (2, 2))
+        missing = rng.random(3) < [0.05, 0.02, 0.02]
+        track.append(i + 1,
+                     None if missing[0] else tuple(np.float32(ball)),
+                     None if missing[1] else tuple(np.float32(players[0])),
+                     None if missing[2] else tuple(np.float32(players[1])),
+                     COURT)
+    return track
+
+def stream_events(track, testers, emit_from=1):
+    # The streaming loop of analyse_frames, minus the vision system
+    stack = FrameStack(60, capacity=required_window(testers))
+    events = []
+    for row in track:
+        stack.push(row)
+        for tester in testers:
+            result = tester.test_event(stack)
+            if result is not None and row.frame >= emit_from:
+                events.append(EventFrame(row.frame, result.to_string()))
+    return events
+
+
+def test_batch_matches_streaming():
+    track = rally_track(np.random.default_rng(SEED))
+    streamed = stream_events(track, copy.deepcopy(EventTesters.ALL))
+    batched = analyse_track(track, copy.deepcopy(EventTesters.ALL))
+    assert batched == streamed
+    # Every kind of tester actually fired
+    kinds = {e.event for e in streamed}
+    assert {"ShotEvent", "BounceEvent", "BallStoppedEvent", "BallInEvent", "BallOutEvent",
+            "PlayerUpEvent", "LeftOfNetEvent", "RightOfNetEvent"} <= kinds
+
+def test_warm_up_frames_prime_but_do_not_emit():
+    track = rally_track(np.random.default_rng(SEED), num_frames=800)
+    streamed = stream_events(track, copy.deepcopy(EventTesters.ALL), emit_from=500)
+    assert analyse_track(track, copy.deepcopy(EventTesters.ALL), emit_from=500) == streamed
+
+def test_merged_batch_matches_merged_stream():
+    track = rally_track(np.random.default_rng(SEED))
+    order = OrderOfEvents()
+    for event in stream_events(track, copy.deepcopy(EventTesters.ALL)):
+        order.addEvent(event)
+    merged = analyse_track(track, copy.deepcopy(EventTesters.ALL), merge=True)
+    assert merged == order.mergeConsecutiveEvents()
+
+def test_testers_without_a_batch_form_are_replayed():
+    class OnlyStreaming:
+        window = 1
+        def test_event(self, frames):
+            recent = frames.takeFrames(1)
+            return LeftOfNetEvent() if recent[0].ball is not None and recent[0].ball.pos.x < 3 else None
+
+    track = rally_track(np.random.default_rng(SEED), num_frames=500)
+    testers = [EventTesters.BOUNCE_SHOT, OnlyStreaming()]
+    assert analyse_track(track, testers) == stream_events(track, testers)
+
+def test_long_stop_window_costs_no_extra_frames():
+    # A 2 s stop is counted, not re-read: the stack still only holds the last step
+    tester = BallStoppedTester(min_stopped_seconds=2.0)
+    assert tester.window == 2
+    track = TrackTable()
+    for i in range(400):
+        x = 2.0 + 0.3 * min(i, 100) + 0.3 * max(i - 280, 0)   # 3 s at rest in the middle
+        track.append(i + 1, (x, 4.0), None, None, COURT)
+    streamed = stream_events(track, [tester])
+    assert [e.frameIndex for e in streamed] == list(range(221, 282))
+    assert analyse_track(track, [BallStoppedTester(min_stopped_seconds=2.0)]) == streamed
+
+def test_running_state_restarts_on_a_new_stack():
+    # A tester handed a new stack (another video) must not carry its counters over
+    counted = [EventTesters.BALL_STOPPED, EventTesters.PLAYER0_UP, EventTesters.PLAYER1_LEFT]
+    testers = copy.deepcopy(counted)
+    track = rally_track(np.random.default_rng(SEED), num_frames=700)
+    stream_events(rally_track(np.random.default_rng(SEED + 1), num_frames=350), testers)
+    assert stream_events(track, testers) == stream_events(track, copy.deepcopy(counted))
+
+def test_batch_in_out_leaves_the_tester_alone():
+    track = rally_track(np.random.default_rng(SEED), num_frames=1500)
+    tester = BallInOutTester()
+    first, again = tester.test_track(track), tester.test_track(track)
+    assert tester.last_state is None
+    for (mask, event), (mask_again, event_again) in zip(first, again):
+        assert event is event_again and np.array_equal(mask, mask_again)
+
+    # Resuming from the state of the first bounce drops only that one
+    (into, _), (out_of, _) = first
+    fired = np.flatnonzero(into | out_of)
+    state = "in" if into[fired[0]] else "out"
+    (into2, _), (out_of2, _) = tester.test_track(track, initial_state=state)
+    assert np.array_equal(np.flatnonzero(into2 | out_of2), fired[1:])
+
+class ReplaySystem:
+    # Stands in for VisionSystem: the track's rows as pixel Frames, 40 px to the metre
+    def __init__(self, track, scale=40.0):
+        point = lambda p: Coord(p.pos.x * scale, p.pos.y * scale) if p is not None else None
+        court = Court(*(Coord(c.x * scale, c.y * scale) for c in (COURT.tl, COURT.tr, COURT.br, COURT.bl)))
+        self.frames = iter([Frame(Ball(point(r.ball)) if r.ball else None, court,
+                                  Player(point(r.player1), "P1") if r.player1 else None,
+                                  Player(point(r.player2), "P2") if r.player2 else None) for r in track])
+
+    def getNextFrame(self):
+        return next(self.frames, None)
+
+def test_online_stream_matches_the_batch_pass():
+    track = rally_track(np.random.default_rng(SEED), num_frames=1500)
+    streamed = list(iter_events(ReplaySystem(track), copy.deepcopy(EventTesters.ALL)))
+    assert streamed and streamed == analyse_frames(ReplaySystem(track), copy.deepcopy(EventTesters.ALL))
+
+    # Merged one event at a time, the way stream_events hands them out
+    order, online = OrderOfEvents(), OrderOfEvents()
+    for event in streamed:
+        order.addEvent(event)
+    assert [e for e in streamed if online.mergeEvent(e) is not None] == order.mergeConsecutiveEvents()
+
+
+if __name__ == "__main__":
+    test_batch_matches_streaming()
+    test_warm_up_frames_prime_but_do_not_emit()
+    test_merged_batch_matches_merged_stream()
+    test_testers_without_a_batch_form_are_replayed()
+    test_long_stop_window_costs_no_extra_frames()
+    test_running_state_restarts_on_a_new_stack()
+    test_batch_in_out_leaves_the_tester_alone()
+    test_online_stream_matches_the_batch_pass()
+    print("✅ Batch event pass matches the streaming testers")
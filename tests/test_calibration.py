@@ -0,0 +1,140 @@
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+import vision.calibration as calibration
+from vision.calibration import calibrate_court, detect_court
+
+# --- CONFIG ---
+FRAME_SHAPE = (1080, 1920, 3)
+SINGLES_CORNERS = [(746, 257), (1183, 254), (1879, 836), (27, 841)]   # tl, tr, br, bl
+OTHER_CORNERS = [(716, 217), (1213, 210), (1882, 798), (27, 798)]      # Same framing, another court
+LENGTH, SINGLES, DOUBLES, SERVICE = 23.77, 8.23, 10.97, 6.40
+LINE_THICKNESS = 5
+MAX_ERROR = 6           # px
+SEED = 5
+
+
+def court_lines():
+    # Court model in metres, x across (singles court from 0 to SINGLES), y from the far baseline
+    alley = (DOUBLES - SINGLES) / 2
+    net = LENGTH / 2
+    lines = [((-alley, 0), (SINGLES + alley, 0)), ((-alley, LENGTH), (SINGLES + alley, LENGTH))]
+    for x in (-alley, 0, SINGLES, SINGLES + alley):
+        lines.append(((x, 0), (x, LENGTH)))
+    for y in (net - SERVICE, net + SERVICE):
+        lines.append(((0, y), (SINGLES, y)))
+    lines.append(((SINGLES / 2, net - SERVICE), (SINGLES / 2, net + SERVICE)))
+    return lines
+
+def render_court(rng, players=(), corners=SINGLES_CORNERS):
+    # corners None: the same view without any painted lines
+    frame = np.full(FRAME_SHAPE, (60, 120, 50), dtype=np.uint8)
+    frame[:150] = (90, 90, 90)                                          # Stands
+    cv2.rectangle(frame, (40, 30), (460, 110), (240, 240, 240), -1)     # Scoreboard
+    model = np.float32([(0, 0), (SINGLES, 0), (SINGLES, LENGTH), (0, LENGTH)])
+    matrix = cv2.getPerspectiveTransform(model, np.float32(corners or SINGLES_CORNERS))
+    for a, b in court_lines() if corners else ():
+        (p, q) = cv2.perspectiveTransform(np.float32([[a, b]]), matrix)[0]
+        cv2.line(frame, tuple(np.round(p).astype(int)), tuple(np.round(q).astype(int)),
+                 (235, 235, 235), LINE_THICKNESS, cv2.LINE_AA)
+    for x, y in players:
+        cv2.rectangle(frame, (x - 30, y - 160), (x + 30, y), (40, 40, 160), -1)
+    noise = rng.normal(0, 4, FRAME_SHAPE)
+    return np.clip(frame + noise, 0, 255).astype(np.uint8)
+
+def corner_error(court):
+    found = np.array(court.to_vectors(), dtype=float)
+    return np.max(np.linalg.norm(found - np.array(SINGLES_CORNERS), axis=1))
+
+
+def test_finds_singles_corners():
+    rng = np.random.default_rng(SEED)
+    court = detect_court([render_court(rng)])
+    assert court is not None
+    assert corner_error(court) <= MAX_ERROR
+
+def test_players_on_the_lines_are_voted_out():
+    rng = np.random.default_rng(SEED)
+    # A player covers the near-left corner in one of three frames
+    frames = [render_court(rng, [(60, 860)]), render_court(rng, [(900, 850)]), render_court(rng, [(1000, 300)])]
+    court = detect_court(frames)
+    assert court is not None
+    assert corner_error(court) <= MAX_ERROR
+
+def test_no_court_is_none():
+    rng = np.random.default_rng(SEED)
+    blank = np.clip(rng.normal(100, 4, FRAME_SHAPE), 0, 255).astype(np.uint8)
+    assert detect_court([blank]) is None
+
+def count_detections(monkeypatch):
+    calls = []
+    detect = calibration.detect_court
+    monkeypatch.setattr(calibration, "detect_court", lambda *args: calls.append(1) or detect(*args))
+    return calls
+
+def test_same_camera_skips_detection(monkeypatch):
+    rng = np.random.default_rng(SEED)
+    calls = count_detections(monkeypatch)
+    with tempfile.TemporaryDirectory() as tmp:
+        court = calibrate_court([render_court(rng) for _ in range(3)], cache_dir=tmp)
+        cached = calibrate_court([render_court(rng, [(900, 850)]) for _ in range(3)], cache_dir=tmp)
+        assert cached.to_vectors() == court.to_vectors()
+        assert len(calls) == 1
+
+        # A different view is calibrated afresh
+        assert calibrate_court([render_court(rng, corners=None)] * 3, cache_dir=tmp) is None
+        assert len(calls) == 2
+
+def test_cached_corners_must_lie_on_the_lines(monkeypatch):
+    rng = np.random.default_rng(SEED)
+    calls = count_detections(monkeypatch)
+    # Two cameras that both open on a black frame, with nearly the same thumbnail
+    black = np.zeros(FRAME_SHAPE, np.uint8)
+    with tempfile.TemporaryDirectory() as tmp:
+        calibrate_court([black] + [render_court(rng, corners=OTHER_CORNERS) for _ in range(4)], cache_dir=tmp)
+        court = calibrate_court([black] + [render_court(rng) for _ in range(4)], cache_dir=tmp)
+        assert len(calls) == 2
+        assert corner_error(court) <= MAX_ERROR
+        # The stale entry is replaced, not kept next to the new one
+        assert len(calibration.CalibrationCache(tmp).load()) == 1
+
+        # A fade says nothing about the camera, it is neither looked up nor stored
+        assert calibrate_court([black] * 5, cache_dir=tmp) is None
+        assert len(calibration.CalibrationCache(tmp).load()) == 1
+
+def test_camera_without_lines_is_retried_later(monkeypatch):
+    rng = np.random.default_rng(SEED)
+    calls = count_detections(monkeypatch)
+    no_lines = [render_court(rng, corners=None) for _ in range(3)]
+    with tempfile.TemporaryDirectory() as tmp:
+        assert calibrate_court(no_lines, cache_dir=tmp) is None
+        assert calibrate_court(no_lines, cache_dir=tmp) is None
+        assert len(calls) == 1
+
+        # Once the failure is old enough the camera is tried again
+        now = time.time()
+        monkeypatch.setattr(calibration.time, "time", lambda: now + calibration.FAILED_CAMERA_SECONDS + 1)
+        assert calibrate_court(no_lines, cache_dir=tmp) is None
+        assert len(calls) == 2
+        assert len(calibration.CalibrationCache(tmp).load()) == 1
+
+if __name__ == "__main__":
+    test_finds_singles_corners()
+    test_players_on_the_lines_are_voted_out()
+    test_no_court_is_none()
+    with pytest.MonkeyPatch.context() as patch:
+        test_same_camera_skips_detection(patch)
+    with pytest.MonkeyPatch.context() as patch:
+        test_cached_corners_must_lie_on_the_lines(patch)
+    with pytest.MonkeyPatch.context() as patch:
+        test_camera_without_lines_is_retried_later(patch)
+    print("✅ Court corners found from the lines")
@@ -0,0 +1,91 @@
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import supervision as sv
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from vision.cache import HASH_CHUNK, CachedDetections, DetectionRecorder, cache_path, video_hash
+
+# --- CONFIG ---
+NUM_FRAMES = 50
+SEED = 3
+SETTINGS = {'model': 'yolov8m.pt', 'backend': 'torch', 'profile': 'full', 'imgsz': 1280}
+
+
+def random_detections(rng):
+    n = rng.integers(0, 6)
+    xy = rng.uniform(0, 1800, (n, 2))
+    xyxy = np.concatenate([xy, xy + rng.uniform(5, 120, (n, 2))], axis=1).astype(np.float32)
+    return sv.Detections(xyxy=xyxy.reshape(-1, 4), class_id=rng.choice([0, 32], n),
+                         confidence=rng.uniform(0.1, 1.0, n).astype(np.float32))
+
+
+def test_round_trip_keeps_every_frame():
+    rng = np.random.default_rng(SEED)
+    recorder = DetectionRecorder(SETTINGS)
+    recorded = {}
+    for index in range(NUM_FRAMES):
+        # Every third frame skipped, like a detection stride
+        if index % 3 == 2: continue
+        recorded[index] = random_detections(rng)
+        recorder.record(index, recorded[index])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = cache_path("ab" * 32, SETTINGS, cache_dir=tmp)
+        recorder.save(path, NUM_FRAMES)
+        cached = CachedDetections.load(path)
+
+    assert cached.num_frames == NUM_FRAMES
+    assert cached.meta == SETTINGS
+    for index in range(NUM_FRAMES):
+        assert cached.detected[index] == (index in recorded)
+        if index not in recorded: continue
+        replayed, original = cached.detections(index), recorded[index]
+        assert np.array_equal(replayed.xyxy, original.xyxy)
+        assert np.array_equal(replayed.class_id, original.class_id)
+        assert np.array_equal(replayed.confidence, original.confidence)
+
+def test_key_depends_on_content_and_settings():
+    base = cache_path("ab" * 32, SETTINGS, cache_dir="/cache")
+    assert cache_path("ab" * 32, dict(SETTINGS), cache_dir="/cache") == base
+    assert cache_path("cd" * 32, SETTINGS, cache_dir="/cache") != base
+    assert cache_path("ab" * 32, dict(SETTINGS, imgsz=640), cache_dir="/cache") != base
+
+def test_hash_samples_big_files_and_reads_small_ones_whole():
+    rng = np.random.default_rng(SEED)
+    data = bytearray(rng.integers(0, 256, 4 * HASH_CHUNK, dtype=np.uint8).tobytes())
+    with tempfile.TemporaryDirectory() as tmp:
+        def hash_of(content, name="video.mp4", samples=2):
+            path = Path(tmp) / name
+            path.write_bytes(bytes(content))
+            return video_hash(str(path), samples)
+
+        base = hash_of(data)
+        assert hash_of(data, name="renamed.mp4") == base
+        assert hash_of(data[:-1]) != base
+        # Two samples are the first and the last chunk
+        for offset, sampled in ((10, True), (len(data) - 10, True), (2 * HASH_CHUNK, False)):
+            changed = bytearray(data)
+            changed[offset] ^= 1
+            assert (hash_of(changed) != base) == sampled
+            # Up to the sampled size every byte counts
+            assert hash_of(changed, samples=4) != hash_of(data, samples=4)
+
+def test_unreadable_file_is_a_miss():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "broken.npz"
+        path.write_bytes(b"not an npz")
+        assert CachedDetections.load(str(path)) is None
+        assert CachedDetections.load(str(Path(tmp) / "missing.npz")) is None
+
+
+if __name__ == "__main__":
+    test_round_trip_keeps_every_frame()
+    test_key_depends_on_content_and_settings()
+    test_hash_samples_big_files_and_reads_small_ones_whole()
+    test_unreadable_file_is_a_miss()
+    print("✅ Detection cache round-trips")
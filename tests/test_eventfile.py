@@ -0,0 +1,105 @@
+import copy
+import json
+import sys
+from dataclasses import asdict
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from data.eventfile import decode_events, encode_events, read_events, write_events
+from data.eventframe import EventFrame
+from data.tracktable import COLUMNS
+from logic.events import EventTesters
+from logic.pipeline import analyse_track
+from logic.trajectories import random_rally
+
+# --- CONFIG ---
+SEED = 7
+NUM_FRAMES = 3000
+
+
+def rally():
+    trajectory = random_rally(NUM_FRAMES, np.random.default_rng(SEED))
+    return analyse_track(trajectory.track, copy.deepcopy(EventTesters.ALL)), trajectory.track
+
+def assert_same_track(read, track):
+    assert len(read) == len(track)
+    assert read.player_names == track.player_names
+    for name in COLUMNS:
+        assert np.array_equal(read.column(name), track.column(name)), name
+    assert [c.to_vectors() for c in read.courts] == [c.to_vectors() for c in track.courts]
+    assert read[-1].court.to_vectors() == track[-1].court.to_vectors()
+
+
+@pytest.mark.parametrize("compression", [None, "deflate"])
+def test_events_and_track_round_trip(compression):
+    events, track = rally()
+    read = decode_events(encode_events(events, track, compression))
+    assert read.events() == events
+    assert read.to_json() == json.dumps([asdict(e) for e in events], indent=4)
+    assert_same_track(read.track, track)
+
+    # Codes index the string table, each name stored once
+    assert sorted(read.names) == sorted({e.event for e in events})
+    bounces = [e.frameIndex for e in events if e.event == "BounceEvent"]
+    assert read.of_kind("BounceEvent").tolist() == bounces
+    assert read.of_kind("RallyEvent").tolist() == []
+
+def test_mapped_file_reads_in_place(tmp_path):
+    events, track = rally()
+    path = tmp_path / "rally.bkev"
+    write_events(path, events, track)
+
+    read = read_events(path, mmap=True)
+    assert read.events() == events
+    assert_same_track(read.track, track)
+    # Views into the mapping, not copies
+    assert not read.frames.flags.writeable and not read.frames.flags.owndata
+    assert all(col.ctypes.data % 8 == 0 for col in read.track.columns.values())
+
+    # Appending grows into new columns instead of writing to the file
+    read.track.append(NUM_FRAMES + 1, (1.0, 2.0))
+    assert len(read.track) == NUM_FRAMES + 1
+    assert read_events(path).events() == events
+
+def test_binary_is_much_smaller_than_json():
+    events = [EventFrame(i * 7, name) for i, name in
+              enumerate(["BallStoppedEvent", "ShotEvent", "BounceEvent", "PlayerLeftEvent"] * 2500)]
+    raw_json = json.dumps([asdict(e) for e in events], indent=4).encode()
+    plain, deflated = encode_events(events), encode_events(events, compression="deflate")
+    assert len(plain) < len(raw_json) / 10
+    assert len(deflated) < len(plain)
+    assert decode_events(deflated).events() == events
+
+def test_zstd_block_and_bad_input():
+    events, track = rally()
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        with pytest.raises(ImportError, match="zstandard"):
+            encode_events(events, track, "zstd")
+    else:
+        read = decode_events(encode_events(events, track, "zstd"))
+        assert read.events() == events
+        assert_same_track(read.track, track)
+
+    with pytest.raises(ValueError, match="compression"):
+        encode_events(events, compression="lz4")
+    with pytest.raises(ValueError, match="magic"):
+        decode_events(b"[]" * 16)
+    assert len(decode_events(encode_events([])).events()) == 0
+
+
+if __name__ == "__main__":
+    import tempfile
+    test_events_and_track_round_trip(None)
+    test_events_and_track_round_trip("deflate")
+    with tempfile.TemporaryDirectory() as tmp:
+        test_mapped_file_reads_in_place(Path(tmp))
+    test_binary_is_much_smaller_than_json()
+    test_zstd_block_and_bad_input()
+    print("✅ Binary event files round-trip events and tracks")
@@ -0,0 +1,117 @@
+import copy
+import sys
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from data.eventframe import EventFrame
+from data.eventindex import EventIndex
+from data.orderofevents import OrderOfEvents
+from logic.events import EventTesters
+from logic.pipeline import analyse_track
+from logic.trajectories import TrajectoryBuilder
+
+# --- CONFIG ---
+KINDS = ("ShotEvent", "BounceEvent", "BallStoppedEvent", "LeftOfNetEvent")
+NUM_EVENTS = 2000
+NUM_FRAMES = 5000
+SEED = 4
+
+
+def random_events(rng):
+    frames = np.sort(rng.integers(1, NUM_FRAMES, NUM_EVENTS))
+    return [EventFrame(int(f), KINDS[rng.integers(len(KINDS))]) for f in frames]
+
+def random_window(rng):
+    start = int(rng.integers(-10, NUM_FRAMES))
+    return start, start + int(rng.integers(0, 400))
+
+
+def test_queries_match_a_full_scan():
+    rng = np.random.default_rng(SEED)
+    events = random_events(rng)
+    index = EventIndex(events)
+    assert len(index) == len(events)
+
+    for _ in range(300):
+        start, end = random_window(rng)
+        kind = KINDS[rng.integers(len(KINDS))]
+        inside = [e for e in events if start <= e.frameIndex < end]
+        assert index.between(start, end) == inside
+        assert index.between(start, end, kind) == [e for e in inside if e.event == kind]
+
+        counts = {k: sum(e.event == k for e in inside) for k in KINDS}
+        assert index.count(start, end) == {k: n for k, n in counts.items() if n}
+        assert index.count(start, end, [kind, "RallyEvent"]) == ({kind: counts[kind]} if counts[kind] else {})
+
+        before = [e for e in events if e.event == kind and e.frameIndex < start]
+        assert index.last_before(kind, start) == (before[-1] if before else None)
+        after = [e for e in events if e.event == kind and e.frameIndex >= start]
+        assert index.first_from(kind, start) == (after[0] if after else None)
+
+def test_late_inserts_land_in_frame_order():
+    rng = np.random.default_rng(SEED)
+    events = random_events(rng)
+    shuffled = [events[i] for i in rng.permutation(len(events))]
+    index = EventIndex(shuffled)
+
+    assert [e.frameIndex for e in index.between(0, NUM_FRAMES)] == [e.frameIndex for e in events]
+    for kind in KINDS:
+        assert index.between(0, NUM_FRAMES, kind) == sorted(
+            (e for e in shuffled if e.event == kind), key=lambda e: e.frameIndex)
+
+def test_runs_join_across_late_frames():
+    index = EventIndex()
+    for frame in (10, 11, 12, 20, 21, 15, 16):
+        index.add(EventFrame(frame, "BallStoppedEvent"))
+    assert index.runs_between("BallStoppedEvent", 0, 100) == [(10, 12), (15, 16), (20, 21)]
+
+    # 13 and 14 close the gaps on either side of 15..16
+    index.add(EventFrame(14, "BallStoppedEvent"))
+    index.add(EventFrame(13, "BallStoppedEvent"))
+    assert index.runs_between("BallStoppedEvent", 0, 100) == [(10, 16), (20, 21)]
+    assert index.runs_between("BallStoppedEvent", 17, 20) == []
+    assert index.runs_between("BallStoppedEvent", 16, 21) == [(10, 16), (20, 21)]
+    assert index.runs_between("ShotEvent", 0, 100) == []
+
+def test_stop_is_one_run_of_the_streamed_events():
+    builder = TrajectoryBuilder()
+    builder.shot((18.0, 3.0)).stop(2.0).shot((4.0, 4.0))
+    trajectory = builder.build()
+    stop, restart = trajectory.of_kind('stop')[0], trajectory.of_kind('shot')[1]
+
+    order = OrderOfEvents()
+    for event in analyse_track(trajectory.track, copy.deepcopy(EventTesters.ALL)):
+        order.addEvent(event)
+    runs = order.index.runs_between("BallStoppedEvent", stop.frame, restart.frame)
+    assert runs == [(stop.frame + 29, restart.frame)]
+    assert order.index.last_before("BounceEvent", stop.frame).frameIndex == trajectory.of_kind('bounce')[0].frame + 1
+
+def test_index_is_built_on_first_query_and_covers_streamed_events():
+    rng = np.random.default_rng(SEED)
+    events = random_events(rng)
+    order, streamed = OrderOfEvents(), OrderOfEvents()
+    for event in events[:1000]:
+        order.addEvent(event)
+        streamed.mergeEvent(event)
+    assert order._index is None and streamed._index is None
+
+    # Built from what was added so far, then kept up to date
+    assert order.index.between(0, NUM_FRAMES) == events[:1000]
+    for event in events[1000:]:
+        order.addEvent(event)
+        streamed.mergeEvent(event)
+    assert order.index.between(0, NUM_FRAMES) == events
+    assert streamed.index.between(0, NUM_FRAMES) == events
+
+
+if __name__ == "__main__":
+    test_queries_match_a_full_scan()
+    test_late_inserts_land_in_frame_order()
+    test_runs_join_across_late_frames()
+    test_stop_is_one_run_of_the_streamed_events()
+    test_index_is_built_on_first_query_and_covers_streamed_events()
+    print("✅ Event index answers range queries like a full scan")
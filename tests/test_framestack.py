@@ -0,0 +1,69 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from data.Ball import Ball
+from data.Coord import Coord
+from data.framestack import FrameStack
+from data.normalisedframe import NormalisedFrame
+from data.Player import Player
+from logic.events import EventTesters, required_window
+
+# --- CONFIG ---
+FPS = 60
+CAPACITY = 7
+NUM_FRAMES = 30         # Wraps the ring a few times
+
+
+def frame(k):
+    ball = Ball(Coord(float(k), float(-k))) if k % 4 else None
+    return NormalisedFrame(ball, None, Player(Coord(k + 0.5, 1.0), "P1"), None)
+
+def ball_x(window):
+    return [f.ball.pos.x if f.ball is not None else None for f in window]
+
+
+def test_windows_match_list_slices():
+    stack, reference = FrameStack(FPS, capacity=CAPACITY), []
+    for k in range(NUM_FRAMES):
+        stack.push(frame(k))
+        reference = (reference + [frame(k)])[-CAPACITY:]
+        for n in (1, 3, CAPACITY, CAPACITY + 5):
+            assert ball_x(stack.takeFrames(n)) == ball_x(reference[-n:])
+        assert len(stack) == len(reference)
+        assert stack.peek().player1.pos.x == k + 0.5
+        assert stack.takeFrames(2)[-1].player2 is None
+
+def test_windows_are_views_of_the_buffer():
+    stack = FrameStack(FPS, capacity=CAPACITY)
+    for k in range(NUM_FRAMES):
+        stack.push(frame(k))
+    window = stack.takeFrames(CAPACITY)
+    xs = window.column("ball_x")
+    assert np.shares_memory(xs, stack.columns["ball_x"])
+    assert np.array_equal(xs[window.column("has_ball")], [k for k in range(NUM_FRAMES - CAPACITY, NUM_FRAMES) if k % 4])
+    assert ball_x(window[2:4]) == ball_x(window)[2:4]
+
+def test_dequeue_drops_the_oldest():
+    stack = FrameStack(FPS, capacity=CAPACITY)
+    for k in range(1, 4):
+        stack.push(frame(k))
+    assert stack.dequeue().ball.pos.x == 1.0
+    assert ball_x(stack.takeFrames(CAPACITY)) == [2.0, 3.0]
+
+def test_capacity_follows_the_testers():
+    # Player movement's 5 frames is the longest window, BallStoppedTester keeps its stop in a counter
+    assert required_window(EventTesters.ALL) == 5
+    assert required_window([EventTesters.BOUNCE_SHOT, EventTesters.BALL_STOPPED]) == 3
+
+
+if __name__ == "__main__":
+    test_windows_match_list_slices()
+    test_windows_are_views_of_the_buffer()
+    test_dequeue_drops_the_oldest()
+    test_capacity_follows_the_testers()
+    print("✅ Ring-buffer FrameStack matches the list version")
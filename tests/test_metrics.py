@@ -0,0 +1,74 @@
+import copy
+import pickle
+import sys
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from logic.events import EventTesters
+from logic.pipeline import iter_events
+from test_batch_events import ReplaySystem, SEED, rally_track
+from utils.metrics import Metrics, REGISTRY
+
+
+def parse(text):
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+def test_histograms_render_cumulative_buckets():
+    metrics = Metrics()
+    for seconds in (0.00002, 0.0003, 0.0003, 7.0, 120.0):
+        metrics.observe("detect", seconds)
+    metrics.inc("frames", 5)
+    samples = parse(metrics.render())
+
+    assert samples['ballknowledge_stage_seconds_bucket{stage="detect",le="5e-05"}'] == 1
+    assert samples['ballknowledge_stage_seconds_bucket{stage="detect",le="0.0005"}'] == 3
+    assert samples['ballknowledge_stage_seconds_bucket{stage="detect",le="60.0"}'] == 4
+    assert samples['ballknowledge_stage_seconds_bucket{stage="detect",le="+Inf"}'] == 5
+    assert samples['ballknowledge_stage_seconds_count{stage="detect"}'] == 5
+    assert np.isclose(samples['ballknowledge_stage_seconds_sum{stage="detect"}'], 127.0006)
+    assert samples['ballknowledge_frames_total'] == 5
+
+def test_timer_records_failures_and_snapshots_merge():
+    worker = Metrics()
+    try:
+        with worker.timer("llm", call="commentary"):
+            raise RuntimeError("rate limited")
+    except RuntimeError:
+        pass
+    worker.inc("events", 3, tester="BOUNCE_SHOT")
+
+    # Worker processes send a pickled snapshot back to the parent
+    parent = Metrics()
+    parent.merge(pickle.loads(pickle.dumps(worker.snapshot())))
+    parent.merge(worker.snapshot())
+    samples = parse(parent.render())
+    assert samples['ballknowledge_stage_seconds_count{stage="llm",call="commentary"}'] == 2
+    assert samples['ballknowledge_events_total{tester="BOUNCE_SHOT"}'] == 6
+
+def test_streaming_pipeline_times_every_tester():
+    REGISTRY.reset()
+    track = rally_track(np.random.default_rng(SEED), num_frames=300)
+    events = list(iter_events(ReplaySystem(track), copy.deepcopy(EventTesters.ALL)))
+    samples = parse(REGISTRY.render())
+
+    for name in ("LEFT_SIDE", "BOUNCE_SHOT", "PLAYER1_RIGHT", "BALL_STOPPED", "BALL_IN_OUT"):
+        assert samples[f'ballknowledge_stage_seconds_count{{stage="tester",tester="{name}"}}'] == 300
+    assert samples['ballknowledge_stage_seconds_count{stage="normalise"}'] == 300
+    assert samples['ballknowledge_frames_total'] == 300
+    assert samples['ballknowledge_events_total'] == len(events)
+
+
+if __name__ == "__main__":
+    test_histograms_render_cumulative_buckets()
+    test_timer_records_failures_and_snapshots_merge()
+    test_streaming_pipeline_times_every_tester()
+    print("✅ Stage metrics render as Prometheus text")
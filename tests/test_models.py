@@ -0,0 +1,38 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+import vision.models as models
+from vision.models import register_model, registry_status, warm_up
+
+# --- CONFIG ---
+MODEL_NAME = "/models/stand-in.pt"
+
+
+def failing_model(*args, **kwargs):
+    raise RuntimeError("no GPU")
+
+def test_warm_up_records_errors_instead_of_raising(monkeypatch):
+    monkeypatch.setattr(models, "_REGISTRY", {})
+
+    # Fails before anything is registered
+    entry = warm_up(MODEL_NAME, backend="tensorrt")
+    assert entry.status == "error" and "Unknown detector backend" in entry.error
+    assert registry_status()['models']["stand-in.pt (tensorrt)"]['status'] == "error"
+
+    # Fails in the registered model's first inference
+    registered = register_model(failing_model, MODEL_NAME)
+    registered.status = "loaded"
+    entry = warm_up(MODEL_NAME, imgsz=32)
+    assert entry is registered
+    assert entry.status == "error" and entry.error == "no GPU"
+    assert not registry_status()['ready']
+
+
+if __name__ == "__main__":
+    import pytest
+    with pytest.MonkeyPatch.context() as patch:
+        test_warm_up_records_errors_instead_of_raising(patch)
+    print("✅ Model warm-up records its errors")
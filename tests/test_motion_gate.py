@@ -0,0 +1,65 @@
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from vision.core import get_court_calibration
+from vision.motion import MotionGate
+from vision.zones import CourtZones
+
+# --- CONFIG ---
+FRAME_SHAPE = (1080, 1920, 3)
+COURT_GREEN = (60, 140, 60)
+BALL_COLOUR = (200, 255, 255)
+BALL_RADIUS = 6
+
+
+def make_gate(**options):
+    zones = CourtZones(get_court_calibration(None), frame_shape=FRAME_SHAPE)
+    return MotionGate(zones, FRAME_SHAPE, **options)
+
+def court_frame(ball=None):
+    frame = np.full(FRAME_SHAPE, COURT_GREEN, dtype=np.uint8)
+    if ball is not None:
+        cv2.circle(frame, ball, BALL_RADIUS, BALL_COLOUR, -1)
+    return frame
+
+
+def test_still_frames_are_static():
+    gate = make_gate()
+    assert not gate.is_static(court_frame((900, 500)))     # Nothing to compare against yet
+    for _ in range(10):
+        assert gate.is_static(court_frame((900, 500)))
+    assert gate.skipped == 10 and gate.checked == 11
+
+def test_moving_ball_in_court_is_motion():
+    gate = make_gate()
+    gate.is_static(court_frame((900, 500)))
+    assert not gate.is_static(court_frame((912, 494)))
+    # The ball vanishing is a change too
+    assert not gate.is_static(court_frame())
+
+def test_changes_outside_the_zones_are_ignored():
+    gate = make_gate()
+    gate.is_static(court_frame())
+    # Bottom-left corner is outside both the player buffer and the ball zone
+    assert not gate.mask[-1, 0]
+    assert gate.is_static(court_frame((5, 1075)))
+
+def test_detects_at_least_every_max_static_frames():
+    gate = make_gate(max_static=5)
+    frame = court_frame((900, 500))
+    decisions = [gate.is_static(frame) for _ in range(13)]
+    assert decisions == [False] + [True] * 5 + [False] + [True] * 5 + [False]
+
+
+if __name__ == "__main__":
+    test_still_frames_are_static()
+    test_moving_ball_in_court_is_motion()
+    test_changes_outside_the_zones_are_ignored()
+    test_detects_at_least_every_max_static_frames()
+    print("✅ Motion gate skips only still frames")
@@ -0,0 +1,75 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from data.Ball import Ball
+from data.Coord import Coord
+from data.frame import Frame, map_frames
+from data.Player import Player
+from logic.perspective import FrameUnskew, NET_X, court_homography
+from vision.core import get_court_calibration
+
+# --- CONFIG ---
+NUM_FRAMES = 40
+SEED = 11
+
+
+def random_frames(rng, court):
+    frames = []
+    for _ in range(NUM_FRAMES):
+        ball = Ball(Coord(*rng.uniform(0, 1900, 2))) if rng.random() < 0.7 else None
+        p1 = Player(Coord(*rng.uniform(0, 1900, 2)), "P1") if rng.random() < 0.9 else None
+        p2 = Player(Coord(*rng.uniform(0, 1900, 2)), "P2") if rng.random() < 0.9 else None
+        frames.append(Frame(ball, court, p1, p2))
+    return frames
+
+def vectors(normalised):
+    parts = [normalised.ball and normalised.ball.pos, normalised.player1 and normalised.player1.pos,
+             normalised.player2 and normalised.player2.pos]
+    parts = [p.to_vector() if p is not None else None for p in parts]
+    return parts + [normalised.court.to_vectors()]
+
+
+def test_homography_is_computed_once_per_court():
+    corners = get_court_calibration(None).to_vectors()
+    assert FrameUnskew(corners).matrix is FrameUnskew([list(c) for c in corners]).matrix
+    assert FrameUnskew(corners).matrix is not FrameUnskew([[0, 0], [0, 1], [1, 1], [1, 0]]).matrix
+    assert court_homography.cache_info().hits >= 2
+
+def test_block_matches_point_by_point():
+    rng = np.random.default_rng(SEED)
+    court = get_court_calibration(None)
+    normaliser = FrameUnskew(court.to_vectors())
+    frames = random_frames(rng, court)
+
+    block = map_frames(frames)
+    for frame, normalised in zip(frames, block):
+        one_by_one = [
+            frame.ball and frame.ball.map(normaliser), frame.player1 and frame.player1.map(normaliser),
+            frame.player2 and frame.player2.map(normaliser),
+        ]
+        assert vectors(normalised)[:3] == [o.pos.to_vector() if o is not None else None for o in one_by_one]
+        assert vectors(normalised)[3] == court.map(normaliser).to_vectors()
+        assert vectors(frame.map(normaliser)) == vectors(normalised)
+
+def test_parallax_pulls_towards_the_net():
+    normaliser = FrameUnskew(get_court_calibration(None).to_vectors())
+    ground = normaliser.unskew_coords([[900, 300], [900, 800]])
+    lifted = normaliser.unskew_coords([[900, 300], [900, 800]], height_factors=[1.0, 1.0])
+    assert ground[0][0] < NET_X < ground[1][0]
+    assert lifted[0][0] > ground[0][0] and lifted[1][0] < ground[1][0]
+    # Missing heights count as ground level, like the per-point helper
+    partial = normaliser.unskew_coords([[900, 300], [900, 800]], height_factors=[1.0])
+    assert partial[0][0] == lifted[0][0] and partial[1][0] == ground[1][0]
+    assert normaliser._apply_parallax(5.0, 1.0) == 6.25
+
+
+if __name__ == "__main__":
+    test_homography_is_computed_once_per_court()
+    test_block_matches_point_by_point()
+    test_parallax_pulls_towards_the_net()
+    print("✅ Batch perspective transform matches per-point mapping")
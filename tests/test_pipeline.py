@@ -0,0 +1,156 @@
+import contextlib
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+sys.path.insert(0, str(PROJECT_ROOT / "benchmarks"))
+
+import synthetic
+from data.Coord import Coord
+from data.Court import Court
+import vision.cache as cache
+import vision.calibration as calibration
+import vision.core as core
+import logic.pipeline as pipeline
+from logic.events import EventTesters
+from logic.pipeline import process_frames, stream_events
+import utils.metrics as metrics
+from utils.metrics import REGISTRY
+from vision.models import register_model
+
+# --- CONFIG ---
+VIDEO_SECONDS = 6         # The first point ends at frame 280, the ball then lies still
+SEED = 1
+
+
+def run(video, **options):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return process_frames(str(video), **options)
+
+def synthetic_video(tmp_path, monkeypatch):
+    # Caches go to the temporary directory, the stand-in detector replaces the weights
+    monkeypatch.setattr(cache, "CACHE_DIR", str(tmp_path / "detections"))
+    monkeypatch.setattr(calibration, "CALIBRATION_DIR", str(tmp_path / "calibration"))
+    register_model(synthetic.ColourDetector())
+    video = tmp_path / "rally.mp4"
+    synthetic.write_video(video, VIDEO_SECONDS, seed=SEED)
+    return video
+
+def test_uploads_in_one_process_do_not_share_tester_state(tmp_path, monkeypatch):
+    video = synthetic_video(tmp_path, monkeypatch)
+
+    first = run(video)
+    assert first != "[]"
+    assert run(video) == first
+    # The shared registry instances are never run themselves
+    assert EventTesters.BALL_IN_OUT.last_state is None
+    assert EventTesters.BALL_STOPPED.stopped.stack is None
+
+def test_detector_options_reach_process_video(tmp_path, monkeypatch):
+    video = synthetic_video(tmp_path, monkeypatch)
+    detected = []
+    for max_stride in (1, 4):
+        REGISTRY.reset()
+        assert run(video, max_stride=max_stride) != "[]"
+        detected.append(REGISTRY.counter('detected_frames').value)
+    assert detected[1] < detected[0] == VIDEO_SECONDS * synthetic.FPS
+
+    # The ROI passes take over once the ball is tracked
+    crops = []
+    detect_batch_roi = core.detect_batch_roi
+    monkeypatch.setattr(core, "detect_batch_roi", lambda *args: crops.append(1) or detect_batch_roi(*args))
+    assert run(video, roi_search=True) != "[]"
+    assert crops
+
+    # Between points the ball lies still, the gate holds those frames
+    REGISTRY.reset()
+    assert run(video, motion_gate=True) != "[]"
+    assert REGISTRY.counter('detected_frames').value < detected[0]
+
+def test_new_calibration_misses_the_cache_of_a_strided_run(tmp_path, monkeypatch):
+    video = synthetic_video(tmp_path, monkeypatch)
+
+    def detected(**options):
+        REGISTRY.reset()
+        run(video, **options)
+        return REGISTRY.counter('detected_frames').value
+
+    for options in ({'max_stride': 4}, {}):
+        assert detected(**options) > 0
+        assert detected(**options) == 0
+
+    # Another court: the strided run's skipped frames came from the old zones, every-frame detections did not
+    calibrate = core.get_court_calibration
+
+    def shifted(frames):
+        court = calibrate(frames)
+        return Court(*(Coord(c.x + 8, c.y) for c in (court.tl, court.tr, court.br, court.bl)))
+
+    monkeypatch.setattr(core, "get_court_calibration", shifted)
+    assert detected(max_stride=4) > 0
+    assert detected() == 0
+
+def test_batch_run_reports_progress(tmp_path, monkeypatch):
+    video = synthetic_video(tmp_path, monkeypatch)
+    monkeypatch.setattr(metrics, "PROGRESS_EVERY", 100)
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        process_frames(str(video))
+    lines = [line for line in output.getvalue().splitlines() if "Frames: frame" in line]
+    assert len(lines) == VIDEO_SECONDS * synthetic.FPS // 100
+    assert "events so far" not in lines[0]
+
+def test_parallel_segments_are_cached(tmp_path, monkeypatch):
+    video = synthetic_video(tmp_path, monkeypatch)
+    # Two segments of the short clip, run one at a time in this process so they see the stand-in
+    # detector and the temporary caches (spawned workers would not)
+    monkeypatch.setattr(pipeline, "MIN_SEGMENT_SECONDS", 2)
+    monkeypatch.setattr(pipeline, "ProcessPoolExecutor", lambda max_workers, **_: ThreadPoolExecutor(1))
+
+    first = run(video, workers=2)
+    assert len(list((tmp_path / "detections").glob("*.npz"))) == 2
+
+    REGISTRY.reset()
+    assert run(video, workers=2) == first
+    assert REGISTRY.counter('detected_frames').value == 0
+
+def test_closed_stream_cancels_remaining_segments(tmp_path, monkeypatch):
+    video = synthetic_video(tmp_path, monkeypatch)
+    monkeypatch.setattr(pipeline, "MIN_SEGMENT_SECONDS", 2)
+    shutdowns = []
+
+    class Pool(ThreadPoolExecutor):
+        def __init__(self, max_workers, **_):
+            super().__init__(1)
+
+        def shutdown(self, wait=True, cancel_futures=False):
+            shutdowns.append((wait, cancel_futures))
+            super().shutdown(wait, cancel_futures=cancel_futures)
+
+    monkeypatch.setattr(pipeline, "ProcessPoolExecutor", Pool)
+    with contextlib.redirect_stdout(io.StringIO()):
+        events = stream_events(str(video), workers=2)
+        next(events)
+        events.close()
+    assert shutdowns == [(False, True)]
+
+
+if __name__ == "__main__":
+    import tempfile
+    import pytest
+    with tempfile.TemporaryDirectory() as tmp, pytest.MonkeyPatch.context() as patch:
+        test_uploads_in_one_process_do_not_share_tester_state(Path(tmp), patch)
+    with tempfile.TemporaryDirectory() as tmp, pytest.MonkeyPatch.context() as patch:
+        test_detector_options_reach_process_video(Path(tmp), patch)
+    with tempfile.TemporaryDirectory() as tmp, pytest.MonkeyPatch.context() as patch:
+        test_new_calibration_misses_the_cache_of_a_strided_run(Path(tmp), patch)
+    with tempfile.TemporaryDirectory() as tmp, pytest.MonkeyPatch.context() as patch:
+        test_batch_run_reports_progress(Path(tmp), patch)
+    with tempfile.TemporaryDirectory() as tmp, pytest.MonkeyPatch.context() as patch:
+        test_parallel_segments_are_cached(Path(tmp), patch)
+    with tempfile.TemporaryDirectory() as tmp, pytest.MonkeyPatch.context() as patch:
+        test_closed_stream_cancels_remaining_segments(Path(tmp), patch)
+    print("✅ process_frames is repeatable, passes its detector options on and caches segments")
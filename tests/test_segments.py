@@ -0,0 +1,34 @@
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from logic.pipeline import plan_segments
+
+
+def test_segments_cover_the_video_once():
+    segments = plan_segments(10000, 4, overlap=120, min_frames=1800)
+    assert len(segments) == 4
+
+    # Kept ranges are contiguous from frame 0, the last one runs to the end of the video
+    assert segments[0][1] == 0
+    for (_, _, end), (_, next_start, _) in zip(segments, segments[1:]):
+        assert end == next_start
+    assert segments[-1][2] is None
+
+def test_segments_read_the_overlap_first():
+    for read_start, start, _ in plan_segments(10000, 4, overlap=120, min_frames=1800):
+        assert read_start == max(0, start - 120)
+
+def test_short_videos_use_fewer_workers():
+    assert plan_segments(3000, 8, overlap=120, min_frames=1800) == [(0, 0, None)]
+    assert len(plan_segments(3600, 8, overlap=120, min_frames=1800)) == 2
+    assert plan_segments(0, 4, overlap=120, min_frames=1800) == [(0, 0, None)]
+
+
+if __name__ == "__main__":
+    test_segments_cover_the_video_once()
+    test_segments_read_the_overlap_first()
+    test_short_videos_use_fewer_workers()
+    print("✅ Segment plans cover the video")
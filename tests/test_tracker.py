@@ -0,0 +1,112 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from vision.tracker import BallTracker
+
+# --- CONFIG ---
+MAX_COAST_FRAMES = 5
+MAX_DIST_ERROR = 100
+NUM_FRAMES = 2000
+SEED = 3
+
+
+# --- REFERENCE (the tracker loop that used to live inside process_video) ---
+def reference_track(frames):
+    track_pos, track_vel, frames_since_seen = None, (0, 0), 0
+    out = []
+    for candidates in frames:
+        predicted_pos = None
+        if track_pos is not None:
+            predicted_pos = (track_pos[0] + track_vel[0], track_pos[1] + track_vel[1])
+
+        matched = None
+        if predicted_pos is not None:
+            best_dist = float('inf')
+            for cand in candidates:
+                dist = np.linalg.norm(np.array(cand['pos']) - np.array(predicted_pos))
+                if dist < best_dist and dist < MAX_DIST_ERROR:
+                    best_dist = dist
+                    matched = cand
+        elif candidates:
+            matched = max(candidates, key=lambda x: x['conf'])
+
+        if matched:
+            new_pos = matched['pos']
+            if track_pos is not None:
+                inst_vel = (new_pos[0] - track_pos[0], new_pos[1] - track_pos[1])
+                track_vel = (0.7 * inst_vel[0] + 0.3 * track_vel[0],
+                             0.7 * inst_vel[1] + 0.3 * track_vel[1])
+            track_pos = new_pos
+            frames_since_seen = 0
+        elif track_pos is not None and frames_since_seen < MAX_COAST_FRAMES:
+            track_pos = (int(predicted_pos[0]), int(predicted_pos[1]))
+            frames_since_seen += 1
+        else:
+            track_pos, track_vel, frames_since_seen = None, (0, 0), 0
+        out.append(track_pos)
+    return out
+
+
+def random_frames(rng):
+    # A bouncing ball with dropouts, plus clutter candidates
+    frames = []
+    x, y, vx, vy = 900.0, 500.0, 14.0, -6.0
+    for _ in range(NUM_FRAMES):
+        x, y = x + vx, y + vy
+        if not 0 < x < 1900: vx = -vx
+        if not 100 < y < 900: vy = -vy
+        candidates = []
+        if rng.random() > 0.2:
+            candidates.append({'pos': (int(x + rng.normal(0, 3)), int(y + rng.normal(0, 3))), 'conf': rng.random()})
+        for _ in range(rng.integers(0, 3)):
+            candidates.append({'pos': (int(rng.uniform(0, 1920)), int(rng.uniform(0, 1080))), 'conf': rng.random()})
+        rng.shuffle(candidates)
+        frames.append(candidates)
+    return frames
+
+def as_arrays(candidates):
+    positions = np.array([c['pos'] for c in candidates], dtype=float).reshape(-1, 2)
+    return positions, np.array([c['conf'] for c in candidates])
+
+
+def test_single_hypothesis_matches_reference():
+    frames = random_frames(np.random.default_rng(SEED))
+    tracker = BallTracker(max_hypotheses=1, max_coast_frames=MAX_COAST_FRAMES, max_dist=MAX_DIST_ERROR)
+    actual = [tracker.update(*as_arrays(c)) for c in frames]
+    assert actual == reference_track(frames)
+
+def test_secondary_hypothesis_takes_over():
+    tracker = BallTracker(max_hypotheses=3)
+
+    # The primary locks onto a static false positive, the real ball appears alongside it
+    tracker.update([[100, 100]], [0.9])
+    for i in range(1, 10):
+        tracker.update([[100, 100], [1000 + 20 * i, 500]], [0.9, 0.5])
+    assert tracker.position == (100, 100)
+
+    # The false positive vanishes: once the primary has coasted out, the ball track is promoted
+    for i in range(10, 10 + MAX_COAST_FRAMES + 1):
+        pos = tracker.update([[1000 + 20 * i, 500]], [0.5])
+    assert pos == (1000 + 20 * (10 + MAX_COAST_FRAMES), 500)
+    assert tracker.velocity[0] > 15
+
+def test_predict_advances_all_hypotheses():
+    tracker = BallTracker(max_hypotheses=2)
+    tracker.update([[0, 0], [500, 500]], [0.9, 0.8])
+    tracker.update([[10, 0], [500, 510]], [0.9, 0.8])
+    before = tracker.pos[tracker.active].copy()
+    tracker.predict()
+    assert np.array_equal(tracker.pos[tracker.active], np.trunc(before + tracker.vel[tracker.active]))
+    assert tracker.frames_since_seen == 0
+
+
+if __name__ == "__main__":
+    test_single_hypothesis_matches_reference()
+    test_secondary_hypothesis_takes_over()
+    test_predict_advances_all_hypotheses()
+    print("✅ BallTracker tests passed")
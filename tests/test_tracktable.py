@@ -0,0 +1,86 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from data.Ball import Ball
+from data.Coord import Coord
+from data.frame import Frame, map_frames
+from data.Player import Player
+from data.tracktable import CHUNK_ROWS, TrackTable
+from logic.perspective import FrameUnskew
+from vision.core import get_court_calibration
+
+# --- CONFIG ---
+NUM_FRAMES = CHUNK_ROWS + 500       # Forces at least one growth step
+SEED = 17
+
+
+def random_frames(rng, court, count=NUM_FRAMES):
+    frames = []
+    for _ in range(count):
+        ball = Ball(Coord(*rng.integers(0, 1900, 2).tolist())) if rng.random() < 0.7 else None
+        p1 = Player(Coord(*rng.integers(0, 1900, 2).tolist()), "P1") if rng.random() < 0.9 else None
+        p2 = Player(Coord(*rng.integers(0, 1900, 2).tolist()), "P2") if rng.random() < 0.9 else None
+        frames.append(Frame(ball, court, p1, p2))
+    return frames
+
+def same_frame(row, frame):
+    for name in ("ball", "player1", "player2"):
+        a, b = getattr(row, name), getattr(frame, name)
+        if (a is None) != (b is None):
+            return False
+        if a is not None and a.pos.to_vector() != b.pos.to_vector():
+            return False
+    return row.court.to_vectors() == frame.court.to_vectors()
+
+
+def test_rows_read_back_like_frames():
+    rng = np.random.default_rng(SEED)
+    court = get_court_calibration(None)
+    frames = random_frames(rng, court)
+    table = TrackTable()
+    for i, frame in enumerate(frames):
+        table.append_frame(i, frame)
+
+    assert len(table) == NUM_FRAMES and table.capacity % CHUNK_ROWS == 0
+    assert all(same_frame(row, frame) for row, frame in zip(table, frames))
+    assert table[-1].frame == NUM_FRAMES - 1
+    assert all(row.player2 is None or row.player2.name == "P2" for row in table.rows(0, 50))
+    # One shared court, not one per row
+    assert len(table.courts) == 1 and table[0].court is table[NUM_FRAMES - 1].court
+    assert np.array_equal(table.column("has_ball"), [f.ball is not None for f in frames])
+
+def test_normalising_on_append_matches_frame_map():
+    rng = np.random.default_rng(SEED)
+    court = get_court_calibration(None)
+    normaliser = FrameUnskew(court.to_vectors())
+    frames = random_frames(rng, court, count=300)
+
+    table = TrackTable()
+    rows = [table.append_frame(i, frame, normaliser) for i, frame in enumerate(frames)]
+    expected = map_frames(frames, normaliser)
+    assert all(same_frame(row, frame) for row, frame in zip(rows, expected))
+
+    # Whole-table mapping gives the same rows as mapping on the way in
+    pixel = TrackTable()
+    for i, frame in enumerate(frames):
+        pixel.append_frame(i, frame)
+    assert all(same_frame(row, frame) for row, frame in zip(pixel.map(normaliser), expected))
+
+def test_columns_are_views():
+    table = TrackTable()
+    table.append(0, ball=(1.0, 2.0))
+    table.column("ball_x")[0] = 7.0
+    assert table[0].ball.pos.x == 7.0
+    assert table[0].player1 is None and table[0].court is None
+
+
+if __name__ == "__main__":
+    test_rows_read_back_like_frames()
+    test_normalising_on_append_matches_frame_map()
+    test_columns_are_views()
+    print("✅ Track table rows read back like frames")
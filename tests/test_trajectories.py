@@ -0,0 +1,84 @@
+import copy
+import sys
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+from logic.events import EventTesters
+from logic.pipeline import analyse_track
+from logic.trajectories import TrajectoryBuilder, random_rally
+from test_batch_events import stream_events
+
+# --- CONFIG ---
+SEED = 11
+STOPPED_STEPS = 30      # BallStoppedTester default, 0.5 s at 60 fps
+
+
+def frames_of(events, name):
+    return [e.frameIndex for e in events if e.event == name]
+
+def detect(track):
+    # Streaming and batch must agree before either is checked against the script
+    streamed = stream_events(track, copy.deepcopy(EventTesters.ALL))
+    batched = analyse_track(track, copy.deepcopy(EventTesters.ALL))
+    assert batched == streamed
+    return batched
+
+
+def test_bounces_shots_and_out_balls_fire_the_frame_after():
+    builder = TrajectoryBuilder()
+    builder.shot((18.0, 3.0)).shot((4.0, 6.0)).shot((25.0, 4.0))
+    trajectory = builder.build()
+    events = detect(trajectory.track)
+    bounces, shots = trajectory.of_kind('bounce'), trajectory.of_kind('shot')
+
+    # The first step that differs is the one into the frame after the mark
+    assert frames_of(events, 'BounceEvent') == [b.frame + 1 for b in bounces]
+    assert frames_of(events, 'ShotEvent') == [s.frame + 1 for s in shots[1:]]    # The serve starts from rest
+    assert [b.inside for b in bounces] == [True, True, False]
+    assert frames_of(events, 'BallInEvent') == [bounces[0].frame + 1]
+    assert frames_of(events, 'BallOutEvent') == [bounces[2].frame + 1]
+
+def test_stop_fires_after_half_a_second_until_the_ball_moves():
+    builder = TrajectoryBuilder()
+    builder.shot((18.0, 3.0)).stop(2.0).shot((4.0, 4.0))
+    trajectory = builder.build()
+    stop, restart = trajectory.of_kind('stop')[0], trajectory.of_kind('shot')[1]
+
+    stopped = frames_of(detect(trajectory.track), 'BallStoppedEvent')
+    assert stopped == list(range(stop.frame + STOPPED_STEPS - 1, restart.frame + 1))
+
+def test_sprint_fires_one_direction_for_one_player():
+    builder = TrajectoryBuilder()
+    builder.move_player(0, (-0.5, 7.0))
+    builder.shot((18.0, 3.0))
+    trajectory = builder.build()
+    move = trajectory.of_kind('move')[0]
+    events = detect(trajectory.track)
+
+    # Displacement over 5 frames: the 4th moving frame is the first past 0.5 m
+    assert frames_of(events, 'PlayerUpEvent') == list(range(move.frame + 3, move.end + 1))
+    for name in ('PlayerDownEvent', 'PlayerLeftEvent', 'PlayerRightEvent'):
+        assert frames_of(events, name) == []
+
+def test_random_rally_is_reproducible_and_every_bounce_is_seen():
+    first = random_rally(6000, np.random.default_rng(SEED), dropout=0.0)
+    again = random_rally(6000, np.random.default_rng(SEED), dropout=0.0)
+    for name in ('frame', 'ball_x', 'ball_y', 'p1_x', 'p2_y'):
+        assert np.array_equal(first.track.column(name), again.track.column(name))
+    assert len(first.track) == 6000
+    assert any(not b.inside for b in first.of_kind('bounce'))
+
+    bounced = set(frames_of(detect(first.track), 'BounceEvent'))
+    assert all(b.frame + 1 in bounced for b in first.of_kind('bounce') if b.frame < 6000)
+
+
+if __name__ == "__main__":
+    test_bounces_shots_and_out_balls_fire_the_frame_after()
+    test_stop_fires_after_half_a_second_until_the_ball_moves()
+    test_sprint_fires_one_direction_for_one_player()
+    test_random_rally_is_reproducible_and_every_bounce_is_seen()
+    print("✅ Event testers find the scripted shots, bounces, stops and sprints")